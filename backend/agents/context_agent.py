@@ -66,7 +66,8 @@ def _build_interview_context(interview_data: list[dict], question: str) -> dict:
     """Build context from the locally-loaded interview data (no DB needed).
 
     Uses PageIndex two-phase LLM retrieval instead of keyword overlap scoring.
-    Falls back to keyword scoring if PageIndex fails for any document.
+    Falls back to the local vector index (agents/local_index.py), then keyword
+    scoring, if PageIndex fails for any document.
     """
     from backend.agents import page_index
     from backend.services.llm import get_fast_llm
@@ -75,6 +76,15 @@ def _build_interview_context(interview_data: list[dict], question: str) -> dict:
     relevant_chunks: list[dict] = []
     total_chunks = 0
 
+    # Resolve every document's cached tree in one batched lookup up front
+    try:
+        page_index.build_indexes(
+            [(doc.get("filename", "unknown"), doc.get("content", "")) for doc in interview_data],
+            llm,
+        )
+    except Exception:
+        pass  # per-document build below falls back individually
+
     for doc in interview_data:
         filename = doc.get("filename", "unknown")
         content = doc.get("content", "")
@@ -95,17 +105,29 @@ def _build_interview_context(interview_data: list[dict], question: str) -> dict:
                     "reasoning": section.get("relevance_reasoning", ""),
                 })
         except Exception:
-            # Fallback: keyword overlap on chunks
-            question_words = set(question.lower().split())
-            for chunk in doc.get("chunks", []):
-                chunk_words = set(chunk.lower().split())
-                overlap = len(question_words & chunk_words) / max(len(question_words), 1)
-                if overlap > 0.1:
-                    relevant_chunks.append({
-                        "source": filename,
-                        "content": chunk,
-                        "relevance": round(overlap, 3),
-                    })
+            # Fallback: vector search over the local chunk index, else keyword overlap
+            from backend.agents.local_index import get_local_index
+            local_index = get_local_index(interview_data)
+            if local_index is not None:
+                try:
+                    hits = local_index.search(question, k=5, source_filter=filename)
+                    relevant_chunks.extend(
+                        {"source": filename, "content": h["content"], "relevance": h["score"]}
+                        for h in hits
+                        if h["source"] == filename
+                    )
+                    continue
+                except Exception:
+                    pass
+            from backend.services.retrieval import KeywordOverlapRetriever
+            chunks = doc.get("chunks", [])
+            fallback = KeywordOverlapRetriever([(filename, c) for c in chunks], min_score=0.1)
+            for hit in fallback.retrieve(question, k=len(chunks)):
+                relevant_chunks.append({
+                    "source": filename,
+                    "content": hit["content"],
+                    "relevance": round(hit["score"], 3),
+                })
 
     # Keep top 10 by relevance
     relevant_chunks.sort(key=lambda x: x.get("relevance", 0), reverse=True)
@@ -144,9 +166,17 @@ def _fetch_db_context(project_id: str, question: str, needs: dict) -> dict:
             result["citations"] = pack.get("citations", {})
             return result
 
-        if needs.get("needs_memory"):
+        memory_queries = needs.get("memory_queries", [question]) if needs.get("needs_memory") else []
+        evidence_queries = needs.get("evidence_queries", [question]) if needs.get("needs_evidence") else []
+        if memory_queries or evidence_queries:
+            # Embed every query in one provider call; the searches below then
+            # hit the embedding cache instead of embedding one by one
+            from backend.services.embeddings import create_query_embeddings
+            create_query_embeddings(list(dict.fromkeys(memory_queries + evidence_queries)))
+
+        if memory_queries:
             from backend.services.hybrid_search import hybrid_search_memory_items
-            for query in needs.get("memory_queries", [question]):
+            for query in memory_queries:
                 items = hybrid_search_memory_items(
                     project_id=project_id, query=query, match_count=6,
                 )
@@ -154,9 +184,9 @@ def _fetch_db_context(project_id: str, question: str, needs: dict) -> dict:
                     if item["id"] not in {m["id"] for m in result["memory_items"]}:
                         result["memory_items"].append(item)
 
-        if needs.get("needs_evidence"):
+        if evidence_queries:
             from backend.services.hybrid_search import hybrid_search_chunks
-            for query in needs.get("evidence_queries", [question]):
+            for query in evidence_queries:
                 chunks = hybrid_search_chunks(
                     project_id=project_id, query=query, match_count=8,
                 )
@@ -0,0 +1,191 @@
+"""Local vector index over interview chunks for CLI / offline sessions.
+
+Without Supabase there is no pgvector, so evidence lookups over
+``interview_data`` used to fall back to word-overlap scoring (O(all chunks ×
+words) per query, poor recall). This module builds one vector index per set of
+interview files and keeps it:
+
+  - in memory (keyed by a content fingerprint) in a BoundedCache holding at
+    most LOCAL_INDEX_MAX_SESSIONS indexes for LOCAL_INDEX_TTL_SECONDS each
+  - on disk in ``<interview folder>/.beacon_index/`` so the next run reloads it
+    instead of re-embedding; after edits only new / changed chunks are embedded
+
+    index = get_local_index(state["interview_data"])
+    if index is not None:
+        index.search("pricing objections", k=3, source_filter="acme")
+
+Returns None (callers keep their keyword fallback) when LOCAL_INDEX_ENABLED is
+off, there are no chunks, or the embedding provider is unavailable. The index
+kind (exact scan vs HNSW graph) is chosen by size in services/vector_index.py.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+
+from backend.config import settings
+from backend.services.bounded_cache import BoundedCache
+from backend.services.vector_index import (
+    VectorIndex,
+    build_vector_index,
+    load_vector_index,
+    save_vector_index,
+)
+
+logger = logging.getLogger(__name__)
+
+_INDEX_DIRNAME = ".beacon_index"  # hidden, so parse_interview_folder skips it
+
+# Cached in place of an index whose build failed, so we don't retry per query
+_UNAVAILABLE = object()
+
+# fingerprint → LocalChunkIndex | _UNAVAILABLE
+_SESSIONS = BoundedCache(
+    max_entries=settings.local_index_max_sessions,
+    ttl_seconds=settings.local_index_ttl_seconds,
+    sizeof=lambda value: 0,
+)
+# fingerprint → lock held while that index builds; other sessions never wait on it
+_build_locks: dict[str, threading.Lock] = {}
+_build_locks_lock = threading.Lock()
+
+
+def _chunk_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class LocalChunkIndex:
+    """Vector index plus the chunk rows it was built from (row i ↔ entries[i])."""
+
+    def __init__(self, index: VectorIndex, entries: list[dict]) -> None:
+        self.index = index
+        self.entries = entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def search(self, query: str, k: int = 5, source_filter: str = "") -> list[dict]:
+        """Return up to *k* chunks as {source, chunk_index, content, score}, best first.
+
+        source_filter keeps only files whose name contains it.
+        """
+        from backend.services.embeddings import create_embedding
+
+        if not query.strip() or not self.entries:
+            return []
+        # Over-fetch when filtering so the filter does not starve the result
+        fetch = len(self.entries) if source_filter else k
+        hits = []
+        for row, score in self.index.search(create_embedding(query), k=fetch):
+            entry = self.entries[row]
+            if source_filter and source_filter not in entry["source"]:
+                continue
+            hits.append({**entry, "score": round(score, 4)})
+            if len(hits) >= k:
+                break
+        return hits
+
+
+def _collect_entries(interview_data: list[dict]) -> list[dict]:
+    entries = []
+    for doc in interview_data:
+        for i, chunk in enumerate(doc.get("chunks", [])):
+            if chunk.strip():
+                entries.append({
+                    "source": doc.get("filename", "?"),
+                    "chunk_index": i,
+                    "content": chunk,
+                    "content_hash": _chunk_hash(chunk),
+                })
+    return entries
+
+
+def _index_dir(interview_data: list[dict], folder: str | None) -> str | None:
+    """Where to persist the index: *folder*, else the files' common parent."""
+    if folder:
+        return os.path.join(folder, _INDEX_DIRNAME)
+    parents = [str(Path(d["file_path"]).parent) for d in interview_data if d.get("file_path")]
+    if not parents:
+        return None
+    try:
+        return os.path.join(os.path.commonpath(parents), _INDEX_DIRNAME)
+    except ValueError:  # paths on different drives
+        return None
+
+
+def _fingerprint(entries: list[dict]) -> str:
+    digest = hashlib.sha256(f"{settings.embedding_provider}:{settings.embedding_model}".encode())
+    for entry in entries:
+        digest.update(entry["content_hash"].encode())
+    return digest.hexdigest()
+
+
+def _build(entries: list[dict], fingerprint: str, directory: str | None) -> LocalChunkIndex:
+    from backend.services.embeddings import create_embeddings_batch
+
+    # Reuse vectors from the previous run for chunks whose text is unchanged
+    previous: dict[str, object] = {}
+    if directory:
+        loaded = load_vector_index(directory)
+        if loaded is not None:
+            index, meta = loaded
+            if meta.get("fingerprint") == fingerprint:
+                return LocalChunkIndex(index, entries)
+            if meta.get("embedding_model") == settings.embedding_model:
+                previous = {h: index.store.row(i) for i, h in enumerate(meta.get("hashes", []))}
+
+    missing = list(dict.fromkeys(e["content"] for e in entries if e["content_hash"] not in previous))
+    fresh = dict(zip(missing, create_embeddings_batch(missing))) if missing else {}
+    vectors = [
+        previous[e["content_hash"]] if e["content_hash"] in previous else fresh[e["content"]]
+        for e in entries
+    ]
+    index = build_vector_index(vectors)
+
+    if directory:
+        try:
+            save_vector_index(
+                index,
+                directory,
+                extra={
+                    "fingerprint": fingerprint,
+                    "embedding_model": settings.embedding_model,
+                    "hashes": [e["content_hash"] for e in entries],
+                },
+            )
+        except OSError as exc:
+            logger.warning("could not persist local index to %s: %s", directory, exc)
+    return LocalChunkIndex(index, entries)
+
+
+def get_local_index(interview_data: list[dict], folder: str | None = None) -> LocalChunkIndex | None:
+    """Return the session's chunk index, loading or building it on first use."""
+    if not settings.local_index_enabled:
+        return None
+    entries = _collect_entries(interview_data)
+    if not entries:
+        return None
+
+    fingerprint = _fingerprint(entries)
+    cached = _SESSIONS.get(fingerprint)
+    if cached is None:
+        with _build_locks_lock:
+            build_lock = _build_locks.setdefault(fingerprint, threading.Lock())
+        # Concurrent callers for the same files wait for one build
+        with build_lock:
+            cached = _SESSIONS.get(fingerprint)
+            if cached is None:
+                try:
+                    cached = _build(entries, fingerprint, _index_dir(interview_data, folder))
+                except Exception as exc:
+                    # No embedding provider / key in this environment — keyword fallback
+                    logger.warning("local vector index unavailable: %s", exc)
+                    cached = _UNAVAILABLE
+                _SESSIONS.set(fingerprint, cached)
+        with _build_locks_lock:
+            _build_locks.pop(fingerprint, None)
+    return None if cached is _UNAVAILABLE else cached
@@ -22,6 +22,7 @@ from datetime import datetime, timezone
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from backend.agents.state import InterviewState
+from backend.services.inverted_index import InvertedIndex
 from backend.services.llm import get_fast_llm
 
 
@@ -67,22 +68,20 @@ class DecisionLog:
 
     def __init__(self):
         self.items: list[dict] = []
+        self._index = InvertedIndex()  # item position → BM25 postings
 
     def add(self, item: dict) -> None:
         item.setdefault("timestamp", datetime.now(timezone.utc).isoformat())
         self.items.append(item)
+        self._index.add(
+            len(self.items) - 1,
+            f"{item.get('title', '')} {item.get('content', '')}",
+            item,
+        )
 
     def search(self, query: str, limit: int = 5) -> list[dict]:
-        """Simple keyword search over the local log."""
-        query_words = set(query.lower().split())
-        scored: list[tuple[float, dict]] = []
-        for item in self.items:
-            text = f"{item.get('title', '')} {item.get('content', '')}".lower()
-            text_words = set(text.split())
-            overlap = len(query_words & text_words) / max(len(query_words), 1)
-            scored.append((overlap, item))
-        scored.sort(key=lambda x: x[0], reverse=True)
-        return [item for _, item in scored[:limit]]
+        """BM25 keyword search over the local log (matching items only)."""
+        return [self._index.payload(i) for i, _ in self._index.search(query, k=limit)]
 
     def get_by_type(self, item_type: str) -> list[dict]:
         return [i for i in self.items if i.get("type") == item_type]
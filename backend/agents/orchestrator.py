@@ -585,6 +585,7 @@ class InterviewSession:
             "tickets": [],
             "recalled_memories": [],
             "page_index_trees": {},
+            "keyword_indexes": {},
             "tool_call_log": [],
             "cache_stats": {},
             "phase": "intake",
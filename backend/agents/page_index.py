@@ -7,11 +7,13 @@ Two-phase retrieval replaces keyword-overlap chunk scoring:
 Caching strategy (two layers)
 ------------------------------
 - Module-level in-memory dict  _CACHE: sha256(content) → PageIndexTree
-- SQLite disk cache via cache_manager.get/store_llm_response(content_hash)
-  (survives process restarts)
+- Persistent cache via cache_manager.get/store_llm_response(content_hash)
+  (survives process restarts); build_indexes() resolves many documents with
+  one batched cache lookup
 
 If the LLM call or parse fails at any step, safe fallbacks are used so
-retrieve() always returns a list (possibly from simple keyword scoring).
+retrieve() always returns a list (possibly from BM25 keyword scoring of the
+node titles and summaries).
 """
 
 from __future__ import annotations
@@ -24,6 +26,8 @@ from typing import TypedDict
 
 from langchain_core.messages import HumanMessage
 
+from backend.services.inverted_index import InvertedIndex
+
 
 # ── Data structures ───────────────────────────────────────────────────────
 
@@ -55,6 +59,7 @@ class RetrievedSection(TypedDict):
 # ── Module-level in-memory cache ──────────────────────────────────────────
 
 _CACHE: dict[str, PageIndexTree] = {}  # content_hash → tree
+_NODE_INDEXES: dict[str, InvertedIndex] = {}  # content_hash → keyword index over nodes
 
 
 # ── Prompts ───────────────────────────────────────────────────────────────
@@ -214,10 +219,42 @@ def _build_fallback_tree(interview_id: str, content: str, content_hash: str) ->
 
 # ── Public API ────────────────────────────────────────────────────────────
 
+def _tree_from_cached(cached_str: str | None) -> PageIndexTree | None:
+    if not cached_str:
+        return None
+    try:
+        return PageIndexTree(**json.loads(cached_str))
+    except Exception:
+        return None  # corrupt cache entry — rebuild
+
+
+def build_indexes(docs: list[tuple[str, str]], llm) -> dict[str, PageIndexTree]:
+    """Build (or load) trees for many (interview_id, content) pairs at once.
+
+    All persistent-cache lookups are resolved in one batched read before any
+    LLM call, so warm sessions cost a single round trip instead of one per
+    document. Returns {interview_id: tree}.
+    """
+    hashes = {
+        interview_id: hashlib.sha256(content.encode()).hexdigest()
+        for interview_id, content in docs
+        if content.strip()
+    }
+    missing = [h for h in hashes.values() if h not in _CACHE]
+    if missing:
+        from backend.services import cache_manager
+        for content_hash, cached_str in cache_manager.get_llm_responses_many(missing).items():
+            tree = _tree_from_cached(cached_str)
+            if tree is not None:
+                _CACHE[content_hash] = tree
+
+    return {interview_id: build_index(interview_id, content, llm) for interview_id, content in docs}
+
+
 def build_index(interview_id: str, content: str, llm) -> PageIndexTree:
     """Build (or return cached) a PageIndexTree for the given interview.
 
-    Two-level cache: module _CACHE (in-memory) + SQLite via cache_manager.
+    Two-level cache: module _CACHE (in-memory) + persistent cache_manager.
     Falls back to a simple chunk-based tree if the LLM call fails.
     """
     if not content.strip():
@@ -231,15 +268,10 @@ def build_index(interview_id: str, content: str, llm) -> PageIndexTree:
 
     # 2. Disk cache hit
     from backend.services import cache_manager
-    cached_str = cache_manager.get_llm_response(content_hash)
-    if cached_str:
-        try:
-            data = json.loads(cached_str)
-            tree = PageIndexTree(**data)
-            _CACHE[content_hash] = tree
-            return tree
-        except Exception:
-            pass  # corrupt cache entry — rebuild
+    tree = _tree_from_cached(cache_manager.get_llm_response(content_hash))
+    if tree is not None:
+        _CACHE[content_hash] = tree
+        return tree
 
     # 3. Build via LLM
     prompt = _BUILD_TREE_PROMPT.format(
@@ -312,7 +344,7 @@ def retrieve(
     level1_nodes = [n for n in nodes.values() if n.get("level") == 1]
     if not level1_nodes:
         # Flat tree — return all nodes as sections
-        return _nodes_to_sections(level1_nodes or list(nodes.values()), content, query, max_sections)
+        return _nodes_to_sections(tree, level1_nodes or list(nodes.values()), content, query, max_sections)
 
     theme_list = "\n".join(
         f"- {n['node_id']}: {n['title']} — {n['summary'][:100]}"
@@ -333,7 +365,7 @@ def retrieve(
 
     if not chosen_theme_ids:
         # Fallback: keyword-scored themes
-        chosen_theme_ids = _keyword_score_nodes(level1_nodes, query)[:3]
+        chosen_theme_ids = _keyword_score_nodes(tree, level1_nodes, query)[:3]
 
     # ── Phase 2: for each theme, pick relevant claims ─────────────────────
     selected_node_ids: list[str] = []
@@ -371,7 +403,7 @@ def retrieve(
             selected_node_ids.extend(chosen_claims)
         else:
             # Fallback: keyword-scored claims
-            selected_node_ids.extend(_keyword_score_nodes(child_nodes, query)[:2])
+            selected_node_ids.extend(_keyword_score_nodes(tree, child_nodes, query)[:2])
 
     # ── Build RetrievedSection objects ────────────────────────────────────
     seen: set[str] = set()
@@ -399,27 +431,37 @@ def retrieve(
 
 # ── Internal helpers ──────────────────────────────────────────────────────
 
-def _keyword_score_nodes(nodes: list[PageIndexNode], query: str) -> list[str]:
-    """Return node_ids sorted by keyword overlap with query."""
-    query_words = set(query.lower().split())
-    scored: list[tuple[float, str]] = []
-    for n in nodes:
-        text = f"{n.get('title', '')} {n.get('summary', '')}".lower()
-        words = set(text.split())
-        overlap = len(query_words & words) / max(len(query_words), 1)
-        scored.append((overlap, n["node_id"]))
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [nid for _, nid in scored]
+def _node_index(tree: PageIndexTree) -> InvertedIndex:
+    """BM25 index over every node's title + summary, built once per tree."""
+    content_hash = tree.get("content_hash", "")
+    index = _NODE_INDEXES.get(content_hash)
+    if index is None:
+        index = InvertedIndex()
+        for n in tree.get("nodes", {}).values():
+            index.add(n["node_id"], f"{n.get('title', '')} {n.get('summary', '')}", n["node_id"])
+        if content_hash:
+            _NODE_INDEXES[content_hash] = index
+    return index
+
+
+def _keyword_score_nodes(tree: PageIndexTree, nodes: list[PageIndexNode], query: str) -> list[str]:
+    """Return node_ids of *nodes* sorted by BM25 against query (non-matches last)."""
+    node_ids = [n["node_id"] for n in nodes]
+    wanted = set(node_ids)
+    ranked = [nid for nid, _ in _node_index(tree).search(query, k=None, where=wanted.__contains__)]
+    matched = set(ranked)
+    return ranked + [nid for nid in node_ids if nid not in matched]
 
 
 def _nodes_to_sections(
+    tree: PageIndexTree,
     nodes: list[PageIndexNode],
     content: str,
     query: str,
     max_sections: int,
 ) -> list[RetrievedSection]:
     """Convert a node list directly into RetrievedSection objects."""
-    scored_ids = _keyword_score_nodes(nodes, query)
+    scored_ids = _keyword_score_nodes(tree, nodes, query)
     results: list[RetrievedSection] = []
     for nid in scored_ids[:max_sections]:
         node = next((n for n in nodes if n["node_id"] == nid), None)
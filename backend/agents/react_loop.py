@@ -25,10 +25,12 @@ from __future__ import annotations
 import concurrent.futures
 import json
 import re
+import threading
 from typing import Any
 
 from backend.agents.state import InterviewState
 from backend.services import cache_manager
+from backend.services.inverted_index import InvertedIndex
 from backend.config import settings
 
 MAX_ITER = 10
@@ -233,6 +235,49 @@ _PRD_TOOLS: list[dict] = [
 ]
 
 
+# ── Session keyword indexes ───────────────────────────────────────────────
+# One InvertedIndex per collection, kept in state["keyword_indexes"] so each
+# keyword tool call tokenizes only new data and scores only touched postings.
+
+_keyword_indexes_lock = threading.Lock()
+
+
+def _keyword_index(state: InterviewState, name: str) -> InvertedIndex:
+    with _keyword_indexes_lock:
+        indexes = state.setdefault("keyword_indexes", {})
+        if name not in indexes:
+            indexes[name] = InvertedIndex()
+        return indexes[name]
+
+
+def _interview_chunk_index(state: InterviewState) -> InvertedIndex:
+    index = _keyword_index(state, "interview_chunks")
+    index.sync({
+        (doc.get("filename", "?"), i): (chunk, {"source": doc.get("filename", "?"), "content": chunk})
+        for doc in state.get("interview_data", [])
+        for i, chunk in enumerate(doc.get("chunks", []))
+    })
+    return index
+
+
+def _research_index(state: InterviewState) -> InvertedIndex:
+    research = state.get("research_results", {})
+    docs: dict = {}
+    for i, claim in enumerate(research.get("validated_claims", [])):
+        docs[("claim", i)] = (f"{claim.get('claim', '')} {claim.get('evidence', '')}", ("claim", claim))
+    for i, metric in enumerate(research.get("quantified_metrics", [])):
+        text = f"{metric.get('metric', '')} {metric.get('value', '')} {metric.get('notes', '')}"
+        docs[("metric", i)] = (text, ("metric", metric))
+    for i, contra in enumerate(research.get("contradictions", [])):
+        text = f"{contra.get('claim_a', '')} {contra.get('claim_b', '')}"
+        docs[("contradiction", i)] = (text, ("contradiction", contra))
+    for i, gap in enumerate(research.get("gaps", [])):
+        docs[("gap", i)] = (gap, ("gap", {"gap": gap}))
+    index = _keyword_index(state, "research_findings")
+    index.sync(docs)
+    return index
+
+
 # ── Tool implementations ───────────────────────────────────────────────────
 
 def _tool_list_interviews(state: InterviewState) -> str:
@@ -335,27 +380,24 @@ def _tool_read_interview_section(state: InterviewState, args: dict) -> str:
 def _tool_search_memory(state: InterviewState, args: dict) -> str:
     """Search memory with live Supabase fallback.
 
-    Step 1: Keyword-score the pre-recalled slice (fast, in-process).
+    Step 1: BM25-score the pre-recalled slice (fast, in-process).
     Step 2: If fewer than 3 results pass the relevance threshold, fall
             through to a live hybrid_search_memory_items + mem0 query so
             decisions stored in previous sessions are never missed.
     """
     query = args.get("query", "")
     recalled = state.get("recalled_memories", [])
-    query_words = set(query.lower().split())
-
-    # Step 1 — search pre-recalled slice
-    scored: list[tuple[float, dict]] = []
-    for mem in recalled:
-        text = f"{mem.get('title', '')} {mem.get('content', '')}".lower()
-        words = set(text.split())
-        overlap = len(query_words & words) / max(len(query_words), 1)
-        scored.append((overlap, mem))
-    scored.sort(key=lambda x: x[0], reverse=True)
-    strong_hits = [(s, m) for s, m in scored if s >= 0.15]
+
+    # Step 1 — search pre-recalled slice (session BM25 index, ≥15% of query terms)
+    index = _keyword_index(state, "recalled_memories")
+    index.sync({
+        i: (f"{mem.get('title', '')} {mem.get('content', '')}", mem)
+        for i, mem in enumerate(recalled)
+    })
+    strong_hits = [index.payload(i) for i, _ in index.search(query, k=None, min_coverage=0.15)]
 
     lines: list[str] = []
-    for _, mem in strong_hits[:5]:
+    for mem in strong_hits[:5]:
         mtype = mem.get("type", "memory")
         title = mem.get("title", "")
         content = mem.get("content", "")
@@ -402,24 +444,48 @@ def _tool_search_memory(state: InterviewState, args: dict) -> str:
     return "\n".join(lines) if lines else "No relevant memories found."
 
 
+def _local_index_search(state: InterviewState, query: str, k: int, source_filter: str = "") -> list[dict] | None:
+    """Vector search over the session's interview files; None if unavailable."""
+    from backend.agents.local_index import get_local_index
+
+    index = get_local_index(state.get("interview_data", []))
+    if index is None:
+        return None
+    try:
+        return index.search(query, k=k, source_filter=source_filter)
+    except Exception:
+        return None
+
+
 def _tool_search_db_chunks(state: InterviewState, args: dict) -> str:
     query = args.get("query", "")
     project_id = state.get("project_id", "")
-    if not project_id:
-        return "No project loaded — database search unavailable."
-    try:
-        from backend.services.hybrid_search import hybrid_search_chunks
-        chunks = hybrid_search_chunks(project_id=project_id, query=query, match_count=5)
-        if not chunks:
-            return "No matching chunks found in database."
-        parts = []
-        for c in chunks:
-            cid = str(c.get("chunk_id", "?"))[:8]
-            score = c.get("combined_score", 0)
-            parts.append(f"[chunk {cid}] (score: {score:.3f})\n{c.get('content', '')[:400]}")
-        return "\n---\n".join(parts)
-    except Exception as exc:
-        return f"Database search unavailable: {exc}"
+    error = "No project loaded — database search unavailable."
+    if project_id:
+        try:
+            from backend.services.hybrid_search import hybrid_search_chunks
+            chunks = hybrid_search_chunks(project_id=project_id, query=query, match_count=5)
+            if not chunks:
+                return "No matching chunks found in database."
+            parts = []
+            for c in chunks:
+                cid = str(c.get("chunk_id", "?"))[:8]
+                score = c.get("combined_score", 0)
+                parts.append(f"[chunk {cid}] (score: {score:.3f})\n{c.get('content', '')[:400]}")
+            return "\n---\n".join(parts)
+        except Exception as exc:
+            error = f"Database search unavailable: {exc}"
+
+    # Offline / CLI: search the local interview index instead
+    hits = _local_index_search(state, query, k=5)
+    if hits is None:
+        return error
+    if not hits:
+        return "No matching chunks found in local interview index."
+    return "\n---\n".join(
+        f"[{h['source']} chunk {h['chunk_index']}] (score: {h['score']:.3f})\n{h['content'][:400]}"
+        for h in hits
+    )
 
 
 def _tool_get_research_results(state: InterviewState) -> str:
@@ -464,17 +530,17 @@ def _tool_get_memory_items(state: InterviewState, args: dict) -> str:
     if not items:
         return "No memory items available."
 
-    # If a specific query was given, re-rank by keyword overlap
+    # If a specific query was given, re-rank by BM25 (matches first, then the rest)
     if query:
-        query_words = set(query.lower().split())
-        scored: list[tuple[float, dict]] = []
-        for item in items:
-            text = f"{item.get('title', '')} {item.get('content', '')}".lower()
-            words = set(text.split())
-            overlap = len(query_words & words) / max(len(query_words), 1)
-            scored.append((overlap, item))
-        scored.sort(key=lambda x: x[0], reverse=True)
-        items = [item for _, item in scored[:10]]
+        index = _keyword_index(state, "memory_items")
+        index.sync({
+            i: (f"{item.get('title', '')} {item.get('content', '')}", item)
+            for i, item in enumerate(items)
+        })
+        ranked = [i for i, _ in index.search(query, k=10)]
+        matched = set(ranked)
+        ranked += [i for i in range(len(items)) if i not in matched]
+        items = [items[i] for i in ranked[:10]]
 
     lines = []
     for item in items[:10]:
@@ -495,37 +561,18 @@ def _tool_search_research_claims(state: InterviewState, args: dict) -> str:
     if not research:
         return "No research results available. Research must complete before PRD generation."
 
-    query_words = set(query.lower().split())
-    results: list[tuple[float, str, dict]] = []
-
-    if search_type in ("claims", "all"):
-        for claim in research.get("validated_claims", []):
-            text = f"{claim.get('claim', '')} {claim.get('evidence', '')}".lower()
-            overlap = len(query_words & set(text.split())) / max(len(query_words), 1)
-            if overlap > 0.08:
-                results.append((overlap, "claim", claim))
-
-    if search_type in ("metrics", "all"):
-        for metric in research.get("quantified_metrics", []):
-            text = f"{metric.get('metric', '')} {metric.get('value', '')} {metric.get('notes', '')}".lower()
-            overlap = len(query_words & set(text.split())) / max(len(query_words), 1)
-            if overlap > 0.05:
-                results.append((overlap, "metric", metric))
-
-    if search_type in ("contradictions", "all"):
-        for contra in research.get("contradictions", []):
-            text = f"{contra.get('claim_a', '')} {contra.get('claim_b', '')}".lower()
-            overlap = len(query_words & set(text.split())) / max(len(query_words), 1)
-            if overlap > 0.08:
-                results.append((overlap, "contradiction", contra))
-
-    if search_type in ("gaps", "all"):
-        for gap in research.get("gaps", []):
-            overlap = len(query_words & set(gap.lower().split())) / max(len(query_words), 1)
-            if overlap > 0.08:
-                results.append((overlap, "gap", {"gap": gap}))
-
-    results.sort(key=lambda x: x[0], reverse=True)
+    index = _research_index(state)
+    wanted = {"claims": "claim", "metrics": "metric", "contradictions": "contradiction", "gaps": "gap"}
+    kinds = set(wanted.values()) if search_type == "all" else {wanted.get(search_type)}
+    # Metrics keep their lower match threshold (0.05 vs 0.08 of query terms)
+    hits = index.search(
+        query, k=8, min_coverage=0.08,
+        where=lambda p: p[0] in kinds and p[0] != "metric",
+    )
+    if "metric" in kinds:
+        hits += index.search(query, k=8, min_coverage=0.05, where=lambda p: p[0] == "metric")
+    hits.sort(key=lambda h: h[1], reverse=True)
+    results = [(score, *index.payload(doc_id)) for doc_id, score in hits]
 
     if not results:
         return f"No matching research findings for: {query}"
@@ -554,31 +601,65 @@ def _tool_search_research_claims(state: InterviewState, args: dict) -> str:
     return "\n---\n".join(lines)
 
 
+def _db_evidence_search(state: InterviewState, claim: str, k: int, source_filter: str = "") -> list[dict] | None:
+    """Hybrid search over the project's ingested chunks; None without a project / database.
+
+    Hits are labelled with the source's name, which is what *source_filter*
+    matches against here.
+    """
+    project_id = state.get("project_id", "")
+    if not project_id:
+        return None
+    try:
+        from backend.db.supabase_client import get_supabase
+        from backend.services.hybrid_search import hybrid_search_chunks
+
+        # Over-fetch when filtering so the filter does not starve the result
+        rows = hybrid_search_chunks(project_id=project_id, query=claim, match_count=30 if source_filter else k)
+        source_ids = list({r["source_id"] for r in rows if r.get("source_id")})
+        names = {
+            s["id"]: s.get("name") or ""
+            for s in (
+                get_supabase().table("sources").select("id, name").in_("id", source_ids).execute().data or []
+            )
+        } if source_ids else {}
+    except Exception:
+        return None
+    hits = [
+        {
+            "source": names.get(r.get("source_id")) or str(r.get("source_id", "?")),
+            "content": r.get("content") or "",
+            "score": r.get("combined_score") or 0.0,
+        }
+        for r in rows
+    ]
+    if source_filter:
+        hits = [h for h in hits if source_filter in h["source"]]
+    return hits[:k]
+
+
 def _tool_retrieve_evidence(state: InterviewState, args: dict) -> str:
     claim = args.get("claim", "")
     source_filter = args.get("source", "")
-    interview_data = state.get("interview_data", [])
-
-    search_words = set(claim.lower().split())
-    results: list[tuple[float, str, str]] = []
-
-    for doc in interview_data:
-        fname = doc.get("filename", "?")
-        if source_filter and source_filter not in fname:
-            continue
-        for chunk in doc.get("chunks", []):
-            chunk_words = set(chunk.lower().split())
-            overlap = len(search_words & chunk_words) / max(len(search_words), 1)
-            if overlap > 0.08:
-                results.append((overlap, fname, chunk))
-
-    results.sort(key=lambda x: x[0], reverse=True)
+    if state.get("interview_data"):
+        # The session's interview files: vector index, else BM25 keyword index
+        results = _local_index_search(state, claim, k=3, source_filter=source_filter)
+        if results is None:
+            index = _interview_chunk_index(state)
+            hits = index.search(
+                claim, k=3, min_coverage=0.08,
+                where=(lambda p: source_filter in p["source"]) if source_filter else None,
+            )
+            results = [{**index.payload(doc_id), "score": score} for doc_id, score in hits]
+    else:
+        # No interview files loaded (API sessions): the project's ingested chunks
+        results = _db_evidence_search(state, claim, k=3, source_filter=source_filter) or []
     if not results:
         return f"No evidence found for: {claim}"
 
     parts = []
-    for score, fname, chunk in results[:3]:
-        parts.append(f"[{fname}] (relevance: {score:.3f})\n{chunk[:500]}")
+    for hit in results:
+        parts.append(f"[{hit['source']}] (relevance: {hit['score']:.3f})\n{hit['content'][:500]}")
     return "\n---\n".join(parts)
 
 
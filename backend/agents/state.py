@@ -113,6 +113,7 @@ class InterviewState(TypedDict):
 
     # ReAct loop + caching telemetry
     page_index_trees: dict          # interview_id -> PageIndexTree dict (built lazily)
+    keyword_indexes: dict           # name -> InvertedIndex over session data (built lazily)
     tool_call_log: list             # [{tool, args, result_preview, tokens_used, cached}]
     cache_stats: dict               # {hits, misses, tokens_saved}
 
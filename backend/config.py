@@ -88,6 +88,32 @@ class Settings:
     # Ollama (local — no API key needed)
     ollama_base_url: str = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 
+    # Shared LLM input-token budget per minute for concurrent batch callers
+    # (synthesis theme extraction) in one process; 0 = unlimited
+    llm_tokens_per_minute: int = int(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+
+    # Synthesis Pass 1 — concurrent theme-extraction batches and per-batch retries
+    synthesis_max_concurrency: int = int(os.getenv("SYNTHESIS_MAX_CONCURRENCY", "4"))
+    synthesis_batch_max_attempts: int = int(os.getenv("SYNTHESIS_BATCH_MAX_ATTEMPTS", "3"))
+    synthesis_batch_backoff_seconds: float = float(os.getenv("SYNTHESIS_BATCH_BACKOFF_SECONDS", "2.0"))
+    # Max themes per consolidation call; larger theme sets are merged as a tree
+    synthesis_reduce_group_size: int = int(os.getenv("SYNTHESIS_REDUCE_GROUP_SIZE", "30"))
+
+    # Entity extraction — chunks packed per model call, concurrent calls
+    entity_batch_max_chunks: int = int(os.getenv("ENTITY_BATCH_MAX_CHUNKS", "8"))
+    entity_batch_max_chars: int = int(os.getenv("ENTITY_BATCH_MAX_CHARS", "24000"))
+    entity_max_concurrency: int = int(os.getenv("ENTITY_MAX_CONCURRENCY", "4"))
+    # Extract entities from the chunks an ingestion run writes, right after it
+    entity_extraction_on_ingest: bool = os.getenv("ENTITY_EXTRACTION_ON_INGEST", "true").lower() == "true"
+    # Entity resolution — name-embedding cosine that counts as the same entity,
+    # and how long a project's in-process resolver is trusted before reloading
+    entity_match_min_similarity: float = float(os.getenv("ENTITY_MATCH_MIN_SIMILARITY", "0.9"))
+    entity_resolver_ttl_seconds: float = float(os.getenv("ENTITY_RESOLVER_TTL_SECONDS", "300"))
+    # Entity co-occurrence graph — neighbours kept per entity, and how long a
+    # project's in-process mention incidence is trusted before reloading
+    entity_graph_top_k: int = int(os.getenv("ENTITY_GRAPH_TOP_K", "25"))
+    entity_graph_ttl_seconds: float = float(os.getenv("ENTITY_GRAPH_TTL_SECONDS", "300"))
+
     # ------------------------------------------------------------------
     # Chunking
     # ------------------------------------------------------------------
@@ -97,6 +123,73 @@ class Settings:
     # Ingestion concurrency
     embed_concurrency: int = int(os.getenv("EMBED_CONCURRENCY", "4"))
 
+    # Batched embedding — max texts and estimated tokens per embed_documents call
+    embed_batch_size: int = int(os.getenv("EMBED_BATCH_SIZE", "128"))
+    embed_batch_max_tokens: int = int(os.getenv("EMBED_BATCH_MAX_TOKENS", "100000"))
+
+    # Query embedding coalescing — concurrent cache misses arriving within this
+    # window share one provider call (0 disables the wait)
+    embed_coalesce_window_ms: float = float(os.getenv("EMBED_COALESCE_WINDOW_MS", "5"))
+    embed_coalesce_max_batch: int = int(os.getenv("EMBED_COALESCE_MAX_BATCH", "64"))
+
+    # Embedding budget shared by every job and request in one process (0 =
+    # unlimited). Not coordinated across processes: with several API workers,
+    # set it to the provider quota divided by the number of processes.
+    embed_tokens_per_minute: int = int(os.getenv("EMBED_TOKENS_PER_MINUTE", "0"))
+
+    # Streaming ingestion — max chunks in flight per window, rows per insert
+    ingest_window_size: int = int(os.getenv("INGEST_WINDOW_SIZE", "256"))
+    chunk_insert_page_size: int = int(os.getenv("CHUNK_INSERT_PAGE_SIZE", "100"))
+
+    # Background ingestion jobs — worker pool size and retry policy
+    ingest_job_workers: int = int(os.getenv("INGEST_JOB_WORKERS", "2"))
+    ingest_job_max_attempts: int = int(os.getenv("INGEST_JOB_MAX_ATTEMPTS", "3"))
+    ingest_job_backoff_seconds: float = float(os.getenv("INGEST_JOB_BACKOFF_SECONDS", "2.0"))
+    # Running / retrying jobs not updated for this long are presumed orphaned
+    # (their process died) and are re-queued on startup; owners refresh it
+    # every third of the lease
+    ingest_job_lease_seconds: float = float(os.getenv("INGEST_JOB_LEASE_SECONDS", "900"))
+
+    # ------------------------------------------------------------------
+    # In-process (L1) cache bounds — 0 disables a limit
+    # ------------------------------------------------------------------
+    cache_embedding_max_entries: int = int(os.getenv("CACHE_EMBEDDING_MAX_ENTRIES", "20000"))
+    cache_embedding_max_bytes: int = int(os.getenv("CACHE_EMBEDDING_MAX_BYTES", str(256 * 1024 * 1024)))
+    cache_embedding_ttl_seconds: float = float(os.getenv("CACHE_EMBEDDING_TTL_SECONDS", "0"))
+
+    cache_llm_max_entries: int = int(os.getenv("CACHE_LLM_MAX_ENTRIES", "2000"))
+    cache_llm_max_bytes: int = int(os.getenv("CACHE_LLM_MAX_BYTES", str(64 * 1024 * 1024)))
+    cache_llm_ttl_seconds: float = float(os.getenv("CACHE_LLM_TTL_SECONDS", "86400"))
+
+    cache_tool_max_entries: int = int(os.getenv("CACHE_TOOL_MAX_ENTRIES", "5000"))
+    cache_tool_max_bytes: int = int(os.getenv("CACHE_TOOL_MAX_BYTES", str(64 * 1024 * 1024)))
+    cache_tool_ttl_seconds: float = float(os.getenv("CACHE_TOOL_TTL_SECONDS", "3600"))
+
+    # Semantic RAG answer cache — cosine threshold for a hit (0 disables),
+    # past queries kept per (project, user, filters, corpus version) scope
+    rag_semantic_cache_threshold: float = float(os.getenv("RAG_SEMANTIC_CACHE_THRESHOLD", "0.95"))
+    rag_semantic_cache_max_per_scope: int = int(os.getenv("RAG_SEMANTIC_CACHE_MAX_PER_SCOPE", "200"))
+    rag_semantic_cache_max_scopes: int = int(os.getenv("RAG_SEMANTIC_CACHE_MAX_SCOPES", "1000"))
+    rag_semantic_cache_max_bytes: int = int(os.getenv("RAG_SEMANTIC_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+    rag_semantic_cache_ttl_seconds: float = float(os.getenv("RAG_SEMANTIC_CACHE_TTL_SECONDS", "86400"))
+
+    # L2 (persistent) cache backend: auto | supabase | sqlite | none
+    # auto = supabase when SUPABASE_URL is set, otherwise the local SQLite file
+    cache_l2_backend: str = os.getenv("CACHE_L2_BACKEND", "auto")
+    cache_sqlite_path: str = os.getenv("CACHE_SQLITE_PATH", "~/.cache/pm_agent/cache.db")
+
+    # L2 cache writes are buffered and flushed as batched writes
+    cache_l2_write_batch: int = int(os.getenv("CACHE_L2_WRITE_BATCH", "100"))
+    cache_l2_flush_seconds: float = float(os.getenv("CACHE_L2_FLUSH_SECONDS", "2.0"))
+
+    # In-process vector index over local interview files (CLI / offline mode).
+    # Brute-force scan up to the threshold, HNSW graph above it.
+    local_index_enabled: bool = os.getenv("LOCAL_INDEX_ENABLED", "true").lower() == "true"
+    local_index_hnsw_threshold: int = int(os.getenv("LOCAL_INDEX_HNSW_THRESHOLD", "20000"))
+    # Indexes kept in memory (one per set of interview files), LRU + idle TTL
+    local_index_max_sessions: int = int(os.getenv("LOCAL_INDEX_MAX_SESSIONS", "8"))
+    local_index_ttl_seconds: float = float(os.getenv("LOCAL_INDEX_TTL_SECONDS", "3600"))
+
     # ------------------------------------------------------------------
     # Persistent memory (mem0 pgvector backend)
     # Full PostgreSQL connection string from Supabase:
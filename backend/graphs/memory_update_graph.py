@@ -19,6 +19,8 @@ class MemoryState(TypedDict, total=False):
     run_type: str
     changed_sources: list[dict]
     changed_sources_count: int
+    chunks_embedded: int
+    chunks_reused: int
     memory_items_created: int
     conflicts_found: int
     snapshot_id: str
@@ -52,12 +54,19 @@ def detect_changed_sources(state: MemoryState) -> MemoryState:
 
 
 def rechunk_reembed(state: MemoryState) -> MemoryState:
+    """Re-ingest changed sources; unchanged chunks keep their embeddings."""
     db = get_supabase()
+    embedded = 0
+    reused = 0
     for src in state.get("changed_sources", []):
-        run_ingestion_pipeline(src["id"])
+        result = run_ingestion_pipeline(src["id"])
+        embedded += result.get("embedded_count", 0)
+        reused += result.get("reused_count", 0)
         db.table("sources").update(
             {"content_hash": src["content_hash"], "last_ingested_at": datetime.now(timezone.utc).isoformat()}
         ).eq("id", src["id"]).execute()
+    state["chunks_embedded"] = embedded
+    state["chunks_reused"] = reused
     return state
 
 
@@ -223,6 +232,8 @@ def run_memory_update(project_id: str, run_type: str = "manual_rebuild") -> dict
             "run_type": run_type,
             "stats": {
                 "changed_sources_count": result.get("changed_sources_count", 0),
+                "chunks_embedded": result.get("chunks_embedded", 0),
+                "chunks_reused": result.get("chunks_reused", 0),
                 "memory_items_created": result.get("memory_items_created", 0),
                 "conflicts_found": result.get("conflicts_found", 0),
                 "snapshot_id": result.get("snapshot_id"),
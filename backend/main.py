@@ -18,10 +18,15 @@ API overview:
     PATCH  /api/sources/{id}                  — Update source
     DELETE /api/sources/{id}                  — Delete source + chunks
     POST   /api/sources/process               — Ingest: extract → chunk → embed → store
+    POST   /api/sources/jobs                  — Queue ingestion as a background job
+    GET    /api/sources/jobs/{job_id}         — Job status + per-stage progress
+    GET    /api/sources/jobs/{job_id}/events  — Job progress as server-sent events
 
     # Search
     POST   /api/search/semantic               — pgvector semantic similarity search
     POST   /api/search/rag                    — RAG: memory recall + retrieve + generate
+    POST   /api/search/rag/async              — Non-blocking RAG; memory written in background
+    POST   /api/search/rag/stream             — Streaming RAG: tokens + citations over SSE
 
     # Synthesis
     POST   /api/synthesis/themes              — Pass 1: theme extraction (fast model)
@@ -65,10 +70,25 @@ API overview:
     GET    /health                            — Liveness check
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from backend.routers import interview, knowledge_graph, memory, projects, search, sources, synthesis
+from backend.services import ingestion_jobs
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # Pick up ingestion jobs queued before the last restart
+    ingestion_jobs.resume_queued_jobs()
+    yield
+    ingestion_jobs.shutdown(wait=False)
+    # Let queued RAG memory writes land before the process exits
+    from backend.services.memory import shutdown_memory_writer
+    shutdown_memory_writer(wait=True)
+
 
 app = FastAPI(
     title="Product Manager AI Backend",
@@ -79,6 +99,7 @@ app = FastAPI(
         "recursive evidence drilling."
     ),
     version="2.0.0",
+    lifespan=lifespan,
 )
 
 # Allow requests from the Next.js frontend (and any other origin in dev)
@@ -7,8 +7,11 @@ runs the full pipeline: synthesis → trends → correlations → comparison →
 API overview:
     # Entity extraction & graph
     POST   /api/knowledge-graph/entities/extract     — Extract entities from sources
-    GET    /api/knowledge-graph/entities/{project_id} — List entities
-    GET    /api/knowledge-graph/entities/{entity_id}/connections — Entity connections
+    GET    /api/knowledge-graph/entities/{project_id} — List entities (paged)
+    GET    /api/knowledge-graph/entities/{entity_id}/connections — Entity connections (paged)
+    GET    /api/knowledge-graph/entities/{entity_id}/neighbors   — Co-occurring entities (paged)
+    GET    /api/knowledge-graph/entities/{project_id}/graph      — Graph page: nodes + edges
+    POST   /api/knowledge-graph/entities/{project_id}/graph/rebuild — Recompute the graph
 
     # Snapshot comparison
     GET    /api/knowledge-graph/snapshots/{project_id} — List snapshots
@@ -41,6 +44,8 @@ from backend.schemas.models import (
     EntityConnectionsResponse,
     EntityExtractionRequest,
     EntityExtractionResponse,
+    EntityGraphResponse,
+    EntityNeighborsResponse,
     EntityResponse,
     SignalCorrelationRequest,
     SignalCorrelationResponse,
@@ -61,6 +66,11 @@ from backend.services.entity_extraction import (
     get_entity_connections,
     get_entity_graph,
 )
+from backend.services.entity_graph import (
+    get_entity_graph_page,
+    get_entity_neighbors,
+    rebuild_entity_adjacency,
+)
 from backend.services.signal_correlation import (
     detect_theme_relationships,
     get_signal_correlations,
@@ -103,14 +113,10 @@ router = APIRouter(prefix="/api/knowledge-graph", tags=["knowledge-graph"])
 def extract_entities(body: EntityExtractionRequest) -> EntityExtractionResponse:
     try:
         if body.source_id:
-            result = extract_entities_for_source(body.project_id, body.source_id)
-            return EntityExtractionResponse(
-                sources_processed=1,
-                entities_found=result["entities_found"],
-                mentions_created=result["mentions_created"],
-            )
+            result = extract_entities_for_source(body.project_id, body.source_id, body.force)
+            return EntityExtractionResponse(sources_processed=1, **result)
         else:
-            result = extract_entities_for_project(body.project_id)
+            result = extract_entities_for_project(body.project_id, body.force)
             return EntityExtractionResponse(**result)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
@@ -121,9 +127,14 @@ def extract_entities(body: EntityExtractionRequest) -> EntityExtractionResponse:
     response_model=list[EntityResponse],
     summary="List all entities in the knowledge graph",
 )
-def list_entities(project_id: str, entity_type: str | None = None) -> list[EntityResponse]:
+def list_entities(
+    project_id: str,
+    entity_type: str | None = None,
+    limit: int | None = None,
+    offset: int = 0,
+) -> list[EntityResponse]:
     try:
-        entities = get_entity_graph(project_id, entity_type)
+        entities = get_entity_graph(project_id, entity_type, limit, offset)
         return [EntityResponse(**e) for e in entities]
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
@@ -134,14 +145,56 @@ def list_entities(project_id: str, entity_type: str | None = None) -> list[Entit
     response_model=EntityConnectionsResponse,
     summary="Get all connections (chunks, sources) for an entity",
 )
-def entity_connections(entity_id: str) -> EntityConnectionsResponse:
+def entity_connections(
+    entity_id: str, limit: int | None = None, offset: int = 0
+) -> EntityConnectionsResponse:
     try:
-        result = get_entity_connections(entity_id)
+        result = get_entity_connections(entity_id, limit, offset)
         return EntityConnectionsResponse(**result)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
 
+@router.get(
+    "/entities/{entity_id}/neighbors",
+    response_model=EntityNeighborsResponse,
+    summary="Get an entity's precomputed co-occurrence neighbours",
+)
+def entity_neighbors(entity_id: str, limit: int = 20, offset: int = 0) -> EntityNeighborsResponse:
+    try:
+        return EntityNeighborsResponse(**get_entity_neighbors(entity_id, limit, offset))
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+
+@router.get(
+    "/entities/{project_id}/graph",
+    response_model=EntityGraphResponse,
+    summary="Get a page of the entity co-occurrence graph (nodes by chunk count)",
+)
+def entity_graph(
+    project_id: str,
+    entity_type: str | None = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> EntityGraphResponse:
+    try:
+        return EntityGraphResponse(**get_entity_graph_page(project_id, limit, offset, entity_type))
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+
+@router.post(
+    "/entities/{project_id}/graph/rebuild",
+    summary="Recompute the project's entity co-occurrence graph from all mentions",
+)
+def entity_graph_rebuild(project_id: str) -> dict:
+    try:
+        return {"rows_written": rebuild_entity_adjacency(project_id)}
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+
 # ---------------------------------------------------------------------------
 # Snapshot comparison
 # ---------------------------------------------------------------------------
@@ -332,7 +385,8 @@ def temporal_synthesis(body: TemporalSynthesisRequest) -> TemporalSynthesisRespo
 
     This is the primary entry point for the knowledge graph. It:
     1. Loads temporal context (previous themes, trends, correlations)
-    2. Runs the core synthesis pipeline (themes + opportunities + evidence drilling)
+    2. Runs the core synthesis pipeline (themes + opportunities + evidence drilling);
+       incrementally by default, so only new or changed sources are re-extracted
     3. Computes trend data (emerging, accelerating, declining themes)
     4. Detects theme relationships and signal correlations
     5. Compares with previous synthesis to generate "what changed"
@@ -356,6 +410,8 @@ def temporal_synthesis(body: TemporalSynthesisRequest) -> TemporalSynthesisRespo
             synthesis_id=synthesis_id,
             source_ids=body.source_ids,
             max_iterations=body.max_drill_down_iterations,
+            incremental=body.incremental,
+            previous_synthesis_id=temporal_context.get("previous_synthesis_id"),
         )
 
         # 3. Run entity extraction if requested
@@ -1,6 +1,9 @@
 """Search router — semantic search and RAG query endpoints."""
 
+import json
+
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 
 from backend.schemas.models import (
     RAGQueryRequest,
@@ -8,12 +11,22 @@ from backend.schemas.models import (
     SemanticSearchRequest,
     SemanticSearchResponse,
 )
-from backend.services.rag import run_rag_pipeline
+from backend.services.rag import run_rag_pipeline, run_rag_pipeline_async, stream_rag_pipeline
 from backend.services.semantic_search import semantic_search
 
 router = APIRouter(prefix="/api/search", tags=["search"])
 
 
+def _history(body: RAGQueryRequest) -> list[dict] | None:
+    if not body.conversation_history:
+        return None
+    return [msg.model_dump() for msg in body.conversation_history]
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 @router.post(
     "/semantic",
     response_model=SemanticSearchResponse,
@@ -72,3 +85,77 @@ def rag_query(body: RAGQueryRequest) -> RAGQueryResponse:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
     return RAGQueryResponse(**result)
+
+
+@router.post(
+    "/rag/async",
+    response_model=RAGQueryResponse,
+    summary="Non-blocking RAG query with concurrent recall and background memory writes",
+)
+async def rag_query_async(body: RAGQueryRequest) -> RAGQueryResponse:
+    """Same contract as POST /api/search/rag, served without blocking a worker thread.
+
+    Memory recall and chunk retrieval run concurrently, and the exchange is
+    written to memory in the background after the response is returned, so
+    a memory recalled immediately afterwards may not include it yet.
+    """
+    try:
+        result = await run_rag_pipeline_async(
+            project_id=body.project_id,
+            query=body.query,
+            user_id=body.user_id,
+            conversation_history=_history(body),
+            match_count=body.match_count,
+            source_types=body.source_types,
+            segment_tags=body.segment_tags,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+    return RAGQueryResponse(**result)
+
+
+@router.post(
+    "/rag/stream",
+    summary="Streaming RAG query: tokens and citations as server-sent events",
+)
+async def rag_query_stream(body: RAGQueryRequest) -> StreamingResponse:
+    """Run the RAG pipeline and stream the answer as it is generated.
+
+    SSE events, in order:
+        retrieved  {"retrieved_chunks": [...]}            — before generation
+        token      {"text": "..."}                        — each text delta
+        citation   {"chunk_id": "..."}                    — each new citation
+        done       {"answer", "cited_chunk_ids", "usage",  — final result
+                    "cached"}
+        error      {"detail": "..."}                      — generation failed
+    """
+    events = stream_rag_pipeline(
+        project_id=body.project_id,
+        query=body.query,
+        user_id=body.user_id,
+        conversation_history=_history(body),
+        match_count=body.match_count,
+        source_types=body.source_types,
+        segment_tags=body.segment_tags,
+    )
+    # Retrieval happens before the first event, so its errors still map to
+    # proper status codes instead of a broken stream
+    try:
+        first_event = await anext(events)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+    async def _stream():
+        yield _sse(*first_event)
+        try:
+            async for event in events:
+                yield _sse(*event)
+        except Exception as exc:
+            yield _sse("error", {"detail": str(exc)})
+
+    return StreamingResponse(_stream(), media_type="text/event-stream")
@@ -1,16 +1,29 @@
-"""Sources router — full CRUD + ingestion pipeline endpoint."""
+"""Sources router — full CRUD + ingestion pipeline endpoints."""
+
+import asyncio
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 
 from backend.db.supabase_client import get_supabase
 from backend.schemas.models import (
+    IngestionJobResponse,
     ProcessSourceRequest,
     ProcessSourceResponse,
     SourceCreate,
     SourceResponse,
     SourceUpdate,
 )
+from backend.services import cache_manager
 from backend.services.ingestion import run_ingestion_pipeline
+from backend.services.ingestion_jobs import (
+    TERMINAL_STATUSES,
+    get_ingestion_job,
+    submit_ingestion_job,
+)
+
+# Poll interval for the job status SSE stream
+_JOB_STREAM_INTERVAL_SECONDS = 0.5
 
 router = APIRouter(prefix="/api/sources", tags=["sources"])
 
@@ -97,7 +110,10 @@ def update_source(source_id: str, body: SourceUpdate) -> SourceResponse:
 )
 def delete_source(source_id: str) -> None:
     db = get_supabase()
-    db.table("sources").delete().eq("id", source_id).execute()
+    result = db.table("sources").delete().eq("id", source_id).execute()
+    # The project's chunk corpus changed — drop its cached RAG answers
+    for row in result.data or []:
+        cache_manager.bump_corpus_version(row["project_id"])
 
 
 @router.post(
@@ -108,8 +124,10 @@ def delete_source(source_id: str) -> None:
 def process_source(body: ProcessSourceRequest) -> ProcessSourceResponse:
     """Run the full ingestion pipeline for a source record.
 
-    Fetches the source from Supabase, extracts text, chunks it, embeds each
-    chunk via OpenAI, and upserts the chunk rows (with pgvector embeddings).
+    Fetches the source from Supabase, extracts text, chunks it, embeds the
+    chunks in batches, and upserts the chunk rows (with pgvector embeddings).
+
+    Runs inside the request — use POST /api/sources/jobs for large sources.
     """
     try:
         result = run_ingestion_pipeline(body.source_id)
@@ -118,3 +136,75 @@ def process_source(body: ProcessSourceRequest) -> ProcessSourceResponse:
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
     return ProcessSourceResponse(**result)
+
+
+def _job_response(job: dict) -> IngestionJobResponse:
+    return IngestionJobResponse(
+        job_id=job["id"],
+        source_id=job["source_id"],
+        status=job["status"],
+        attempts=job.get("attempts") or 0,
+        progress=job.get("progress") or {},
+        result=job.get("result"),
+        error=job.get("error"),
+        created_at=job.get("created_at"),
+        started_at=job.get("started_at"),
+        finished_at=job.get("finished_at"),
+    )
+
+
+@router.post(
+    "/jobs",
+    response_model=IngestionJobResponse,
+    status_code=202,
+    summary="Queue a source for background ingestion",
+)
+def submit_job(body: ProcessSourceRequest) -> IngestionJobResponse:
+    """Queue the ingestion pipeline for a source and return the job at once.
+
+    Poll GET /api/sources/jobs/{job_id} or stream
+    GET /api/sources/jobs/{job_id}/events for progress.
+    """
+    try:
+        job = submit_ingestion_job(body.source_id)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return _job_response(job)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=IngestionJobResponse,
+    summary="Get the status and progress of an ingestion job",
+)
+def get_job(job_id: str) -> IngestionJobResponse:
+    job = get_ingestion_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return _job_response(job)
+
+
+@router.get(
+    "/jobs/{job_id}/events",
+    summary="Stream ingestion job progress as server-sent events",
+)
+async def stream_job(job_id: str) -> StreamingResponse:
+    """Emit the job as an SSE `data:` event whenever it changes, until it finishes."""
+    job = await asyncio.to_thread(get_ingestion_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+
+    async def _events():
+        last_payload = None
+        current = job
+        while True:
+            payload = _job_response(current).model_dump_json()
+            if payload != last_payload:
+                yield f"data: {payload}\n\n"
+                last_payload = payload
+            if current["status"] in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(_JOB_STREAM_INTERVAL_SECONDS)
+            current = await asyncio.to_thread(get_ingestion_job, job_id) or current
+
+    return StreamingResponse(_events(), media_type="text/event-stream")
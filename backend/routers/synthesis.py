@@ -135,6 +135,8 @@ def run_synthesis(body: SynthesisGraphRequest) -> SynthesisGraphResponse:
        removing the need to chain two separate API requests.
 
     Set `max_drill_down_iterations=0` to replicate the original linear behaviour.
+    Set `incremental=true` to re-extract only new or changed sources and fold
+    them into the previous synthesis's themes.
     """
     model_label = body.model_used or settings.fast_model
     try:
@@ -146,6 +148,7 @@ def run_synthesis(body: SynthesisGraphRequest) -> SynthesisGraphResponse:
             synthesis_id=synthesis_id,
             source_ids=body.source_ids,
             max_iterations=body.max_drill_down_iterations,
+            incremental=body.incremental,
         )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
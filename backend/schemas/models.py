@@ -72,6 +72,33 @@ class ProcessSourceRequest(BaseModel):
 class ProcessSourceResponse(BaseModel):
     source_id: str
     chunk_count: int
+    embedded_count: int = Field(0, description="Chunks that were new or changed and got embedded.")
+    reused_count: int = Field(0, description="Unchanged chunks whose rows and embeddings were kept.")
+    deleted_count: int = Field(0, description="Stale chunk rows removed by the diff step.")
+    embed_seconds: float = Field(0.0, description="Wall time spent embedding chunks.")
+    entity_mentions_created: int = Field(
+        0, description="Entity mentions extracted from the newly written chunks."
+    )
+
+
+class IngestionJobProgress(BaseModel):
+    stage: str = "queued"
+    chunks_processed: int = 0
+    chunks_embedded: int = 0
+    rows_written: int = 0
+
+
+class IngestionJobResponse(BaseModel):
+    job_id: str
+    source_id: str
+    status: str = Field(..., description="queued, running, retrying, succeeded or failed.")
+    attempts: int = 0
+    progress: IngestionJobProgress
+    result: ProcessSourceResponse | None = None
+    error: str | None = None
+    created_at: str | None = None
+    started_at: str | None = None
+    finished_at: str | None = None
 
 
 # ---------------------------------------------------------------------------
@@ -135,6 +162,9 @@ class RAGQueryResponse(BaseModel):
     cited_chunk_ids: list[str]
     retrieved_chunks: list[RetrievedChunkPreview]
     usage: dict
+    cached: bool = Field(
+        False, description="True when served from the semantic answer cache (usage is then zero)."
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -193,6 +223,13 @@ class SynthesisGraphRequest(BaseModel):
             "Higher = more thorough but slower."
         ),
     )
+    incremental: bool = Field(
+        False,
+        description=(
+            "Only extract themes from sources added or changed since earlier runs "
+            "and fold them into the previous synthesis's themes."
+        ),
+    )
 
 
 class SynthesisGraphResponse(BaseModel):
@@ -341,12 +378,17 @@ class EntityExtractionRequest(BaseModel):
     source_id: str | None = Field(
         None, description="Extract from a specific source. If omitted, extracts from all."
     )
+    force: bool = Field(
+        False, description="Re-extract every chunk, not just new or changed ones."
+    )
 
 
 class EntityExtractionResponse(BaseModel):
     sources_processed: int = 0
     entities_found: int = 0
     mentions_created: int = 0
+    chunks_processed: int = Field(0, description="New or changed chunks extracted in this run.")
+    chunks_skipped: int = Field(0, description="Chunks already extracted with the same content and extractor.")
 
 
 class EntityResponse(BaseModel):
@@ -370,6 +412,30 @@ class EntityConnectionsResponse(BaseModel):
     chunk_ids: list[str]
 
 
+class EntityNeighborsResponse(BaseModel):
+    entity_id: str
+    chunk_count: int = Field(0, description="Chunks mentioning the entity.")
+    source_count: int = Field(0, description="Sources mentioning the entity.")
+    neighbors: list[dict] = Field(
+        default_factory=list,
+        description=(
+            "Co-occurring entities, best first: {entity_id, canonical_name, entity_type, "
+            "shared_chunks, shared_sources, score}."
+        ),
+    )
+    total: int = Field(0, description="Precomputed neighbours available (ENTITY_GRAPH_TOP_K cap).")
+    limit: int
+    offset: int
+
+
+class EntityGraphResponse(BaseModel):
+    nodes: list[dict]
+    edges: list[dict] = Field(..., description="{source, target, shared_chunks, score}, one per entity pair.")
+    total: int = Field(0, description="Entities with graph rows in the project.")
+    limit: int
+    offset: int
+
+
 # ---------------------------------------------------------------------------
 # Knowledge Graph — Snapshot Comparison
 # ---------------------------------------------------------------------------
@@ -458,6 +524,13 @@ class TemporalSynthesisRequest(BaseModel):
     extract_entities: bool = Field(
         True, description="Run entity extraction after synthesis."
     )
+    incremental: bool = Field(
+        True,
+        description=(
+            "Reuse theme extractions for unchanged sources and fold new themes "
+            "into the previous synthesis. False re-extracts everything."
+        ),
+    )
 
 
 class TemporalSynthesisResponse(BaseModel):
@@ -0,0 +1,179 @@
+"""Bounded in-process cache with LRU + TTL eviction and byte-size accounting.
+
+Used by cache_manager for its L1 layers so a long-lived worker's cache memory
+stays capped no matter how many unique texts / prompts it sees.
+
+    cache = BoundedCache(max_entries=10_000, max_bytes=64 * 1024 * 1024, ttl_seconds=3600)
+    cache.set(key, value)
+    cache.get(key)          # → value, or None if missing / expired
+    cache.stats()           # → {entries, bytes, evictions, expirations, ...}
+
+Limits set to 0 are disabled (e.g. ttl_seconds=0 → entries never expire).
+Entries are evicted least-recently-used first whenever either the entry or
+byte limit would be exceeded. All operations are thread-safe.
+
+Any object implementing the CacheBackend protocol can stand in for it.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, Protocol
+
+
+class CacheBackend(Protocol):
+    """Interface cache_manager relies on for an L1 layer."""
+
+    def get(self, key: Hashable) -> Any | None: ...
+    def set(self, key: Hashable, value: Any) -> None: ...
+    def pop(self, key: Hashable) -> Any | None: ...
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> int: ...
+    def clear(self) -> None: ...
+    def reset_counters(self) -> None: ...
+    def stats(self) -> dict: ...
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate the memory footprint of a cached value in bytes.
+
+    Containers are measured shallowly plus their elements one level deep,
+    which is exact enough for the flat lists / strings / buffers we cache.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        size += sum(sys.getsizeof(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    return size
+
+
+class BoundedCache:
+    """Thread-safe LRU cache bounded by entry count, total bytes and entry age."""
+
+    def __init__(
+        self,
+        max_entries: int = 0,
+        max_bytes: int = 0,
+        ttl_seconds: float = 0,
+        sizeof: Callable[[Any], int] = estimate_size,
+    ) -> None:
+        self.max_entries = max(0, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self.ttl_seconds = max(0.0, float(ttl_seconds))
+        self._sizeof = sizeof
+        # key → (value, size_bytes, stored_at)
+        self._data: OrderedDict[Hashable, tuple[Any, int, float]] = OrderedDict()
+        self._bytes = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key) is not None
+
+    # ── internal (caller holds the lock) ─────────────────────────────────
+
+    def _remove(self, key: Hashable) -> Any:
+        value, size, _ = self._data.pop(key)
+        self._bytes -= size
+        return value
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - stored_at > self.ttl_seconds
+
+    def _enforce_limits(self) -> None:
+        while self._data and (
+            (self.max_entries and len(self._data) > self.max_entries)
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self._evictions += 1
+
+    # ── public API ───────────────────────────────────────────────────────
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the value for *key* (marking it recently used) or None."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, _, stored_at = entry
+            if self._expired(stored_at, time.monotonic()):
+                self._remove(key)
+                self._expirations += 1
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Insert or replace *key*, evicting LRU entries if over capacity."""
+        size = self._sizeof(value)
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            if self.max_bytes and size > self.max_bytes:
+                # Would evict everything and still not fit — don't cache it
+                self._evictions += 1
+                return
+            self._data[key] = (value, size, time.monotonic())
+            self._bytes += size
+            self._enforce_limits()
+
+    def pop(self, key: Hashable) -> Any | None:
+        """Remove *key* and return its value (None if absent)."""
+        with self._lock:
+            if key not in self._data:
+                return None
+            return self._remove(key)
+
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Remove every entry whose key matches *predicate*; returns the count."""
+        with self._lock:
+            stale = [k for k in self._data if predicate(k)]
+            for k in stale:
+                self._remove(k)
+            return len(stale)
+
+    def purge_expired(self) -> int:
+        """Drop all expired entries now instead of lazily on access."""
+        if self.ttl_seconds <= 0:
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            stale = [k for k, (_, _, ts) in self._data.items() if self._expired(ts, now)]
+            for k in stale:
+                self._remove(k)
+            self._expirations += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self._evictions = 0
+            self._expirations = 0
+
+    def stats(self) -> dict:
+        """Snapshot of size and eviction counters."""
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+            }
@@ -0,0 +1,291 @@
+"""Persistent (L2) backends for cache_manager's embedding and LLM caches.
+
+cache_manager keeps hot entries in its bounded in-process L1 and falls back
+to one of these for anything that should survive a restart:
+
+  supabase — `agent_embedding_cache` / `agent_llm_cache` tables
+             (db/migrations/0007_embedding_cache_float32.sql)
+  sqlite   — a local SQLite file in WAL mode (CACHE_SQLITE_PATH); for the CLI,
+             eval runs and any deployment without Supabase
+  none     — no persistence; L1 only
+
+Selected with CACHE_L2_BACKEND (default "auto": supabase when SUPABASE_URL is
+set, otherwise sqlite).
+
+Every backend works on hashed keys and batches: get_* takes a list of hashes
+and returns only the ones it has; put_* takes a {hash: value} mapping and
+writes it in one round trip / transaction. Vectors are float32 arrays.
+
+Concurrency: the SQLite backend opens one connection per thread (and per
+process — connections are reopened after a fork), uses WAL so readers never
+block the writer, and waits on a busy timeout instead of failing when another
+worker process holds the write lock. Several API workers and CLI sessions
+can share one cache file.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import sys
+import threading
+from array import array
+from collections.abc import Callable
+from typing import Protocol
+
+from backend.config import settings
+
+# PostgREST puts `.in_()` filters in the URL — keep pages well under its limit
+_SUPABASE_READ_PAGE = 100
+# Stay under SQLite's default SQLITE_MAX_VARIABLE_NUMBER on older builds
+_SQLITE_READ_PAGE = 500
+
+
+class L2Backend(Protocol):
+    """Interface cache_manager relies on for persistent storage."""
+
+    name: str
+
+    def get_embeddings(self, hashes: list[str]) -> dict[str, array]: ...
+    def put_embeddings(self, vectors: dict[str, array]) -> None: ...
+    def get_llm_responses(self, hashes: list[str]) -> dict[str, str]: ...
+    def put_llm_responses(self, responses: dict[str, str]) -> None: ...
+
+
+def _pages(keys: list[str], size: int):
+    for start in range(0, len(keys), size):
+        yield keys[start:start + size]
+
+
+# ── float32 <-> bytes ─────────────────────────────────────────────────────
+
+def _to_le_bytes(packed: array) -> bytes:
+    """Little-endian bytes of a float32 array (the on-disk format everywhere)."""
+    if sys.byteorder != "little":
+        packed = array("f", packed)
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _from_le_bytes(data: bytes) -> array:
+    packed = array("f", data)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed
+
+
+def to_bytea(packed: array) -> str:
+    """Encode a float32 array as a PostgREST bytea hex literal."""
+    return "\\x" + _to_le_bytes(packed).hex()
+
+
+def from_bytea(value: str) -> array:
+    """Decode a PostgREST bytea hex literal back into a float32 array."""
+    return _from_le_bytes(bytes.fromhex(value[2:] if value.startswith("\\x") else value))
+
+
+# ── none ──────────────────────────────────────────────────────────────────
+
+class NullL2:
+    """No persistence — every lookup misses, every write is dropped."""
+
+    name = "none"
+
+    def get_embeddings(self, hashes: list[str]) -> dict[str, array]:
+        return {}
+
+    def put_embeddings(self, vectors: dict[str, array]) -> None:
+        pass
+
+    def get_llm_responses(self, hashes: list[str]) -> dict[str, str]:
+        return {}
+
+    def put_llm_responses(self, responses: dict[str, str]) -> None:
+        pass
+
+
+# ── supabase ──────────────────────────────────────────────────────────────
+
+class SupabaseL2:
+    """Supabase tables, read with paged `.in_()` filters and written by upsert."""
+
+    name = "supabase"
+
+    def __init__(self, get_db: Callable[[], object | None]) -> None:
+        # Resolved per call so a missing / unconfigured client degrades to a miss
+        self._get_db = get_db
+
+    def _select(self, table: str, key_column: str, columns: str, keys: list[str]) -> list[dict]:
+        db = self._get_db()
+        if db is None or not keys:
+            return []
+        rows: list[dict] = []
+        for page in _pages(keys, _SUPABASE_READ_PAGE):
+            result = db.table(table).select(columns).in_(key_column, page).execute()
+            rows.extend(result.data or [])
+        return rows
+
+    def _upsert(self, table: str, rows: list[dict]) -> None:
+        db = self._get_db()
+        if db is not None and rows:
+            db.table(table).upsert(rows).execute()
+
+    @staticmethod
+    def _embedding_row(h: str, packed: array) -> dict:
+        # `vector` is always sent so batched upsert rows share one column set
+        return {"text_hash": h, "vector_f32": to_bytea(packed), "vector": None}
+
+    def get_embeddings(self, hashes: list[str]) -> dict[str, array]:
+        found: dict[str, array] = {}
+        backfill: list[dict] = []
+        rows = self._select(
+            "agent_embedding_cache", "text_hash", "text_hash, vector_f32, vector", hashes
+        )
+        for row in rows:
+            if row.get("vector_f32"):
+                found[row["text_hash"]] = from_bytea(row["vector_f32"])
+            elif isinstance(row.get("vector"), list):
+                # Row written before float32 storage — migrate it in place
+                packed = array("f", row["vector"])
+                found[row["text_hash"]] = packed
+                backfill.append(self._embedding_row(row["text_hash"], packed))
+        if backfill:
+            try:
+                self._upsert("agent_embedding_cache", backfill)
+            except Exception:
+                pass
+        return found
+
+    def put_embeddings(self, vectors: dict[str, array]) -> None:
+        self._upsert(
+            "agent_embedding_cache",
+            [self._embedding_row(h, packed) for h, packed in vectors.items()],
+        )
+
+    def get_llm_responses(self, hashes: list[str]) -> dict[str, str]:
+        rows = self._select("agent_llm_cache", "prompt_hash", "prompt_hash, response", hashes)
+        return {row["prompt_hash"]: row["response"] for row in rows if row.get("response") is not None}
+
+    def put_llm_responses(self, responses: dict[str, str]) -> None:
+        self._upsert(
+            "agent_llm_cache",
+            [{"prompt_hash": h, "response": r} for h, r in responses.items()],
+        )
+
+
+# ── sqlite ────────────────────────────────────────────────────────────────
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    text_hash   TEXT PRIMARY KEY,
+    vector_f32  BLOB NOT NULL,
+    created_at  INTEGER NOT NULL DEFAULT (strftime('%s', 'now'))
+);
+CREATE TABLE IF NOT EXISTS llm_cache (
+    prompt_hash TEXT PRIMARY KEY,
+    response    TEXT NOT NULL,
+    created_at  INTEGER NOT NULL DEFAULT (strftime('%s', 'now'))
+);
+"""
+
+
+class SQLiteL2:
+    """Local SQLite file in WAL mode, shared safely by threads and processes."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str, busy_timeout_seconds: float = 30.0) -> None:
+        self.path = os.path.expanduser(path)
+        self.busy_timeout_seconds = busy_timeout_seconds
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, reopening it after a fork."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_seconds,
+            isolation_level=None,  # explicit BEGIN / COMMIT below
+            check_same_thread=True,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._schema_lock:
+            if not self._schema_ready:
+                conn.executescript(_SQLITE_SCHEMA)
+                self._schema_ready = True
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _select(self, sql: str, keys: list[str]) -> list[tuple]:
+        if not keys:
+            return []
+        conn = self._connect()
+        rows: list[tuple] = []
+        for page in _pages(keys, _SQLITE_READ_PAGE):
+            placeholders = ",".join("?" * len(page))
+            rows.extend(conn.execute(sql.format(placeholders), page).fetchall())
+        return rows
+
+    def _write(self, sql: str, params: list[tuple]) -> None:
+        if not params:
+            return
+        conn = self._connect()
+        # IMMEDIATE takes the write lock up front, so concurrent writers queue
+        # on busy_timeout rather than failing part-way through the batch
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(sql, params)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get_embeddings(self, hashes: list[str]) -> dict[str, array]:
+        rows = self._select(
+            "SELECT text_hash, vector_f32 FROM embedding_cache WHERE text_hash IN ({})", hashes
+        )
+        return {h: _from_le_bytes(blob) for h, blob in rows}
+
+    def put_embeddings(self, vectors: dict[str, array]) -> None:
+        self._write(
+            "INSERT OR REPLACE INTO embedding_cache (text_hash, vector_f32) VALUES (?, ?)",
+            [(h, _to_le_bytes(packed)) for h, packed in vectors.items()],
+        )
+
+    def get_llm_responses(self, hashes: list[str]) -> dict[str, str]:
+        rows = self._select(
+            "SELECT prompt_hash, response FROM llm_cache WHERE prompt_hash IN ({})", hashes
+        )
+        return dict(rows)
+
+    def put_llm_responses(self, responses: dict[str, str]) -> None:
+        self._write(
+            "INSERT OR REPLACE INTO llm_cache (prompt_hash, response) VALUES (?, ?)",
+            list(responses.items()),
+        )
+
+
+# ── selection ─────────────────────────────────────────────────────────────
+
+def make_l2_backend(get_db: Callable[[], object | None], name: str | None = None) -> L2Backend:
+    """Build the L2 backend named by *name* (default: CACHE_L2_BACKEND)."""
+    name = (name or settings.cache_l2_backend).lower()
+    if name == "auto":
+        name = "supabase" if settings.supabase_url else "sqlite"
+    if name == "supabase":
+        return SupabaseL2(get_db)
+    if name == "sqlite":
+        return SQLiteL2(settings.cache_sqlite_path)
+    if name == "none":
+        return NullL2()
+    raise ValueError(f"Unknown CACHE_L2_BACKEND '{name}'. Choose from: auto, supabase, sqlite, none")
@@ -1,23 +1,27 @@
-"""Four-layer cache coordinator for the PM agent.
+"""Five-layer cache coordinator for the PM agent.
 
 All methods degrade gracefully — exceptions return None, never crash.
 
 Cache layers
 ------------
-1. Embedding cache    — L1: process-level dict  |  L2: Supabase `agent_embedding_cache`
-                        key: sha256(text) → list[float]  (stored as JSONB)
-2. Tool result cache  — In-memory dict, session-scoped (never persisted)
+1. Embedding cache    — L1: bounded process LRU |  L2: `agent_embedding_cache`
+                        key: sha256(text) → float32 vector  (array('f') / bytea)
+2. Tool result cache  — In-memory LRU, session-scoped (never persisted)
                         key: (tool_name, sha256(args), session_id) → str
-3. LLM response cache — L1: process-level dict  |  L2: Supabase `agent_llm_cache`
+3. LLM response cache — L1: bounded process LRU |  L2: `agent_llm_cache`
                         key: sha256(prompt_key) → str
 4. Anthropic prompt cache — server-side, zero local state needed
                              (enabled via cache_control headers in react_loop.py)
+5. Semantic answer cache — In-memory, keyed by (project_id, user_id, filters,
+                           corpus version); matched by query-embedding cosine
+                           ≥ RAG_SEMANTIC_CACHE_THRESHOLD → RAG result dict
 
-Required Supabase tables (run once in the SQL editor)
-------------------------------------------------------
+Required Supabase tables (see db/migrations/0007_embedding_cache_float32.sql)
+-----------------------------------------------------------------------------
     CREATE TABLE IF NOT EXISTS agent_embedding_cache (
         text_hash   TEXT PRIMARY KEY,
-        vector      JSONB  NOT NULL,
+        vector_f32  BYTEA,             -- little-endian float32, 4 bytes/dim
+        vector      JSONB,             -- legacy rows only; migrated on read
         created_at  TIMESTAMPTZ DEFAULT NOW()
     );
 
@@ -27,18 +31,57 @@ Required Supabase tables (run once in the SQL editor)
         created_at  TIMESTAMPTZ DEFAULT NOW()
     );
 
-If SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY are not set, or if the tables
-do not yet exist, all operations fall back silently to the in-process L1
-dicts (no error is raised, caches just don't persist across restarts).
-
-Stats: get_stats() -> {hits, misses, tokens_saved}
+L2 backend (cache_l2.py)
+------------------------
+CACHE_L2_BACKEND picks where L2 lives:
+
+    auto      (default) supabase if SUPABASE_URL is set, otherwise sqlite
+    supabase  the tables above
+    sqlite    local WAL-mode file at CACHE_SQLITE_PATH
+              (~/.cache/pm_agent/cache.db) — safe to share between processes
+    none      L1 only
+
+If the chosen backend is unreachable (Supabase not configured, tables not
+yet created, file not writable), all operations fall back silently to the
+in-process L1 caches (no error is raised, caches just don't persist).
+
+L1 bounds
+---------
+Every in-process layer is a BoundedCache (LRU + TTL + byte accounting) sized
+from config.Settings:
+
+    CACHE_EMBEDDING_MAX_ENTRIES / _MAX_BYTES / _TTL_SECONDS
+    CACHE_LLM_MAX_ENTRIES       / _MAX_BYTES / _TTL_SECONDS
+    CACHE_TOOL_MAX_ENTRIES      / _MAX_BYTES / _TTL_SECONDS
+
+Corpus versions
+---------------
+Every successful re-ingestion or source deletion calls
+bump_corpus_version(project_id) (Supabase `project_corpus_versions`, see
+db/migrations/0008_rag_semantic_cache.sql). Semantic-cache scopes embed the
+version, so answers computed against an older corpus are never served again —
+in any API process — and this process drops them immediately.
+
+Stats: get_stats() -> {hits, misses, tokens_saved, evictions,
+                       semantic: {hits, misses, hit_rate, tokens_saved},
+                       l1: {embedding|llm|tool|semantic: {entries, bytes, ...}}}
 """
 
 from __future__ import annotations
 
+import atexit
 import hashlib
 import json
+import math
+import operator
 import threading
+from array import array
+from collections.abc import Callable, Sequence
+
+from backend.config import settings
+from backend.services.bounded_cache import BoundedCache, CacheBackend
+from backend.services.cache_l2 import L2Backend, make_l2_backend
+from backend.services.scoring import cosine_scores
 
 # ── Hashing helpers ───────────────────────────────────────────────────────
 
@@ -67,18 +110,37 @@ def _inc_misses() -> None:
         _stats["misses"] += 1
 
 
+def _inc_counts(hits: int, misses: int) -> None:
+    with _stats_lock:
+        _stats["hits"] += hits
+        _stats["misses"] += misses
+
+
 def get_stats() -> dict:
-    """Return a snapshot of cache statistics."""
+    """Return a snapshot of cache statistics, including L1 size and evictions."""
+    with _stats_lock:
+        stats: dict = dict(_stats)
+    layers = {name: layer.stats() for name, layer in _l1_layers().items()}
+    stats["evictions"] = sum(layer["evictions"] for layer in layers.values())
     with _stats_lock:
-        return dict(_stats)
+        semantic: dict = dict(_semantic_stats)
+    lookups = semantic["hits"] + semantic["misses"]
+    semantic["hit_rate"] = round(semantic["hits"] / lookups, 4) if lookups else 0.0
+    stats["semantic"] = semantic
+    stats["l1"] = layers
+    return stats
 
 
 def reset_stats() -> None:
-    """Reset all counters to zero."""
+    """Reset all counters to zero (cached entries are kept)."""
     with _stats_lock:
         _stats["hits"] = 0
         _stats["misses"] = 0
         _stats["tokens_saved"] = 0
+        for key in _semantic_stats:
+            _semantic_stats[key] = 0
+    for layer in _l1_layers().values():
+        layer.reset_counters()
 
 
 # ── Supabase client helper ────────────────────────────────────────────────
@@ -92,70 +154,176 @@ def _get_db():
         return None
 
 
-# ── 1. Embedding cache (L1: process dict, L2: Supabase) ──────────────────
+# ── L2 backend + write batching ───────────────────────────────────────────
+#
+# The persistent layer is pluggable (cache_l2.py): Supabase, a local SQLite
+# file, or nothing, chosen by CACHE_L2_BACKEND. Multi-key lookups send every
+# L1 miss to the backend in one batched read.
+#
+# Writes are buffered per cache and flushed as one batched write when
+# CACHE_L2_WRITE_BATCH entries are pending, CACHE_L2_FLUSH_SECONDS after the
+# first pending write, on flush_l2_writes(), or at interpreter exit.
+
+_l2_backend: L2Backend | None = None
+_l2_lock = threading.Lock()
+
+
+def _get_l2() -> L2Backend:
+    """Return the configured L2 backend, creating it on first use."""
+    global _l2_backend
+    with _l2_lock:
+        if _l2_backend is None:
+            _l2_backend = make_l2_backend(_get_db)
+        return _l2_backend
+
+
+class _L2WriteBuffer:
+    """Collects entries for one L2 cache and writes them in a single batch."""
+
+    def __init__(self, write: Callable[[L2Backend, dict], None]) -> None:
+        self._write = write
+        self._pending: dict[str, object] = {}  # hash → value (last write wins)
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+
+    def add(self, key: str, value: object) -> None:
+        with self._lock:
+            self._pending[key] = value
+            full = len(self._pending) >= max(1, settings.cache_l2_write_batch)
+            if not full and self._timer is None:
+                self._timer = threading.Timer(settings.cache_l2_flush_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending = dict(self._pending)
+            self._pending.clear()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending:
+            return
+        try:
+            self._write(_get_l2(), pending)
+        except Exception:
+            pass
+
+
+def flush_l2_writes() -> None:
+    """Write every buffered L2 entry now (called automatically at exit)."""
+    _emb_l2_writes.flush()
+    _llm_l2_writes.flush()
+
+
+# ── 1. Embedding cache (L1: bounded LRU, L2: backend) ────────────────────
+#
+# Vectors are held as packed float32 (array('f'), 4 bytes per dimension)
+# instead of Python float lists (~32 bytes per dimension), and stored in L2
+# as little-endian float32 bytea. Lookups return a read-only memoryview over
+# the cached array — no copy — which iterates / indexes like a float list and
+# can be wrapped zero-copy by numpy.frombuffer(view, dtype=numpy.float32).
+
+def pack_vector(vector) -> array:
+    """Pack any float sequence into a float32 array (no-op for array('f'))."""
+    if isinstance(vector, array) and vector.typecode == "f":
+        return vector
+    return array("f", vector)
+
+
+def _view(packed: array) -> memoryview:
+    return memoryview(packed).toreadonly()
+
+
+_emb_l1: CacheBackend = BoundedCache(
+    max_entries=settings.cache_embedding_max_entries,
+    max_bytes=settings.cache_embedding_max_bytes,
+    ttl_seconds=settings.cache_embedding_ttl_seconds,
+)
+_emb_l2_writes = _L2WriteBuffer(lambda l2, pending: l2.put_embeddings(pending))
+
+
+def get_embedding_cached(text: str) -> Sequence[float] | None:
+    """Return a read-only float32 view of a cached embedding, or None."""
+    try:
+        return get_embeddings_cached_many([text]).get(text.strip())
+    except Exception:
+        return None
 
-_emb_l1: dict[str, list[float]] = {}
-_emb_lock = threading.Lock()
 
+def get_embeddings_cached_many(texts: list[str]) -> dict[str, Sequence[float]]:
+    """Resolve many embeddings at once: L1 first, then one batched L2 read.
 
-def get_embedding_cached(text: str) -> list[float] | None:
-    """Return a cached embedding vector or None."""
+    Returns {stripped_text: read-only float32 view} for every text found;
+    texts missing from both layers are simply absent from the result.
+    """
+    found: dict[str, Sequence[float]] = {}
     try:
-        h = _hash(text.strip())
+        by_hash: dict[str, str] = {}
+        for text in texts:
+            normalized = text.strip()
+            h = _hash(normalized)
+            packed = _emb_l1.get(h)
+            if packed is not None:
+                found[normalized] = _view(packed)
+            else:
+                by_hash[h] = normalized
+
+        if by_hash:
+            for h, packed in _get_l2().get_embeddings(list(by_hash)).items():
+                normalized = by_hash.get(h)
+                if normalized is None:
+                    continue
+                _emb_l1.set(h, packed)
+                found[normalized] = _view(packed)
+    except Exception:
+        pass
 
-        # L1 hit
-        with _emb_lock:
-            if h in _emb_l1:
-                _inc_hits()
-                return _emb_l1[h]
+    _inc_counts(len(found), len({t.strip() for t in texts}) - len(found))
+    return found
 
-        # L2 hit (Supabase)
-        db = _get_db()
-        if db is not None:
-            result = (
-                db.table("agent_embedding_cache")
-                .select("vector")
-                .eq("text_hash", h)
-                .execute()
-            )
-            if result.data:
-                vector = result.data[0]["vector"]
-                # Supabase returns JSONB as a Python list directly
-                if isinstance(vector, list):
-                    with _emb_lock:
-                        _emb_l1[h] = vector
-                    _inc_hits()
-                    return vector
 
-        _inc_misses()
-        return None
-    except Exception:
-        return None
+def store_embedding(text: str, vector: Sequence[float]) -> Sequence[float]:
+    """Persist an embedding vector to L1 and L2 as packed float32.
 
+    Returns the read-only float32 view that later cache hits will return, so
+    callers can hand out the same representation on a miss.
+    """
+    return store_embeddings_many({text: vector}).get(text.strip(), vector)
 
-def store_embedding(text: str, vector: list[float]) -> None:
-    """Persist an embedding vector to L1 and Supabase."""
-    try:
-        h = _hash(text.strip())
-        with _emb_lock:
-            _emb_l1[h] = vector
-    except Exception:
-        pass
 
-    try:
-        db = _get_db()
-        if db is not None:
-            db.table("agent_embedding_cache").upsert(
-                {"text_hash": h, "vector": vector}
-            ).execute()
-    except Exception:
-        pass
+def store_embeddings_many(vectors: dict[str, Sequence[float]]) -> dict[str, Sequence[float]]:
+    """Persist many embeddings; L2 writes go through the batched upsert buffer.
+
+    Returns {stripped_text: read-only float32 view}.
+    """
+    stored: dict[str, Sequence[float]] = {}
+    for text, vector in vectors.items():
+        normalized = text.strip()
+        try:
+            packed = pack_vector(vector)
+        except Exception:
+            stored[normalized] = vector
+            continue
+        stored[normalized] = _view(packed)
+        try:
+            h = _hash(normalized)
+            _emb_l1.set(h, packed)
+            _emb_l2_writes.add(h, packed)
+        except Exception:
+            pass
+    return stored
 
 
 # ── 2. Tool result cache (in-memory, session-scoped) ─────────────────────
 
-_tool_cache: dict[tuple[str, str, str], str] = {}
-_tool_lock = threading.Lock()
+_tool_cache: CacheBackend = BoundedCache(
+    max_entries=settings.cache_tool_max_entries,
+    max_bytes=settings.cache_tool_max_bytes,
+    ttl_seconds=settings.cache_tool_ttl_seconds,
+)
 
 
 def get_tool_result_cached(
@@ -166,8 +334,7 @@ def get_tool_result_cached(
     """Return a cached tool result or None."""
     try:
         key = (tool_name, _args_hash(args), session_id)
-        with _tool_lock:
-            result = _tool_cache.get(key)
+        result = _tool_cache.get(key)
         if result is not None:
             _inc_hits()
             return result
@@ -186,8 +353,7 @@ def store_tool_result(
     """Store a tool result in the session-scoped in-memory cache."""
     try:
         key = (tool_name, _args_hash(args), session_id)
-        with _tool_lock:
-            _tool_cache[key] = result
+        _tool_cache.set(key, result)
     except Exception:
         pass
 
@@ -195,67 +361,197 @@ def store_tool_result(
 def clear_tool_cache_for_session(session_id: str) -> None:
     """Evict all entries for the given session."""
     try:
-        with _tool_lock:
-            stale = [k for k in _tool_cache if k[2] == session_id]
-            for k in stale:
-                del _tool_cache[k]
+        _tool_cache.discard_where(lambda k: k[2] == session_id)
     except Exception:
         pass
 
 
-# ── 3. LLM response cache (L1: process dict, L2: Supabase) ───────────────
+# ── 3. LLM response cache (L1: bounded LRU, L2: backend) ─────────────────
+
+_llm_l1: CacheBackend = BoundedCache(
+    max_entries=settings.cache_llm_max_entries,
+    max_bytes=settings.cache_llm_max_bytes,
+    ttl_seconds=settings.cache_llm_ttl_seconds,
+)
+
 
-_llm_l1: dict[str, str] = {}
-_llm_lock = threading.Lock()
+_llm_l2_writes = _L2WriteBuffer(lambda l2, pending: l2.put_llm_responses(pending))
 
 
 def get_llm_response(prompt_key: str) -> str | None:
     """Return a cached LLM response string or None."""
+    try:
+        return get_llm_responses_many([prompt_key]).get(prompt_key)
+    except Exception:
+        return None
+
+
+def get_llm_responses_many(prompt_keys: list[str]) -> dict[str, str]:
+    """Resolve many LLM responses at once: L1 first, then one batched L2 read.
+
+    Returns {prompt_key: response} for every key found.
+    """
+    found: dict[str, str] = {}
+    try:
+        by_hash: dict[str, str] = {}
+        for key in prompt_keys:
+            h = _hash(key)
+            response = _llm_l1.get(h)
+            if response is not None:
+                found[key] = response
+            else:
+                by_hash[h] = key
+
+        if by_hash:
+            for h, response in _get_l2().get_llm_responses(list(by_hash)).items():
+                key = by_hash.get(h)
+                if key is None:
+                    continue
+                _llm_l1.set(h, response)
+                found[key] = response
+    except Exception:
+        pass
+
+    _inc_counts(len(found), len(set(prompt_keys)) - len(found))
+    return found
+
+
+def store_llm_response(prompt_key: str, response: str) -> None:
+    """Persist an LLM response to L1 and (buffered) L2."""
     try:
         h = _hash(prompt_key)
+        _llm_l1.set(h, response)
+        _llm_l2_writes.add(h, response)
+    except Exception:
+        pass
+
+
+# ── 5. Semantic answer cache (in-memory, corpus-versioned) ───────────────
+#
+# One BoundedCache entry per scope (project, user, filters, corpus version)
+# holding up to RAG_SEMANTIC_CACHE_MAX_PER_SCOPE (unit query vector, result,
+# tokens) triples. A lookup scores that short list in one vectorised cosine
+# pass (services/scoring.py).
+
+_semantic_stats: dict[str, int] = {"hits": 0, "misses": 0, "tokens_saved": 0}
+_semantic_lock = threading.Lock()
+_corpus_versions: dict[str, int] = {}  # local fallback when Supabase is unavailable
+
+
+def _semantic_entries_size(entries: list) -> int:
+    return sum(vec.buffer_info()[1] * vec.itemsize + len(json.dumps(result, default=str))
+               for vec, result, _ in entries)
+
+
+_semantic_cache: CacheBackend = BoundedCache(
+    max_entries=settings.rag_semantic_cache_max_scopes,
+    max_bytes=settings.rag_semantic_cache_max_bytes,
+    ttl_seconds=settings.rag_semantic_cache_ttl_seconds,
+    sizeof=_semantic_entries_size,
+)
+
+
+def _unit_vector(vector: Sequence[float]) -> array | None:
+    packed = pack_vector(vector)
+    norm = math.sqrt(sum(map(operator.mul, packed, packed)))
+    if norm == 0:
+        return None
+    return array("f", (x / norm for x in packed))
 
-        # L1 hit
-        with _llm_lock:
-            if h in _llm_l1:
-                _inc_hits()
-                return _llm_l1[h]
 
-        # L2 hit (Supabase)
+def get_corpus_version(project_id: str) -> int:
+    """Current chunk-corpus version of a project (0 if never bumped)."""
+    try:
         db = _get_db()
         if db is not None:
             result = (
-                db.table("agent_llm_cache")
-                .select("response")
-                .eq("prompt_hash", h)
+                db.table("project_corpus_versions")
+                .select("version")
+                .eq("project_id", project_id)
                 .execute()
             )
-            if result.data:
-                response = result.data[0]["response"]
-                with _llm_lock:
-                    _llm_l1[h] = response
-                _inc_hits()
-                return response
-
-        _inc_misses()
-        return None
+            version = int(result.data[0]["version"]) if result.data else 0
+            _corpus_versions[project_id] = version
+            return version
     except Exception:
-        return None
+        pass
+    return _corpus_versions.get(project_id, 0)
 
 
-def store_llm_response(prompt_key: str, response: str) -> None:
-    """Persist an LLM response to L1 and Supabase."""
+def bump_corpus_version(project_id: str) -> int:
+    """Mark a project's chunks as changed, invalidating its semantic answers."""
+    version = _corpus_versions.get(project_id, 0) + 1
     try:
-        h = _hash(prompt_key)
-        with _llm_lock:
-            _llm_l1[h] = response
+        db = _get_db()
+        if db is not None:
+            result = db.rpc("bump_corpus_version", {"p_project_id": project_id}).execute()
+            if isinstance(result.data, int):
+                version = result.data
     except Exception:
         pass
+    _corpus_versions[project_id] = version
+    try:
+        _semantic_cache.discard_where(lambda scope: scope[0] == project_id)
+    except Exception:
+        pass
+    return version
+
+
+def semantic_cache_scope(project_id: str, filters: dict, user_id: str | None = None) -> tuple:
+    """Build the scope key for a RAG query (reads the project's corpus version)."""
+    return (project_id, user_id or "", _args_hash(filters), get_corpus_version(project_id))
+
 
+def get_semantic_answer(scope: tuple, query_vector: Sequence[float]) -> dict | None:
+    """Return the cached result of the most similar past query in *scope*.
+
+    Only matches with cosine ≥ RAG_SEMANTIC_CACHE_THRESHOLD count as hits.
+    """
+    best, best_score, tokens = None, settings.rag_semantic_cache_threshold, 0
     try:
-        db = _get_db()
-        if db is not None:
-            db.table("agent_llm_cache").upsert(
-                {"prompt_hash": h, "response": response}
-            ).execute()
+        unit = _unit_vector(query_vector)
+        entries = _semantic_cache.get(scope) or []
+        if unit is not None and entries:
+            scores = cosine_scores(unit, [vec for vec, _, _ in entries])
+            for (_, result, entry_tokens), score in zip(entries, scores):
+                if score >= best_score:
+                    best, best_score, tokens = result, score, entry_tokens
+    except Exception:
+        best = None
+
+    with _stats_lock:
+        key = "hits" if best is not None else "misses"
+        _semantic_stats[key] += 1
+        _semantic_stats["tokens_saved"] += tokens if best is not None else 0
+    if best is None:
+        _inc_misses()
+        return None
+    _inc_hits(tokens_saved=tokens)
+    return best
+
+
+def store_semantic_answer(
+    scope: tuple,
+    query_vector: Sequence[float],
+    result: dict,
+    tokens: int = 0,
+) -> None:
+    """Remember *result* for *scope*; *tokens* is what a future hit saves."""
+    try:
+        unit = _unit_vector(query_vector)
+        if unit is None:
+            return
+        with _semantic_lock:
+            entries = list(_semantic_cache.get(scope) or [])
+            entries.append((unit, result, tokens))
+            limit = max(1, settings.rag_semantic_cache_max_per_scope)
+            _semantic_cache.set(scope, entries[-limit:])
     except Exception:
         pass
+
+
+def _l1_layers() -> dict[str, CacheBackend]:
+    return {"embedding": _emb_l1, "llm": _llm_l1, "tool": _tool_cache, "semantic": _semantic_cache}
+
+
+atexit.register(flush_l2_writes)
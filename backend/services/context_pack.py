@@ -1,7 +1,8 @@
 """Context pack assembly with compact always-on index + on-demand evidence."""
 
 from backend.db.supabase_client import get_supabase
-from backend.services.hybrid_search import hybrid_search_chunks, hybrid_search_memory_items
+from backend.services.hybrid_search import hybrid_search_memory_items
+from backend.services.retrieval import HybridChunkRetriever, retrieve
 
 
 def _estimate_tokens(payload: dict) -> int:
@@ -32,17 +33,18 @@ def get_context_pack(project_id: str, task_type: str, query: str, budget_tokens:
         if m.get("type") in {"constraint", "decision", "metric", "persona", "glossary", "snapshot", "theme_taxonomy"}
     ][:12]
 
-    chunk_candidates = hybrid_search_chunks(project_id=project_id, query=query, match_count=30)
-    seen_sources: set[str] = set()
-    evidence_chunks: list[dict] = []
-    for row in chunk_candidates:
-        src = row.get("source_id")
-        if src in seen_sources:
-            continue
-        evidence_chunks.append(row)
-        seen_sources.add(src)
-        if len(evidence_chunks) >= 10:
-            break
+    # Top 10 chunks, at most one per source
+    evidence = retrieve(
+        query,
+        [HybridChunkRetriever(project_id)],
+        k=10,
+        per_retriever_k=30,
+        max_per_source=1,
+    )
+    if evidence["errors"]:
+        # The engine tolerates failing retrievers; a pack with no evidence must not
+        raise RuntimeError(f"evidence retrieval failed: {evidence['errors']}")
+    evidence_chunks = evidence["candidates"]
 
     pack = {
         "index": index_text,
@@ -58,6 +60,8 @@ def get_context_pack(project_id: str, task_type: str, query: str, budget_tokens:
             }
             for m in filtered_memory
         ],
+        # Same shape as the hybrid_search_chunks rows, without the engine's
+        # fusion bookkeeping (score / retrievers / ranks)
         "evidence_chunks": [
             {
                 "chunk_id": c.get("chunk_id"),
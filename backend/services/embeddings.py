@@ -8,13 +8,35 @@ Supported providers
 
 The public interface (create_embedding / to_pgvector_literal) is unchanged so
 ingestion and semantic search work without modification.
+
+Bulk callers (ingestion) should use create_embeddings_batch(), which resolves
+cache hits first and sends the misses to the provider's embed_documents in
+batches bounded by EMBED_BATCH_SIZE texts and EMBED_BATCH_MAX_TOKENS tokens.
+
+Every provider call draws from one process-wide token budget
+(EMBED_TOKENS_PER_MINUTE, 0 = unlimited), so concurrent ingestion jobs share
+the provider quota instead of each hitting rate limits on its own.
+
+Query embeddings (create_embedding / create_query_embeddings) that miss the
+cache are coalesced: identical texts already in flight share one result, and
+distinct texts requested within EMBED_COALESCE_WINDOW_MS of each other — by
+any thread — go to the provider together in one call. Fan-out callers
+(several searches for one question) therefore cost one round trip.
 """
 
+import json
+import threading
+from collections.abc import Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
 from functools import lru_cache
 
 from langchain_core.embeddings import Embeddings
 
 from backend.config import settings
+from backend.services.rate_limit import TokenBucket
+
+# Shared provider budget across all threads / ingestion jobs in this process
+_embed_budget = TokenBucket(per_minute=settings.embed_tokens_per_minute)
 
 
 @lru_cache(maxsize=1)
@@ -64,15 +86,17 @@ def _get_embedder() -> Embeddings:
     )
 
 
-def create_embedding(text: str) -> list[float]:
+def create_embedding(text: str) -> Sequence[float]:
     """Embed a single text string using the configured embedding model.
 
-    Returns a list of floats (dimension depends on model — 1536 for
-    text-embedding-3-small, 3072 for text-embedding-3-large).
+    Returns a read-only float32 sequence (dimension depends on model — 1536
+    for text-embedding-3-small, 3072 for text-embedding-3-large). Use
+    list(vector) if a mutable list is needed.
     Raises ValueError for empty input.
 
-    Results are cached in SQLite (~/.cache/pm_agent/embeddings.db) to
-    avoid redundant API calls across sessions.
+    Results are cached via cache_manager (process L1 + persistent L2 —
+    Supabase or a local SQLite file, see CACHE_L2_BACKEND) to avoid
+    redundant API calls across sessions.
     """
     normalized = text.strip()
     if not normalized:
@@ -83,11 +107,218 @@ def create_embedding(text: str) -> list[float]:
     if cached is not None:
         return cached
 
-    vector = _get_embedder().embed_query(normalized)
-    cache_manager.store_embedding(normalized, vector)
-    return vector
+    return _query_coalescer.submit(normalized).result()
+
+
+def create_query_embeddings(texts: list[str]) -> list[Sequence[float]]:
+    """Embed several search queries at once (query-side embeddings).
+
+    Cache hits are returned directly; the misses are submitted to the
+    coalescer together, so they share one provider call (and any identical
+    query another thread is embedding right now).
+    Raises ValueError if any input is empty.
+    """
+    normalized = [t.strip() for t in texts]
+    if any(not t for t in normalized):
+        raise ValueError("Cannot embed empty text.")
+
+    from backend.services import cache_manager
+    vectors: dict[str, Sequence[float]] = cache_manager.get_embeddings_cached_many(normalized)
+    futures = {t: _query_coalescer.submit(t) for t in dict.fromkeys(normalized) if t not in vectors}
+    for text, future in futures.items():
+        vectors[text] = future.result()
+    return [vectors[t] for t in normalized]
+
+
+# Providers whose embed_query(text) is exactly embed_documents([text])[0], so
+# a batch of queries can be sent as one embed_documents call. Others (e.g.
+# Cohere, which tags queries and documents differently) embed queries one by one.
+_QUERY_BATCH_PROVIDERS = frozenset({"openai", "ollama"})
+
+
+def _embed_query_texts(texts: list[str]) -> list[list[float]]:
+    embedder = _get_embedder()
+    _embed_budget.acquire(sum(_estimate_tokens(t) for t in texts))
+    if len(texts) > 1 and settings.embedding_provider in _QUERY_BATCH_PROVIDERS:
+        return embedder.embed_documents(texts)
+    return [embedder.embed_query(t) for t in texts]
+
+
+class _QueryCoalescer:
+    """Dedupes in-flight query texts and micro-batches concurrent requests.
+
+    The first text submitted to an empty batch starts a timer; everything
+    submitted before it fires (or until EMBED_COALESCE_MAX_BATCH texts are
+    waiting) is embedded in one provider call on the timer thread.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._futures: dict[str, Future] = {}  # text → result, pending or in flight
+        self._batch: list[str] = []
+
+    def submit(self, text: str) -> Future:
+        """Return a future for *text*'s vector, joining an in-flight one if any."""
+        window = settings.embed_coalesce_window_ms / 1000.0
+        with self._lock:
+            future = self._futures.get(text)
+            if future is not None:
+                return future
+            future = Future()
+            self._futures[text] = future
+            self._batch.append(text)
+            batch_started = len(self._batch) == 1
+            full = len(self._batch) >= max(1, settings.embed_coalesce_max_batch)
+            if full or window <= 0:
+                batch, self._batch = self._batch, []
+            else:
+                batch = None
+
+        if batch is not None:
+            self._flush(batch)
+        elif batch_started:
+            timer = threading.Timer(window, self._flush_current)
+            timer.daemon = True
+            timer.start()
+        return future
+
+    def _flush_current(self) -> None:
+        with self._lock:
+            batch, self._batch = self._batch, []
+        if batch:
+            self._flush(batch)
+
+    def _flush(self, batch: list[str]) -> None:
+        from backend.services import cache_manager
+        with self._lock:
+            futures = {t: self._futures[t] for t in batch}
+        try:
+            vectors = cache_manager.get_embeddings_cached_many(batch)
+            misses = [t for t in batch if t not in vectors]
+            if misses:
+                fresh = dict(zip(misses, _embed_query_texts(misses)))
+                vectors.update(cache_manager.store_embeddings_many(fresh))
+            for text, future in futures.items():
+                future.set_result(vectors[text])
+        except BaseException as exc:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(exc)
+        finally:
+            with self._lock:
+                for text in batch:
+                    self._futures.pop(text, None)
+
+
+_query_coalescer = _QueryCoalescer()
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (~4 chars per token) used for batch packing."""
+    return max(1, len(text) // 4)
+
+
+def _pack_batches(
+    texts: list[str],
+    max_items: int,
+    max_tokens: int,
+) -> list[list[str]]:
+    """Greedily pack texts into batches bounded by item count and token estimate.
+
+    A single text larger than *max_tokens* still gets its own batch — the
+    provider is responsible for truncating it.
+    """
+    batches: list[list[str]] = []
+    current: list[str] = []
+    current_tokens = 0
+
+    for text in texts:
+        tokens = _estimate_tokens(text)
+        if current and (
+            len(current) >= max_items or current_tokens + tokens > max_tokens
+        ):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def create_embeddings_batch(texts: list[str]) -> list[Sequence[float]]:
+    """Embed many texts with as few provider round trips as possible.
+
+    1. Normalise and de-duplicate the inputs.
+    2. Resolve what we can from cache_manager (L1, then one batched L2 read).
+    3. Pack the misses into token-aware batches and send each through
+       embed_documents (batches run concurrently, EMBED_CONCURRENCY wide).
+    4. Store the new vectors back into the cache (batched L2 upsert).
+
+    Returns one read-only float32 vector per input text, in input order
+    (duplicate inputs share the same vector object).
+    Raises ValueError if any input is empty.
+    """
+    normalized = [t.strip() for t in texts]
+    if not normalized:
+        return []
+    if any(not t for t in normalized):
+        raise ValueError("Cannot embed empty text.")
+
+    from backend.services import cache_manager
+
+    unique = list(dict.fromkeys(normalized))
+    vectors: dict[str, Sequence[float]] = cache_manager.get_embeddings_cached_many(unique)
+    misses = [t for t in unique if t not in vectors]
+
+    if misses:
+        batches = _pack_batches(
+            misses,
+            max_items=max(1, settings.embed_batch_size),
+            max_tokens=max(1, settings.embed_batch_max_tokens),
+        )
+        embedder = _get_embedder()
+
+        def _embed(batch: list[str]) -> list[list[float]]:
+            _embed_budget.acquire(sum(_estimate_tokens(t) for t in batch))
+            return embedder.embed_documents(batch)
+
+        if len(batches) == 1:
+            results = [_embed(batches[0])]
+        else:
+            workers = max(1, min(settings.embed_concurrency, len(batches)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_embed, batches))
+
+        fresh: dict[str, Sequence[float]] = {}
+        for idx, (batch, batch_vectors) in enumerate(zip(batches, results)):
+            # zip() would silently drop the texts the provider returned no vector for
+            if len(batch_vectors) != len(batch):
+                raise RuntimeError(
+                    f"Embedding batch {idx + 1}/{len(batches)} returned "
+                    f"{len(batch_vectors)} vectors for {len(batch)} texts "
+                    f"(first text: {batch[0][:80]!r})"
+                )
+            fresh.update(zip(batch, batch_vectors))
+        vectors.update(cache_manager.store_embeddings_many(fresh))
+
+    return [vectors[t] for t in normalized]
+
+
+def to_pgvector_literal(vector: Sequence[float]) -> str:
+    """Format a float sequence as a pgvector literal string, e.g. '[0.1,0.2,...]'.
+
+    pgvector stores float4, so 9 significant digits round-trip exactly and
+    keep the literal short.
+    """
+    return f"[{','.join(format(v, '.9g') for v in vector)}]"
 
 
-def to_pgvector_literal(vector: list[float]) -> str:
-    """Format a float list as a pgvector literal string, e.g. '[0.1,0.2,...]'."""
-    return f"[{','.join(str(v) for v in vector)}]"
+def from_pgvector_literal(value) -> list[float] | None:
+    """Parse a pgvector column as returned by PostgREST ('[0.1,...]' or a list)."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = json.loads(value) if value.strip() else None
+    return [float(x) for x in value] if value else None
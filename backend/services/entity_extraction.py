@@ -4,39 +4,76 @@ Extracts named entities (people, products, features, segments, companies, concep
 from feedback chunks and links them across documents to build the knowledge graph.
 
 Pipeline:
-  1. For each chunk, use the fast LLM to extract entities with types
-  2. Match extracted entities against existing canonical entries (fuzzy + semantic)
-  3. Create new entity records or update mention counts on existing ones
-  4. Store entity_mentions linking entities ↔ chunks ↔ sources
+  1. Pack chunks into batches (ENTITY_BATCH_MAX_CHUNKS / ENTITY_BATCH_MAX_CHARS)
+     and extract each batch with one fast-LLM call; batches run concurrently
+     (ENTITY_MAX_CONCURRENCY, shared LLM token budget). Per-chunk results are
+     cached, so a chunk whose content was seen before costs no call.
+  2. Resolve each mention in process (services/entity_resolver.py): exact
+     name, alias, then name-embedding cosine against the project's entities
+  3. Accumulate new entities, mention-count deltas / alias updates and mentions
+  4. Flush them at the end of the run: entities through the
+     apply_entity_mentions RPC, mentions as bulk inserts; then update the
+     materialised co-occurrence graph (services/entity_graph.py)
+
+Several workers may extract for the same project at once, each resolving
+against its own cached resolver. mention_count is therefore only ever
+changed by deltas applied in the database, and new entities are upserted on
+the unique (project_id, entity_type, lower(canonical_name)) key: when another
+worker created the same entity first, the mentions are moved onto its row.
+
+Runs are incremental: entity_extraction_watermarks records, per chunk, the
+content hash and extractor version (prompt + model) it was last processed
+with, and only chunks without a matching watermark are extracted. A chunk
+that is processed again first has its previous mentions removed (and their
+entities' mention counts decremented), so reruns never double-count. The
+ingestion pipeline calls extract_entities_for_chunks for the chunks it just
+wrote (ENTITY_EXTRACTION_ON_INGEST).
 """
 
+import hashlib
 import json
+import logging
+import uuid
+from collections import Counter
+from collections.abc import Sequence
+from datetime import datetime, timezone
 
-from langchain_core.messages import HumanMessage, SystemMessage
-
+from backend.config import settings
 from backend.db.supabase_client import get_supabase
-from backend.services.embeddings import create_embedding, to_pgvector_literal
+from backend.services import cache_manager
+from backend.services.embeddings import create_embeddings_batch, to_pgvector_literal
+from backend.services.entity_graph import get_entity_adjacency, update_entity_adjacency
+from backend.services.entity_resolver import get_entity_resolver, invalidate_entity_resolver
 from backend.services.llm import get_fast_llm
-from backend.services.synthesis import _parse_json_response
+from backend.services.synthesis import _invoke_json, _parse_json_response, _run_concurrently
+
+logger = logging.getLogger(__name__)
 
 
-_ENTITY_EXTRACTION_PROMPT = """\
+_BATCH_EXTRACTION_PROMPT = """\
 You are an expert at extracting named entities from product feedback and user research.
 
-Given a chunk of text, extract all meaningful entities. For each entity:
+You are given several chunks of text, each introduced by its chunk_id. Extract all
+meaningful entities from every chunk, keeping each entity with the chunk it appears in.
+For each entity:
 - canonical_name: the normalized, standard name
 - entity_type: one of: person, product, feature, segment, company, concept
-- mention_text: the exact text span in the source
+- mention_text: the exact text span in that chunk
 - confidence: 0.0 to 1.0
 
 Output ONLY valid JSON:
 {
-  "entities": [
+  "chunks": [
     {
-      "canonical_name": "string",
-      "entity_type": "person|product|feature|segment|company|concept",
-      "mention_text": "exact text from source",
-      "confidence": 0.85
+      "chunk_id": "uuid from the input",
+      "entities": [
+        {
+          "canonical_name": "string",
+          "entity_type": "person|product|feature|segment|company|concept",
+          "mention_text": "exact text from that chunk",
+          "confidence": 0.85
+        }
+      ]
     }
   ]
 }
@@ -46,45 +83,406 @@ Rules:
 - Features should be specific (e.g. "dark mode", "CSV export"), not vague ("the feature")
 - Concepts are abstract themes or patterns (e.g. "onboarding friction", "data portability")
 - Merge slight variations: "CSV export" and "csv exporting" → "CSV Export"
-- If no entities are found, return {"entities": []}"""
+- Use the same canonical_name for the same entity across chunks
+- Chunks without entities may be omitted"""
 
 
-def _match_existing_entity(
-    project_id: str,
-    canonical_name: str,
-    entity_type: str,
-) -> dict | None:
-    """Find an existing entity by exact canonical name match or alias match."""
-    db = get_supabase()
+# Bump when the extraction prompts change so cached responses are not reused
+_EXTRACTION_PROMPT_VERSION = "v1"
 
-    # Exact canonical name match
-    resp = (
-        db.table("entities")
-        .select("id, canonical_name, aliases, mention_count")
-        .eq("project_id", project_id)
-        .eq("entity_type", entity_type)
-        .ilike("canonical_name", canonical_name)
-        .limit(1)
-        .execute()
-    )
-    if resp.data:
-        return resp.data[0]
+_ENTITY_TYPES = ("person", "product", "feature", "segment", "company", "concept")
 
-    # Check aliases — use containedBy for array overlap
-    resp = (
-        db.table("entities")
-        .select("id, canonical_name, aliases, mention_count")
-        .eq("project_id", project_id)
-        .eq("entity_type", entity_type)
-        .contains("aliases", [canonical_name.lower()])
-        .limit(1)
-        .execute()
+# Supabase caps a single select at 1000 rows
+_SELECT_PAGE_SIZE = 1000
+# Ids per in_() filter, so request URLs stay well under proxy limits
+_ID_FILTER_PAGE_SIZE = 200
+
+
+def _extraction_cache_key(content: str) -> str:
+    """LLM-cache key for one chunk's extraction response."""
+    return f"entity_extraction:{_EXTRACTION_PROMPT_VERSION}:{content}"
+
+
+def _extractor_version() -> str:
+    """Watermark version: a chunk is re-extracted when the prompt or model changes."""
+    return f"{_EXTRACTION_PROMPT_VERSION}:{settings.fast_model}"
+
+
+def _chunk_hash(chunk: dict) -> str:
+    """The chunk's stored content_hash, or the same sha256 ingestion would store."""
+    return chunk.get("content_hash") or hashlib.sha256(
+        (chunk.get("content") or "").encode("utf-8")
+    ).hexdigest()
+
+
+def _pages(rows: list, size: int):
+    for start in range(0, len(rows), max(1, size)):
+        yield rows[start:start + max(1, size)]
+
+
+# ---------------------------------------------------------------------------
+# Batched extraction
+# ---------------------------------------------------------------------------
+
+def _batch_for_extraction(chunks: list[dict]) -> list[list[dict]]:
+    """Pack chunks into batches of at most ENTITY_BATCH_MAX_CHUNKS / _MAX_CHARS."""
+    batches: list[list[dict]] = []
+    current: list[dict] = []
+    current_chars = 0
+    for chunk in chunks:
+        cost = len(chunk.get("content", "")) + 60  # chunk_id header
+        if current and (
+            len(current) >= settings.entity_batch_max_chunks
+            or current_chars + cost > settings.entity_batch_max_chars
+        ):
+            batches.append(current)
+            current, current_chars = [], 0
+        current.append(chunk)
+        current_chars += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _batch_message(batch: list[dict]) -> str:
+    blocks = "\n\n".join(f"chunk_id: {c['id']}\n{c['content']}" for c in batch)
+    return f"Extract entities from each of these {len(batch)} chunks:\n\n{blocks}"
+
+
+def _extract_raw_entities(chunks: list[dict]) -> dict[str, list[dict]]:
+    """Raw model entities per chunk id, from the cache or batched model calls.
+
+    A batch that still fails after its retries is logged and skipped; its
+    chunks are not cached, so the next run retries them.
+    """
+    keys = {c["id"]: _extraction_cache_key(c["content"]) for c in chunks}
+    cached = cache_manager.get_llm_responses_many(list(dict.fromkeys(keys.values())))
+
+    by_chunk: dict[str, list[dict]] = {}
+    pending: list[dict] = []
+    for chunk in chunks:
+        try:
+            by_chunk[chunk["id"]] = _parse_json_response(cached[keys[chunk["id"]]]).get("entities", [])
+        except (KeyError, ValueError):
+            pending.append(chunk)
+
+    batches = _batch_for_extraction(pending)
+    if not batches:
+        return by_chunk
+    llm = get_fast_llm()
+
+    def _run(batch_idx: int) -> list[dict]:
+        batch = batches[batch_idx]
+        label = f"entity extraction batch {batch_idx + 1}/{len(batches)}"
+        try:
+            parsed = _invoke_json(llm, _BATCH_EXTRACTION_PROMPT, _batch_message(batch), label)
+        except Exception as exc:
+            logger.warning("%s skipped: %s", label, exc)
+            return []
+        found = {c["id"]: [] for c in batch}
+        for item in parsed.get("chunks", []):
+            if item.get("chunk_id") in found:
+                found[item["chunk_id"]].extend(item.get("entities") or [])
+        for chunk in batch:
+            cache_manager.store_llm_response(
+                keys[chunk["id"]], json.dumps({"entities": found[chunk["id"]]})
+            )
+        return [{"chunk_id": cid, "entities": ents} for cid, ents in found.items()]
+
+    results = _run_concurrently(
+        _run, len(batches), "Entity extraction", "batches",
+        workers=settings.entity_max_concurrency,
     )
-    if resp.data:
-        return resp.data[0]
+    for batch_results in results:
+        for item in batch_results:
+            by_chunk[item["chunk_id"]] = item["entities"]
+    logger.info(
+        "entity extraction: %d chunks, %d from cache, %d model calls",
+        len(chunks), len(chunks) - len(pending), len(batches),
+    )
+    return by_chunk
+
+
+# ---------------------------------------------------------------------------
+# Resolution + bulk writes
+# ---------------------------------------------------------------------------
+
+class _GraphWrites:
+    """New entities, entity updates and mentions accumulated for one bulk flush.
+
+    Mentions resolve through the project's cached EntityResolver; entities
+    created here are added to it straight away, so later mentions in the same
+    run (and later runs) match them without a database round trip.
+    """
+
+    def __init__(self, project_id: str) -> None:
+        self.project_id = project_id
+        self.resolver = get_entity_resolver(project_id)
+        self.created: dict[str, dict] = {}   # id → new entity
+        self.vectors: dict[str, Sequence[float]] = {}  # new entity id → name embedding
+        self.updated: dict[str, dict] = {}   # id → existing entity (mutated in place)
+        self.deltas: Counter[str] = Counter()  # id → mention_count change
+        self.mentions: list[dict] = []
+        self.retracted_chunk_ids: list[str] = []
+        self.retracted_entity_ids: set[str] = set()
+        self.watermarks: list[dict] = []
+
+    def retract(self, chunk_ids: list[str]) -> int:
+        """Queue removal of the mentions previously extracted from *chunk_ids*; returns their number."""
+        db = get_supabase()
+        retracted = 0
+        for page in _pages(chunk_ids, _ID_FILTER_PAGE_SIZE):
+            previous = (
+                db.table("entity_mentions")
+                .select("entity_id, chunk_id")
+                .in_("chunk_id", page)
+                .execute()
+                .data
+                or []
+            )
+            retracted += len(previous)
+            for mention in previous:
+                # Decremented by id, so entities this resolver has not loaded yet count too
+                self.retracted_entity_ids.add(mention["entity_id"])
+                self.deltas[mention["entity_id"]] -= 1
+                entity = self.resolver.get(mention["entity_id"])
+                if entity is not None:
+                    entity["mention_count"] = max(0, entity.get("mention_count", 0) - 1)
+        self.retracted_chunk_ids.extend(chunk_ids)
+        return retracted
+
+    def mark_processed(self, chunks: list[dict]) -> None:
+        version = _extractor_version()
+        self.watermarks.extend(
+            {"chunk_id": c["id"], "content_hash": _chunk_hash(c), "extractor_version": version}
+            for c in chunks
+        )
+
+    def add_mention(self, chunk: dict, raw: dict, vector: Sequence[float] | None = None) -> None:
+        canonical_name = raw["canonical_name"]
+        entity_type = raw["entity_type"]
+
+        entity = self.resolver.resolve(canonical_name, entity_type, vector)
+        if entity is None:
+            entity = {
+                "id": str(uuid.uuid4()),
+                "entity_type": entity_type,
+                "canonical_name": canonical_name,
+                "aliases": [canonical_name.lower()],
+                "mention_count": 0,
+            }
+            self.created[entity["id"]] = entity
+            self.vectors[entity["id"]] = vector
+            self.resolver.add(entity, vector)
+        elif entity["id"] not in self.created:
+            self.updated[entity["id"]] = entity
+
+        entity["mention_count"] = entity.get("mention_count", 0) + 1
+        self.deltas[entity["id"]] += 1
+        aliases = entity.setdefault("aliases", [])
+        if (
+            canonical_name.lower() not in [a.lower() for a in aliases]
+            and canonical_name.lower() != entity["canonical_name"].lower()
+        ):
+            aliases.append(canonical_name.lower())
+            self.resolver.add_alias(entity, canonical_name)
+
+        self.mentions.append({
+            "entity_id": entity["id"],
+            "chunk_id": chunk["id"],
+            "source_id": chunk["source_id"],
+            "mention_text": (raw.get("mention_text") or "")[:500],
+            "confidence": float(raw.get("confidence", 0.8)),
+        })
+
+    def flush(self) -> list[dict]:
+        """Write everything accumulated; returns the inserted mention rows.
+
+        On failure the project's resolver, which already reflects these
+        writes, is dropped so the next run reloads it from the database.
+        """
+        try:
+            return self._write()
+        except Exception:
+            invalidate_entity_resolver(self.project_id)
+            raise
+
+    def _write(self) -> list[dict]:
+        db = get_supabase()
+        page_size = settings.chunk_insert_page_size
+        now = datetime.now(timezone.utc).isoformat()
+
+        for page in _pages(self.retracted_chunk_ids, _ID_FILTER_PAGE_SIZE):
+            db.table("entity_mentions").delete().in_("chunk_id", page).execute()
+
+        landed = self._apply_entity_changes(db)
+        moved = {old: new for old, new in landed.items() if new and new != old}
+        if moved:
+            # Another worker created some of these entities first: point the
+            # mentions at its rows and reload the resolver next run
+            for mention in self.mentions:
+                mention["entity_id"] = moved.get(mention["entity_id"], mention["entity_id"])
+            invalidate_entity_resolver(self.project_id)
+
+        inserted: list[dict] = []
+        for page in _pages(self.mentions, page_size):
+            inserted.extend(db.table("entity_mentions").insert(page).execute().data or [])
+
+        # Written last: a run that fails before this point is redone next time
+        for page in _pages([{**w, "processed_at": now} for w in self.watermarks], page_size):
+            db.table("entity_extraction_watermarks").upsert(page).execute()
+
+        # The co-occurrence graph is derived data: log rather than fail the run
+        if self.mentions or self.retracted_chunk_ids:
+            try:
+                update_entity_adjacency(
+                    self.project_id, self.mentions, self.retracted_chunk_ids, self.retracted_entity_ids
+                )
+            except Exception as exc:
+                logger.warning("entity adjacency update for %s failed: %s", self.project_id, exc)
+        return inserted
+
+
+    def _apply_entity_changes(self, db) -> dict[str, str]:
+        """Apply mention-count deltas, aliases and new entities in the database.
+
+        Returns, per entity id sent, the id of the row the change landed on.
+        """
+        changes = []
+        for entity_id in dict.fromkeys([*self.created, *self.updated, *self.deltas]):
+            change = {"id": entity_id, "delta": self.deltas[entity_id]}
+            if entity_id in self.created:
+                e = self.created[entity_id]
+                change.update(
+                    entity_type=e["entity_type"],
+                    canonical_name=e["canonical_name"],
+                    aliases=e["aliases"],
+                    embedding=to_pgvector_literal(self.vectors[entity_id]),
+                )
+            elif entity_id in self.updated:
+                change["aliases"] = self.updated[entity_id].get("aliases") or []
+            changes.append(change)
+
+        landed: dict[str, str] = {}
+        for page in _pages(changes, settings.chunk_insert_page_size):
+            rows = (
+                db.rpc(
+                    "apply_entity_mentions",
+                    {"input_project_id": self.project_id, "changes": page},
+                ).execute().data
+                or []
+            )
+            landed.update((r["requested_id"], r["entity_id"]) for r in rows)
+        return landed
+
+
+def _pending_chunks(chunks: list[dict]) -> list[dict]:
+    """The chunks whose watermark is missing or differs in content hash / version."""
+    db = get_supabase()
+    version = _extractor_version()
+    done: dict[str, str] = {}
+    for page in _pages([c["id"] for c in chunks], _ID_FILTER_PAGE_SIZE):
+        rows = (
+            db.table("entity_extraction_watermarks")
+            .select("chunk_id, content_hash")
+            .in_("chunk_id", page)
+            .eq("extractor_version", version)
+            .execute()
+            .data
+            or []
+        )
+        done.update((r["chunk_id"], r["content_hash"]) for r in rows)
+    return [c for c in chunks if done.get(c["id"]) != _chunk_hash(c)]
 
-    return None
 
+def _extract_entities_for_chunks(project_id: str, chunks: list[dict], force: bool = False) -> dict:
+    """Extract, resolve and persist entities for *chunks* that need it.
+
+    Returns: {mentions: [created mention rows], chunks_processed: int, chunks_skipped: int}
+    """
+    pending = chunks if force else _pending_chunks(chunks)
+    skipped = len(chunks) - len(pending)
+    if not pending:
+        return {"mentions": [], "chunks_processed": 0, "chunks_skipped": skipped}
+
+    with_text = [c for c in pending if (c.get("content") or "").strip()]
+    by_chunk = _extract_raw_entities(with_text) if with_text else {}
+    # Chunks of a batch that failed are absent from by_chunk and stay pending
+    processed = [c for c in pending if c["id"] in by_chunk or not (c.get("content") or "").strip()]
+
+    mentions: list[tuple[dict, dict]] = []
+    for chunk in processed:
+        for raw in by_chunk.get(chunk["id"], []):
+            name = (raw.get("canonical_name") or "").strip()
+            entity_type = raw.get("entity_type", "concept")
+            if name and entity_type in _ENTITY_TYPES:
+                mentions.append((chunk, {**raw, "canonical_name": name, "entity_type": entity_type}))
+
+    writes = _GraphWrites(project_id)
+    writes.retract([c["id"] for c in processed])
+
+    # Names the hash index cannot place are embedded in one batch: the vector
+    # drives cosine matching and, for a new entity, is stored as its embedding
+    unmatched = list(dict.fromkeys(
+        raw["canonical_name"] for _, raw in mentions
+        if writes.resolver.match_name(raw["canonical_name"], raw["entity_type"]) is None
+    ))
+    vectors = dict(zip(unmatched, create_embeddings_batch(unmatched))) if unmatched else {}
+
+    for chunk, raw in mentions:
+        writes.add_mention(chunk, raw, vectors.get(raw["canonical_name"]))
+    writes.mark_processed(processed)
+    return {
+        "mentions": writes.flush(),
+        "chunks_processed": len(processed),
+        "chunks_skipped": skipped,
+    }
+
+
+def _fetch_chunks(source_ids: list[str]) -> list[dict]:
+    """Every chunk of *source_ids*, paged past the select row cap."""
+    if not source_ids:
+        return []
+    db = get_supabase()
+    rows: list[dict] = []
+    start = 0
+    while True:
+        page = (
+            db.table("chunks")
+            .select("id, source_id, content, content_hash")
+            .in_("source_id", source_ids)
+            .order("source_id")
+            .order("chunk_index")
+            .order("id")
+            .range(start, start + _SELECT_PAGE_SIZE - 1)
+            .execute()
+            .data
+            or []
+        )
+        rows.extend(page)
+        if len(page) < _SELECT_PAGE_SIZE:
+            return rows
+        start += _SELECT_PAGE_SIZE
+
+
+def _fetch_chunks_by_id(chunk_ids: list[str]) -> list[dict]:
+    db = get_supabase()
+    rows: list[dict] = []
+    for page in _pages(chunk_ids, _ID_FILTER_PAGE_SIZE):
+        rows.extend(
+            db.table("chunks")
+            .select("id, source_id, content, content_hash")
+            .in_("id", page)
+            .execute()
+            .data
+            or []
+        )
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Public entry points
+# ---------------------------------------------------------------------------
 
 def extract_entities_from_chunk(
     project_id: str,
@@ -94,109 +492,50 @@ def extract_entities_from_chunk(
 ) -> list[dict]:
     """Extract entities from a single chunk and persist them to the graph.
 
-    Returns list of entity_mention records created.
+    Returns list of entity_mention records created (empty if the chunk was
+    already processed with this content and extractor version).
     """
-    if not content.strip():
-        return []
+    chunk = {"id": chunk_id, "source_id": source_id, "content": content}
+    return _extract_entities_for_chunks(project_id, [chunk])["mentions"]
 
-    llm = get_fast_llm()
-    response = llm.invoke([
-        SystemMessage(content=_ENTITY_EXTRACTION_PROMPT),
-        HumanMessage(content=f"Extract entities from this text:\n\n{content}"),
-    ])
-    parsed = _parse_json_response(response.content)
-    raw_entities = parsed.get("entities", [])
-
-    if not raw_entities:
-        return []
 
-    db = get_supabase()
-    mentions_created = []
+def extract_entities_for_chunks(project_id: str, chunk_ids: list[str], force: bool = False) -> dict:
+    """Extract entities from specific chunks, e.g. the ones an ingestion run just wrote.
 
-    for raw in raw_entities:
-        canonical_name = raw.get("canonical_name", "").strip()
-        entity_type = raw.get("entity_type", "concept")
-        mention_text = raw.get("mention_text", "")
-        confidence = float(raw.get("confidence", 0.8))
+    Returns: {chunks_processed: int, chunks_skipped: int, mentions_created: int}
+    """
+    result = _extract_entities_for_chunks(project_id, _fetch_chunks_by_id(chunk_ids), force)
+    return {
+        "chunks_processed": result["chunks_processed"],
+        "chunks_skipped": result["chunks_skipped"],
+        "mentions_created": len(result["mentions"]),
+    }
 
-        if not canonical_name or entity_type not in (
-            "person", "product", "feature", "segment", "company", "concept"
-        ):
-            continue
-
-        # Try to match existing entity
-        existing = _match_existing_entity(project_id, canonical_name, entity_type)
-
-        if existing:
-            entity_id = existing["id"]
-            # Update mention count and last_seen
-            db.table("entities").update({
-                "mention_count": existing["mention_count"] + 1,
-                "last_seen_at": "now()",
-            }).eq("id", entity_id).execute()
-
-            # Add alias if this is a new variation
-            if canonical_name.lower() not in [
-                a.lower() for a in (existing.get("aliases") or [])
-            ] and canonical_name.lower() != existing["canonical_name"].lower():
-                new_aliases = list(existing.get("aliases") or []) + [canonical_name.lower()]
-                db.table("entities").update({
-                    "aliases": new_aliases,
-                }).eq("id", entity_id).execute()
-        else:
-            # Create new entity
-            embedding = create_embedding(canonical_name)
-            entity_resp = db.table("entities").insert({
-                "project_id": project_id,
-                "entity_type": entity_type,
-                "canonical_name": canonical_name,
-                "aliases": [canonical_name.lower()],
-                "mention_count": 1,
-                "embedding": to_pgvector_literal(embedding),
-                "metadata": {},
-            }).execute()
-            entity_id = entity_resp.data[0]["id"]
-
-        # Create mention record
-        mention_resp = db.table("entity_mentions").insert({
-            "entity_id": entity_id,
-            "chunk_id": chunk_id,
-            "source_id": source_id,
-            "mention_text": mention_text[:500],
-            "confidence": confidence,
-        }).execute()
-        if mention_resp.data:
-            mentions_created.append(mention_resp.data[0])
-
-    return mentions_created
-
-
-def extract_entities_for_source(project_id: str, source_id: str) -> dict:
-    """Extract entities from all chunks of a source.
-
-    Returns: {entities_found: int, mentions_created: int}
+
+def retract_entities_for_chunks(project_id: str, chunk_ids: list[str]) -> int:
+    """Remove the mentions of chunks that are about to be deleted.
+
+    Call before deleting the chunks: the cascade would drop their mentions
+    without decrementing the entities' mention_count or updating the
+    co-occurrence graph. Returns the number of mentions removed.
     """
-    db = get_supabase()
-    chunks = (
-        db.table("chunks")
-        .select("id, source_id, content")
-        .eq("source_id", source_id)
-        .order("chunk_index")
-        .execute()
-        .data or []
-    )
+    if not chunk_ids:
+        return 0
+    writes = _GraphWrites(project_id)
+    retracted = writes.retract(chunk_ids)
+    writes.flush()
+    return retracted
 
-    total_mentions = 0
-    for chunk in chunks:
-        mentions = extract_entities_from_chunk(
-            project_id=project_id,
-            chunk_id=chunk["id"],
-            source_id=source_id,
-            content=chunk.get("content", ""),
-        )
-        total_mentions += len(mentions)
+
+def extract_entities_for_source(project_id: str, source_id: str, force: bool = False) -> dict:
+    """Extract entities from the new or changed chunks of a source (all of them if *force*).
+
+    Returns: {entities_found: int, mentions_created: int, chunks_processed: int, chunks_skipped: int}
+    """
+    result = _extract_entities_for_chunks(project_id, _fetch_chunks([source_id]), force)
 
     # Count unique entities for this source
+    db = get_supabase()
     entity_count_resp = (
         db.table("entity_mentions")
         .select("entity_id")
@@ -207,14 +546,17 @@ def extract_entities_for_source(project_id: str, source_id: str) -> dict:
 
     return {
         "entities_found": unique_entities,
-        "mentions_created": total_mentions,
+        "mentions_created": len(result["mentions"]),
+        "chunks_processed": result["chunks_processed"],
+        "chunks_skipped": result["chunks_skipped"],
     }
 
 
-def extract_entities_for_project(project_id: str) -> dict:
-    """Extract entities from all sources in a project.
+def extract_entities_for_project(project_id: str, force: bool = False) -> dict:
+    """Extract entities from the new or changed chunks of every source in one batched run.
 
-    Returns: {sources_processed: int, entities_found: int, mentions_created: int}
+    Returns: {sources_processed: int, entities_found: int, mentions_created: int,
+              chunks_processed: int, chunks_skipped: int}
     """
     db = get_supabase()
     sources = (
@@ -225,10 +567,9 @@ def extract_entities_for_project(project_id: str) -> dict:
         .data or []
     )
 
-    total_mentions = 0
-    for src in sources:
-        result = extract_entities_for_source(project_id, src["id"])
-        total_mentions += result["mentions_created"]
+    result = _extract_entities_for_chunks(
+        project_id, _fetch_chunks([s["id"] for s in sources]), force
+    )
 
     entity_count = (
         db.table("entities")
@@ -240,12 +581,19 @@ def extract_entities_for_project(project_id: str) -> dict:
     return {
         "sources_processed": len(sources),
         "entities_found": entity_count.count or 0,
-        "mentions_created": total_mentions,
+        "mentions_created": len(result["mentions"]),
+        "chunks_processed": result["chunks_processed"],
+        "chunks_skipped": result["chunks_skipped"],
     }
 
 
-def get_entity_graph(project_id: str, entity_type: str | None = None) -> list[dict]:
-    """Fetch all entities for a project, optionally filtered by type."""
+def get_entity_graph(
+    project_id: str,
+    entity_type: str | None = None,
+    limit: int | None = None,
+    offset: int = 0,
+) -> list[dict]:
+    """Fetch a project's entities by mention count, optionally filtered by type and paged."""
     db = get_supabase()
     query = (
         db.table("entities")
@@ -256,24 +604,38 @@ def get_entity_graph(project_id: str, entity_type: str | None = None) -> list[di
     )
     if entity_type:
         query = query.eq("entity_type", entity_type)
+    if limit is not None:
+        query = query.range(offset, offset + limit - 1)
 
     return query.execute().data or []
 
 
-def get_entity_connections(entity_id: str) -> dict:
-    """Get all chunks and sources where this entity appears."""
+def get_entity_connections(entity_id: str, limit: int | None = None, offset: int = 0) -> dict:
+    """Get the chunks and sources where this entity appears, with a page of its mentions.
+
+    Chunk / source ids come from the materialised entity_adjacency row; only
+    entities without one yet fall back to aggregating every mention.
+    """
     db = get_supabase()
-    mentions = (
+    query = (
         db.table("entity_mentions")
         .select("id, chunk_id, source_id, mention_text, confidence, created_at")
         .eq("entity_id", entity_id)
         .order("created_at", desc=True)
-        .execute()
-        .data or []
     )
-
-    source_ids = list(set(m["source_id"] for m in mentions))
-    chunk_ids = list(set(m["chunk_id"] for m in mentions))
+    adjacency = get_entity_adjacency(entity_id)
+    if adjacency is not None and limit is not None:
+        query = query.range(offset, offset + limit - 1)
+    mentions = query.execute().data or []
+
+    if adjacency is not None:
+        source_ids = adjacency["source_ids"]
+        chunk_ids = adjacency["chunk_ids"]
+    else:
+        source_ids = list(set(m["source_id"] for m in mentions))
+        chunk_ids = list(set(m["chunk_id"] for m in mentions))
+        if limit is not None:
+            mentions = mentions[offset:offset + limit]
 
     return {
         "entity_id": entity_id,
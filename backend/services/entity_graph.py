@@ -0,0 +1,341 @@
+"""Materialised entity co-occurrence graph.
+
+EntityIncidence is a project's entity_mentions as a sparse incidence
+structure (entity → chunks, chunk → entities, chunk → source). Two entities
+co-occur when they are mentioned in the same chunk; for each entity the
+ENTITY_GRAPH_TOP_K neighbours are ranked by shared chunks, then by the
+Ochiai score shared / sqrt(|chunks(a)| · |chunks(b)|).
+
+The result is stored in entity_adjacency, one row per entity:
+
+    {entity_id, project_id, chunk_count, source_count, chunk_ids, source_ids,
+     neighbors: [{entity_id, canonical_name, entity_type, shared_chunks,
+                  shared_sources, score}, ...]}
+
+so a node click (get_entity_neighbors) or a graph page (get_entity_graph_page)
+is one indexed read. Entity extraction calls update_entity_adjacency with the
+mentions it added and the chunks it retracted; only the rows of touched
+entities and their neighbours (whose scores depend on the touched entities'
+chunk counts) are rewritten. rebuild_entity_adjacency recomputes a whole
+project.
+
+Incidences are cached per project for ENTITY_GRAPH_TTL_SECONDS, like the
+entity resolver.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable
+
+from backend.config import settings
+from backend.db.supabase_client import get_supabase
+from backend.services.entity_resolver import get_entity_resolver
+
+# Supabase caps a single select at 1000 rows
+_SELECT_PAGE_SIZE = 1000
+# Ids per in_() filter, so request URLs stay well under proxy limits
+_ID_FILTER_PAGE_SIZE = 200
+
+
+class EntityIncidence:
+    """Sparse entity × chunk incidence (and chunk → source) of one project's mentions."""
+
+    def __init__(self, project_id: str, mentions: Iterable[dict] = ()) -> None:
+        self.project_id = project_id
+        self.loaded_at = time.monotonic()
+        self.entity_chunks: dict[str, set[str]] = {}
+        self.chunk_entities: dict[str, set[str]] = {}
+        self.chunk_source: dict[str, str] = {}
+        self._lock = threading.RLock()
+        self.add(mentions)
+
+    @classmethod
+    def load(cls, project_id: str) -> EntityIncidence:
+        """Build the incidence from every mention in the project's sources."""
+        db = get_supabase()
+        source_ids = [
+            r["id"]
+            for r in db.table("sources").select("id").eq("project_id", project_id).execute().data or []
+        ]
+        mentions: list[dict] = []
+        for i in range(0, len(source_ids), _ID_FILTER_PAGE_SIZE):
+            page_ids = source_ids[i:i + _ID_FILTER_PAGE_SIZE]
+            start = 0
+            while True:
+                page = (
+                    db.table("entity_mentions")
+                    .select("entity_id, chunk_id, source_id")
+                    .in_("source_id", page_ids)
+                    .order("id")
+                    .range(start, start + _SELECT_PAGE_SIZE - 1)
+                    .execute()
+                    .data
+                    or []
+                )
+                mentions.extend(page)
+                if len(page) < _SELECT_PAGE_SIZE:
+                    break
+                start += _SELECT_PAGE_SIZE
+        return cls(project_id, mentions)
+
+    # ── Updates ──────────────────────────────────────────────────────────
+
+    def add(self, mentions: Iterable[dict]) -> set[str]:
+        """Add {entity_id, chunk_id, source_id} mentions; returns the entities touched."""
+        touched: set[str] = set()
+        with self._lock:
+            for m in mentions:
+                self.entity_chunks.setdefault(m["entity_id"], set()).add(m["chunk_id"])
+                self.chunk_entities.setdefault(m["chunk_id"], set()).add(m["entity_id"])
+                self.chunk_source[m["chunk_id"]] = m["source_id"]
+                touched.add(m["entity_id"])
+        return touched
+
+    def remove_chunks(self, chunk_ids: Iterable[str]) -> set[str]:
+        """Drop every mention in *chunk_ids*; returns the entities touched."""
+        touched: set[str] = set()
+        with self._lock:
+            for chunk_id in chunk_ids:
+                for entity_id in self.chunk_entities.pop(chunk_id, ()):
+                    chunks = self.entity_chunks.get(entity_id)
+                    if chunks is not None:
+                        chunks.discard(chunk_id)
+                        if not chunks:
+                            del self.entity_chunks[entity_id]
+                    touched.add(entity_id)
+                self.chunk_source.pop(chunk_id, None)
+        return touched
+
+    # ── Queries ──────────────────────────────────────────────────────────
+
+    def sources(self, entity_id: str) -> set[str]:
+        with self._lock:
+            return {self.chunk_source[c] for c in self.entity_chunks.get(entity_id, ())}
+
+    def cooccurrence(self, entity_id: str) -> Counter:
+        """Shared-chunk count with every entity that co-occurs with *entity_id*."""
+        counts: Counter = Counter()
+        with self._lock:
+            for chunk_id in self.entity_chunks.get(entity_id, ()):
+                counts.update(self.chunk_entities[chunk_id])
+        counts.pop(entity_id, None)
+        return counts
+
+    def neighbors(self, entity_id: str, k: int) -> list[dict]:
+        """Top-*k* co-occurring entities: {entity_id, shared_chunks, shared_sources, score}."""
+        with self._lock:
+            size = len(self.entity_chunks.get(entity_id, ()))
+            scored = [
+                (shared, shared / math.sqrt(size * len(self.entity_chunks[other])), other)
+                for other, shared in self.cooccurrence(entity_id).items()
+            ]
+            scored.sort(key=lambda t: (-t[0], -t[1], t[2]))
+            sources = self.sources(entity_id)
+            return [
+                {
+                    "entity_id": other,
+                    "shared_chunks": shared,
+                    "shared_sources": len(sources & self.sources(other)),
+                    "score": round(score, 4),
+                }
+                for shared, score, other in scored[:k]
+            ]
+
+    def adjacency_row(self, entity_id: str, k: int) -> dict | None:
+        """The entity_adjacency row for *entity_id*, or None if it has no mentions."""
+        with self._lock:
+            chunks = self.entity_chunks.get(entity_id)
+            if not chunks:
+                return None
+            sources = self.sources(entity_id)
+            return {
+                "entity_id": entity_id,
+                "project_id": self.project_id,
+                "chunk_count": len(chunks),
+                "source_count": len(sources),
+                "chunk_ids": sorted(chunks),
+                "source_ids": sorted(sources),
+                "neighbors": self.neighbors(entity_id, k),
+            }
+
+
+_incidences: dict[str, EntityIncidence] = {}
+_incidences_lock = threading.Lock()
+
+
+def get_entity_incidence(project_id: str) -> EntityIncidence:
+    """The project's cached incidence, (re)loaded when missing or older than the TTL."""
+    with _incidences_lock:
+        incidence = _incidences.get(project_id)
+        if incidence is None or time.monotonic() - incidence.loaded_at > settings.entity_graph_ttl_seconds:
+            incidence = EntityIncidence.load(project_id)
+            _incidences[project_id] = incidence
+        return incidence
+
+
+def invalidate_entity_incidence(project_id: str) -> None:
+    with _incidences_lock:
+        _incidences.pop(project_id, None)
+
+
+# ---------------------------------------------------------------------------
+# Maintenance
+# ---------------------------------------------------------------------------
+
+def _write_rows(project_id: str, incidence: EntityIncidence, entity_ids: set[str]) -> int:
+    """Rewrite the adjacency rows of *entity_ids*; returns the number of rows written."""
+    resolver = get_entity_resolver(project_id)
+    k = settings.entity_graph_top_k
+    rows: list[dict] = []
+    gone: list[str] = []
+    for entity_id in sorted(entity_ids):
+        row = incidence.adjacency_row(entity_id, k)
+        if row is None:
+            gone.append(entity_id)
+            continue
+        for neighbor in row["neighbors"]:
+            entity = resolver.get(neighbor["entity_id"]) or {}
+            neighbor["canonical_name"] = entity.get("canonical_name", "")
+            neighbor["entity_type"] = entity.get("entity_type", "")
+        rows.append(row)
+
+    db = get_supabase()
+    page_size = settings.chunk_insert_page_size
+    for i in range(0, len(rows), page_size):
+        db.table("entity_adjacency").upsert(rows[i:i + page_size]).execute()
+    for i in range(0, len(gone), _ID_FILTER_PAGE_SIZE):
+        db.table("entity_adjacency").delete().in_("entity_id", gone[i:i + _ID_FILTER_PAGE_SIZE]).execute()
+    return len(rows)
+
+
+def update_entity_adjacency(
+    project_id: str,
+    added_mentions: list[dict],
+    retracted_chunk_ids: list[str],
+    retracted_entity_ids: Iterable[str] = (),
+) -> int:
+    """Apply mention changes to the project's incidence and rewrite the affected rows.
+
+    Affected entities are those with added or removed mentions plus their
+    neighbours before and after the change. Returns the number of rows written.
+
+    Called after the mention writes, so a cold cache loads the post-change
+    state and has nothing left to remove: *retracted_entity_ids* (every
+    entity mentioned in the retracted chunks) names the touched entities
+    regardless. Their former neighbours via those chunks are among them.
+    """
+    incidence = get_entity_incidence(project_id)
+    touched = incidence.remove_chunks(retracted_chunk_ids) | set(retracted_entity_ids)
+    touched |= {m["entity_id"] for m in added_mentions}
+    before = {other for e in touched for other in incidence.cooccurrence(e)}
+    incidence.add(added_mentions)
+    after = {other for e in touched for other in incidence.cooccurrence(e)}
+    try:
+        return _write_rows(project_id, incidence, touched | before | after)
+    except Exception:
+        invalidate_entity_incidence(project_id)
+        raise
+
+
+def rebuild_entity_adjacency(project_id: str) -> int:
+    """Recompute every adjacency row of the project from entity_mentions."""
+    invalidate_entity_incidence(project_id)
+    incidence = get_entity_incidence(project_id)
+    db = get_supabase()
+    existing = {
+        r["entity_id"]
+        for r in db.table("entity_adjacency").select("entity_id").eq("project_id", project_id).execute().data or []
+    }
+    return _write_rows(project_id, incidence, set(incidence.entity_chunks) | existing)
+
+
+# ---------------------------------------------------------------------------
+# Reads (one indexed query each)
+# ---------------------------------------------------------------------------
+
+def get_entity_adjacency(entity_id: str) -> dict | None:
+    """The stored adjacency row of one entity, or None if it has none yet."""
+    db = get_supabase()
+    rows = (
+        db.table("entity_adjacency")
+        .select("entity_id, chunk_count, source_count, chunk_ids, source_ids, neighbors")
+        .eq("entity_id", entity_id)
+        .limit(1)
+        .execute()
+        .data
+        or []
+    )
+    return rows[0] if rows else None
+
+
+def get_entity_neighbors(entity_id: str, limit: int = 20, offset: int = 0) -> dict:
+    """A page of an entity's precomputed co-occurrence neighbours, best first."""
+    row = get_entity_adjacency(entity_id) or {}
+    neighbors = row.get("neighbors") or []
+    return {
+        "entity_id": entity_id,
+        "chunk_count": row.get("chunk_count", 0),
+        "source_count": row.get("source_count", 0),
+        "neighbors": neighbors[offset:offset + limit],
+        "total": len(neighbors),
+        "limit": limit,
+        "offset": offset,
+    }
+
+
+def get_entity_graph_page(
+    project_id: str,
+    limit: int = 50,
+    offset: int = 0,
+    entity_type: str | None = None,
+) -> dict:
+    """A page of graph nodes (by chunk count) with the edges among their neighbour lists."""
+    db = get_supabase()
+    query = (
+        db.table("entity_adjacency")
+        .select(
+            "entity_id, chunk_count, source_count, neighbors, "
+            "entities!inner(canonical_name, entity_type, mention_count)",
+            count="exact",
+        )
+        .eq("project_id", project_id)
+    )
+    if entity_type:
+        query = query.eq("entities.entity_type", entity_type)
+    resp = query.order("chunk_count", desc=True).range(offset, offset + limit - 1).execute()
+
+    nodes: list[dict] = []
+    edges: list[dict] = []
+    seen: set[frozenset] = set()
+    for row in resp.data or []:
+        entity = row.get("entities") or {}
+        nodes.append({
+            "id": row["entity_id"],
+            "canonical_name": entity.get("canonical_name", ""),
+            "entity_type": entity.get("entity_type", ""),
+            "mention_count": entity.get("mention_count", 0),
+            "chunk_count": row["chunk_count"],
+            "source_count": row["source_count"],
+        })
+        for n in row.get("neighbors") or []:
+            pair = frozenset((row["entity_id"], n["entity_id"]))
+            if pair in seen:
+                continue
+            seen.add(pair)
+            edges.append({
+                "source": row["entity_id"],
+                "target": n["entity_id"],
+                "shared_chunks": n["shared_chunks"],
+                "score": n["score"],
+            })
+    return {
+        "nodes": nodes,
+        "edges": edges,
+        "total": resp.count or 0,
+        "limit": limit,
+        "offset": offset,
+    }
@@ -0,0 +1,166 @@
+"""In-process entity resolution for the knowledge graph.
+
+One EntityResolver per project holds every entity's canonical name and
+aliases in a hash index (normalised name → entity) and its name embedding
+in a per-type EmbeddingMatrix. A mention resolves locally, in order:
+
+    exact    normalised canonical name of an entity of the same type
+    alias    normalised alias of an entity of the same type
+    cosine   nearest same-type entity embedding, if at least
+             ENTITY_MATCH_MIN_SIMILARITY
+
+so entity extraction makes no database round trips per mention. New
+entities and aliases are added to the index as they are created.
+
+Resolvers are cached per project for ENTITY_RESOLVER_TTL_SECONDS, after
+which the next lookup reloads from Supabase (picking up entities written
+by other processes). Call invalidate_entity_resolver() when a write that
+the resolver already reflects fails.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections.abc import Sequence
+
+from backend.config import settings
+from backend.db.supabase_client import get_supabase
+from backend.services.embeddings import from_pgvector_literal
+from backend.services.scoring import EmbeddingMatrix
+
+# Supabase caps a single select at 1000 rows
+_SELECT_PAGE_SIZE = 1000
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace ("CSV-Export " → "csv export")."""
+    return " ".join(re.sub(r"[^\w\s]", " ", name.lower()).split())
+
+
+class EntityResolver:
+    """Canonical names, aliases and name embeddings of one project's entities.
+
+    Entities are plain dicts ({id, entity_type, canonical_name, aliases,
+    mention_count, ...}); the resolver returns the same objects it was given,
+    so callers can update counts on them in place. Thread-safe.
+    """
+
+    def __init__(self, project_id: str, entities: Sequence[dict] = ()) -> None:
+        self.project_id = project_id
+        self.loaded_at = time.monotonic()
+        self._by_name: dict[tuple[str, str], dict] = {}
+        self._vectors: dict[str, EmbeddingMatrix] = {}   # entity_type → name embeddings
+        self._vector_rows: dict[str, list[dict]] = {}    # entity_type → entity per matrix row
+        self._lock = threading.RLock()
+        self._by_id: dict[str, dict] = {}
+        for entity in entities:
+            # The raw pgvector column is only needed here; don't keep it on the dict
+            self.add(entity, from_pgvector_literal(entity.pop("embedding", None)))
+
+    @classmethod
+    def load(cls, project_id: str) -> EntityResolver:
+        """Build a resolver from every entity of *project_id* in Supabase."""
+        db = get_supabase()
+        rows: list[dict] = []
+        start = 0
+        while True:
+            page = (
+                db.table("entities")
+                .select("id, entity_type, canonical_name, aliases, mention_count, embedding")
+                .eq("project_id", project_id)
+                .order("id")
+                .range(start, start + _SELECT_PAGE_SIZE - 1)
+                .execute()
+                .data
+                or []
+            )
+            rows.extend(page)
+            if len(page) < _SELECT_PAGE_SIZE:
+                break
+            start += _SELECT_PAGE_SIZE
+        return cls(project_id, rows)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._by_id)
+
+    # ── Updates ──────────────────────────────────────────────────────────
+
+    def add(self, entity: dict, vector: Sequence[float] | None = None) -> None:
+        """Index *entity* by its canonical name and aliases, and its embedding if given."""
+        entity_type = entity["entity_type"]
+        with self._lock:
+            self._by_id[entity["id"]] = entity
+            for name in [entity["canonical_name"], *(entity.get("aliases") or [])]:
+                self._by_name.setdefault((entity_type, normalize_name(name)), entity)
+            if vector is not None:
+                matrix = self._vectors.setdefault(entity_type, EmbeddingMatrix([]))
+                matrix.append(vector)
+                self._vector_rows.setdefault(entity_type, []).append(entity)
+
+    def add_alias(self, entity: dict, alias: str) -> None:
+        with self._lock:
+            self._by_name.setdefault((entity["entity_type"], normalize_name(alias)), entity)
+
+    # ── Lookups ──────────────────────────────────────────────────────────
+
+    def get(self, entity_id: str) -> dict | None:
+        with self._lock:
+            return self._by_id.get(entity_id)
+
+    def match_name(self, name: str, entity_type: str) -> dict | None:
+        """Exact canonical-name or alias match after normalisation."""
+        with self._lock:
+            return self._by_name.get((entity_type, normalize_name(name)))
+
+    def match_vector(
+        self,
+        vector: Sequence[float],
+        entity_type: str,
+        min_similarity: float | None = None,
+    ) -> tuple[dict, float] | None:
+        """Nearest same-type entity by name-embedding cosine, if close enough."""
+        threshold = settings.entity_match_min_similarity if min_similarity is None else min_similarity
+        with self._lock:
+            matrix = self._vectors.get(entity_type)
+            if matrix is None or not len(matrix):
+                return None
+            (row, score), = matrix.top_k(vector, k=1)
+            if score < threshold:
+                return None
+            return self._vector_rows[entity_type][row], score
+
+    def resolve(
+        self,
+        name: str,
+        entity_type: str,
+        vector: Sequence[float] | None = None,
+    ) -> dict | None:
+        """Exact, then alias, then (when *vector* is given) cosine-nearest match."""
+        entity = self.match_name(name, entity_type)
+        if entity is None and vector is not None:
+            nearest = self.match_vector(vector, entity_type)
+            entity = nearest[0] if nearest else None
+        return entity
+
+
+_resolvers: dict[str, EntityResolver] = {}
+_resolvers_lock = threading.Lock()
+
+
+def get_entity_resolver(project_id: str) -> EntityResolver:
+    """The project's cached resolver, (re)loaded when missing or older than the TTL."""
+    with _resolvers_lock:
+        resolver = _resolvers.get(project_id)
+        if resolver is None or time.monotonic() - resolver.loaded_at > settings.entity_resolver_ttl_seconds:
+            resolver = EntityResolver.load(project_id)
+            _resolvers[project_id] = resolver
+        return resolver
+
+
+def invalidate_entity_resolver(project_id: str) -> None:
+    """Drop the cached resolver so the next lookup reloads from Supabase."""
+    with _resolvers_lock:
+        _resolvers.pop(project_id, None)
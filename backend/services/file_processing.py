@@ -9,11 +9,27 @@ Extraction priority:
   1. raw_content  (string already in memory)
   2. file_bytes   (bytes uploaded via HTTP, with filename hint)
   3. file_path    (path on disk)
+
+Large sources should use the streaming pair iter_text() → iter_chunks(),
+which yields text segments and chunks lazily so memory stays bounded by the
+chunk size rather than the file size. iter_anchored_chunks() is the
+content-defined variant ingestion uses: its boundaries follow sentences and
+lines, so an edit only changes the chunks around it.
 """
 
 import csv
 import io
 import re
+import zlib
+from collections.abc import Iterable, Iterator
+from typing import BinaryIO
+
+# Size of the text blocks yielded by iter_text() for plain-text sources
+_STREAM_BLOCK_CHARS = 64 * 1024
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# End of a chunking unit: whitespace after sentence punctuation, or a newline
+_UNIT_END_RE = re.compile(r"(?<=[.!?])\s|\n")
 
 
 # ---------------------------------------------------------------------------
@@ -108,6 +124,118 @@ def extract_text(
     )
 
 
+# ---------------------------------------------------------------------------
+# Streaming extraction
+# ---------------------------------------------------------------------------
+
+def _iter_pdf(stream: BinaryIO) -> Iterator[str]:
+    """Yield PDF text page by page. Tries pypdf first, then pdfminer."""
+    produced = False
+
+    # --- pypdf (lightweight, usually pre-installed) ---
+    try:
+        import pypdf  # type: ignore
+
+        reader = pypdf.PdfReader(stream)
+        for page in reader.pages:
+            text = page.extract_text() or ""
+            if text.strip():
+                produced = True
+                yield text + "\n"
+    except ImportError:
+        pass
+    if produced:
+        return
+
+    # --- pdfminer.six (more accurate, heavier) ---
+    try:
+        from pdfminer.high_level import extract_pages  # type: ignore
+        from pdfminer.layout import LAParams, LTTextContainer  # type: ignore
+
+        stream.seek(0)
+        for page_layout in extract_pages(stream, laparams=LAParams()):
+            text = "".join(
+                el.get_text() for el in page_layout if isinstance(el, LTTextContainer)
+            )
+            if text.strip():
+                produced = True
+                yield text
+    except ImportError:
+        pass
+    if produced:
+        return
+
+    raise RuntimeError(
+        "PDF extraction requires pypdf or pdfminer.six. "
+        "Install with: pip install pypdf  OR  pip install pdfminer.six"
+    )
+
+
+def _iter_from_stream(stream: BinaryIO, filename: str) -> Iterator[str]:
+    """Yield text segments from a binary stream based on file extension."""
+    name = filename.lower()
+
+    if name.endswith((".txt", ".md")):
+        reader = io.TextIOWrapper(stream, encoding="utf-8", errors="replace")
+        while block := reader.read(_STREAM_BLOCK_CHARS):
+            yield block
+        return
+
+    if name.endswith(".csv"):
+        reader = io.TextIOWrapper(stream, encoding="utf-8", errors="replace", newline="")
+        for row in csv.reader(reader):
+            yield " ".join(row) + "\n"
+        return
+
+    if name.endswith(".pdf"):
+        yield from _iter_pdf(stream)
+        return
+
+    raise ValueError(
+        f"Unsupported file type '{filename}'. "
+        "Supported: .txt, .md, .csv, .pdf — or provide raw_content directly."
+    )
+
+
+def iter_text(
+    raw_content: str | None = None,
+    file_path: str | None = None,
+    file_bytes: bytes | None = None,
+    filename: str | None = None,
+) -> Iterator[str]:
+    """Streaming counterpart of extract_text() — yields text segments lazily.
+
+    Same source priority as extract_text(). Files on disk are read
+    incrementally (blocks for text, rows for CSV, pages for PDF) instead of
+    being loaded whole. Segment boundaries carry no meaning; feed the result
+    to iter_chunks().
+
+    Raises ValueError (on first iteration) if no usable source is provided.
+    """
+    # 1. In-memory string content
+    if raw_content and raw_content.strip():
+        for start in range(0, len(raw_content), _STREAM_BLOCK_CHARS):
+            yield raw_content[start:start + _STREAM_BLOCK_CHARS]
+        return
+
+    # 2. Uploaded bytes with a filename hint
+    if file_bytes and filename:
+        yield from _iter_from_stream(io.BytesIO(file_bytes), filename)
+        return
+
+    # 3. Path on disk
+    if file_path and file_path.strip():
+        path = file_path.strip()
+        with open(path, "rb") as fh:
+            yield from _iter_from_stream(fh, filename or path)
+        return
+
+    raise ValueError(
+        "No extractable content found. "
+        "Provide raw_content, (file_bytes + filename), or file_path."
+    )
+
+
 # ---------------------------------------------------------------------------
 # Chunking
 # ---------------------------------------------------------------------------
@@ -138,3 +266,137 @@ def chunk_text(
         cursor = max(end - overlap, cursor + 1)
 
     return chunks
+
+
+def iter_chunks(
+    segments: Iterable[str],
+    chunk_size: int = 1200,
+    overlap: int = 150,
+) -> Iterator[str]:
+    """Streaming equivalent of chunk_text() over an iterable of text segments.
+
+    Produces exactly the chunks chunk_text("".join(segments)) would, but only
+    keeps the current window (plus one segment) in memory. Whitespace runs
+    that span segment boundaries are collapsed the same way.
+    """
+    step = max(chunk_size - overlap, 1)
+    buf = ""
+    pending_space = False
+
+    for segment in segments:
+        normalized = _WHITESPACE_RE.sub(" ", segment)
+        if not normalized:
+            continue
+        if normalized == " ":
+            pending_space = True
+            continue
+        if normalized[0] == " ":
+            pending_space = True
+            normalized = normalized[1:]
+        trailing_space = normalized[-1] == " "
+        if trailing_space:
+            normalized = normalized[:-1]
+
+        # Leading whitespace of the whole text is stripped, like chunk_text()
+        if pending_space and buf:
+            buf += " "
+        buf += normalized
+        pending_space = trailing_space
+
+        cursor = 0
+        while len(buf) - cursor > chunk_size:
+            yield buf[cursor:cursor + chunk_size]
+            cursor += step
+        buf = buf[cursor:]
+
+    if buf:
+        yield buf
+
+
+def _split_long(unit: str, max_chars: int) -> list[str]:
+    """Split *unit* into pieces of at most *max_chars*, at spaces where possible."""
+    pieces = []
+    while len(unit) > max_chars:
+        cut = unit.rfind(" ", 1, max_chars + 1)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(unit[:cut].strip())
+        unit = unit[cut:].strip()
+    if unit:
+        pieces.append(unit)
+    return pieces
+
+
+def _iter_units(segments: Iterable[str], max_chars: int) -> Iterator[str]:
+    """Sentences and lines of the text, whitespace-collapsed, none over *max_chars*."""
+    buf = ""
+    for segment in segments:
+        buf += segment
+        start = 0
+        for match in _UNIT_END_RE.finditer(buf):
+            unit = _WHITESPACE_RE.sub(" ", buf[start:match.start()]).strip()
+            start = match.end()
+            if unit:
+                yield from _split_long(unit, max_chars)
+        buf = buf[start:]
+        # Text without any boundary (e.g. one huge line): don't hold it all
+        if len(buf) > 4 * max_chars:
+            *done, rest = _split_long(_WHITESPACE_RE.sub(" ", buf).strip(), max_chars) or [""]
+            yield from done
+            buf = rest
+    unit = _WHITESPACE_RE.sub(" ", buf).strip()
+    if unit:
+        yield from _split_long(unit, max_chars)
+
+
+def _is_anchor(unit: str, span: int) -> bool:
+    """Content-defined cut point: a unit of n chars ends a chunk with probability ~2n/span."""
+    return zlib.crc32(unit.encode("utf-8")) % span < 2 * len(unit)
+
+
+def iter_anchored_chunks(
+    segments: Iterable[str],
+    chunk_size: int = 1200,
+    overlap: int = 150,
+) -> Iterator[str]:
+    """Content-defined chunks over an iterable of text segments.
+
+    The text is split into sentences / lines (long ones at spaces). A chunk
+    ends after a unit whose checksum marks it as an anchor, once it holds a
+    quarter of its budget, or before the unit that would overflow it. Cut
+    points therefore depend on the text around them, not on offsets from
+    the start: inserting or deleting text changes the chunks it touches
+    (and the next one, via the overlap) while the rest of the document keeps
+    the same chunks and content hashes.
+
+    Each chunk is prefixed with the trailing units of the previous chunk
+    that fit in *overlap* characters, and is at most *chunk_size* long.
+    Whitespace is collapsed as in chunk_text().
+    """
+    budget = max(chunk_size - overlap, 1)
+    min_fill = budget // 4
+    carry: list[str] = []
+    current: list[str] = []
+    length = 0
+
+    def _emit() -> str:
+        nonlocal carry, current, length
+        chunk = " ".join(carry + current)
+        carry, tail = [], 0
+        for unit in reversed(current):
+            tail += len(unit) + 1
+            if tail > overlap:
+                break
+            carry.insert(0, unit)
+        current, length = [], 0
+        return chunk
+
+    for unit in _iter_units(segments, budget):
+        if current and length + 1 + len(unit) > budget:
+            yield _emit()
+        length += len(unit) + (1 if current else 0)
+        current.append(unit)
+        if length >= min_fill and _is_anchor(unit, budget):
+            yield _emit()
+    if current:
+        yield _emit()
@@ -1,39 +1,131 @@
 """File processing ingestion pipeline.
 
 Steps:
-  1. Fetch source record from Supabase
-  2. Extract plain text (raw_content or file_path on disk)
-  3. Chunk text into overlapping segments
-  4. Embed each chunk concurrently via OpenAI
-  5. Delete old chunks for this source
-  6. Insert new chunk rows into Supabase
-
-Returns a summary dict: {source_id, chunk_count}.
+  1. Fetch source record and its existing chunk fingerprints from Supabase
+  2. Stream plain text (raw_content or file_path on disk)
+  3. Chunk the stream at content-defined boundaries (iter_anchored_chunks),
+     so an edit only changes the chunks around it
+  4. Hash each chunk; chunks whose content_hash already exists for the
+     source keep their row and embedding
+  5. Embed only new / modified chunks via batched embed_documents calls
+  6. Insert the new chunk rows into Supabase in pages
+  7. Diff step: re-number kept rows that moved, delete rows whose content
+     no longer appears
+  8. Extract entities from the newly written chunks (ENTITY_EXTRACTION_ON_INGEST);
+     a failure here is logged and does not fail the ingestion
+
+Extraction, chunking, embedding and inserts are chained generators, so at
+most INGEST_WINDOW_SIZE chunks (and their vectors) are in flight at once and
+peak memory does not grow with the size of the source file. If any window
+fails, the rows already written by this run are removed and the previous
+chunks are left untouched.
+
+Re-ingesting a source after a small edit therefore costs O(changed chunks)
+embedding calls rather than O(source). Whenever the chunk set actually
+changes, the project's corpus version is bumped so cached RAG answers
+computed against the old chunks are invalidated.
+
+Returns a summary dict:
+    {source_id, chunk_count, embedded_count, reused_count, deleted_count,
+     embed_seconds, entity_mentions_created}
 """
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
+import logging
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import suppress
+from itertools import islice
 
 from backend.config import settings
 from backend.db.supabase_client import get_supabase
-from backend.services.embeddings import create_embedding, to_pgvector_literal
-from backend.services.file_processing import chunk_text, extract_text
+from backend.services import cache_manager
+from backend.services.embeddings import create_embeddings_batch, to_pgvector_literal
+from backend.services.entity_extraction import extract_entities_for_chunks, retract_entities_for_chunks
+from backend.services.file_processing import iter_anchored_chunks, iter_text
+
+logger = logging.getLogger(__name__)
+
+# Supabase caps a single select at 1000 rows
+_SELECT_PAGE_SIZE = 1000
+
+
+def _windows(items: Iterable, size: int) -> Iterator[list]:
+    """Group an iterable into lists of at most *size* items."""
+    it = iter(items)
+    while window := list(islice(it, max(1, size))):
+        yield window
+
+
+def chunk_content_hash(content: str) -> str:
+    """Content address of a chunk — sha256 of its normalised text."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
 
+def _fetch_chunk_rows(db, source_id: str) -> list[dict]:
+    """Return {id, chunk_index, content_hash, metadata} for every chunk of *source_id*."""
+    rows: list[dict] = []
+    start = 0
+    while True:
+        page = (
+            db.table("chunks")
+            .select("id, chunk_index, content_hash, metadata")
+            .eq("source_id", source_id)
+            .order("chunk_index")
+            .order("id")
+            .range(start, start + _SELECT_PAGE_SIZE - 1)
+            .execute()
+            .data
+            or []
+        )
+        rows.extend(page)
+        if len(page) < _SELECT_PAGE_SIZE:
+            return rows
+        start += _SELECT_PAGE_SIZE
 
-def _embed_chunk(item: tuple[int, str]) -> tuple[int, list[float]]:
-    """Embed one chunk; returns (index, embedding)."""
-    idx, content = item
-    embedding = create_embedding(content)
-    return idx, embedding
 
+def _index_by_hash(rows: list[dict]) -> dict[str, deque[dict]]:
+    """Group existing chunk rows by content_hash (duplicates kept in order)."""
+    by_hash: dict[str, deque[dict]] = {}
+    for row in rows:
+        if row.get("content_hash"):
+            by_hash.setdefault(row["content_hash"], deque()).append(row)
+    return by_hash
 
-def run_ingestion_pipeline(source_id: str) -> dict:
-    """Full extract → chunk → embed → store pipeline for a source.
+
+def _delete_chunk_ids(db, chunk_ids: list[str]) -> None:
+    """Delete chunk rows by id in pages of CHUNK_INSERT_PAGE_SIZE."""
+    for page in _windows(chunk_ids, settings.chunk_insert_page_size):
+        db.table("chunks").delete().in_("id", page).execute()
+
+
+def _reindex_chunks(db, moved: list[tuple[str, int]]) -> None:
+    """Apply new chunk_index values to kept rows via the reindex_chunks RPC."""
+    for page in _windows(moved, _SELECT_PAGE_SIZE):
+        db.rpc(
+            "reindex_chunks",
+            {
+                "chunk_ids": [chunk_id for chunk_id, _ in page],
+                "chunk_indexes": [idx for _, idx in page],
+            },
+        ).execute()
+
+
+def run_ingestion_pipeline(
+    source_id: str,
+    on_progress: Callable[[dict], None] | None = None,
+) -> dict:
+    """Incremental extract → chunk → embed → store pipeline for a source.
 
     Args:
-        source_id: UUID of the source row in Supabase.
+        source_id:   UUID of the source row in Supabase.
+        on_progress: Optional callback invoked after each window with
+                     {stage, chunks_processed, chunks_embedded, rows_written}.
 
     Returns:
-        {"source_id": str, "chunk_count": int}
+        {"source_id": str, "chunk_count": int, "embedded_count": int,
+         "reused_count": int, "deleted_count": int, "embed_seconds": float}
 
     Raises:
         ValueError: if source not found or no text can be extracted.
@@ -54,60 +146,133 @@ def run_ingestion_pipeline(source_id: str) -> dict:
         raise ValueError(f"Source '{source_id}' not found.")
     source = resp.data
 
+    base_metadata = {
+        "project_id": source["project_id"],
+        "source_type": source.get("source_type", "untyped"),
+        "segment_tags": source.get("segment_tags") or [],
+        **(source.get("metadata") or {}),
+    }
+    existing_rows = _fetch_chunk_rows(db, source_id)
+    reusable = _index_by_hash(existing_rows)
+
     # ------------------------------------------------------------------
-    # 2. Extract text
+    # 2–3. Stream text into chunks (lazy — nothing is read yet)
     # ------------------------------------------------------------------
-    raw_text = extract_text(
+    segments = iter_text(
         raw_content=source.get("raw_content"),
         file_path=source.get("file_path"),
     )
+    chunks = iter_anchored_chunks(segments, settings.chunk_size, settings.chunk_overlap)
 
     # ------------------------------------------------------------------
-    # 3. Chunk
+    # 4–6. Match against existing rows, embed + insert the rest per window
     # ------------------------------------------------------------------
-    chunks = chunk_text(raw_text, settings.chunk_size, settings.chunk_overlap)
-    if not chunks:
+    chunk_count = 0
+    embedded_count = 0
+    embed_seconds = 0.0
+    inserted_ids: list[str] = []
+    moved: list[tuple[str, int]] = []
+    metadata_changed = False
+
+    def _report(stage: str) -> None:
+        if on_progress is not None:
+            on_progress(
+                {
+                    "stage": stage,
+                    "chunks_processed": chunk_count,
+                    "chunks_embedded": embedded_count,
+                    "rows_written": len(inserted_ids),
+                }
+            )
+
+    _report("extracting")
+    try:
+        for window in _windows(chunks, settings.ingest_window_size):
+            fresh: list[tuple[int, str, str]] = []
+            for offset, content in enumerate(window):
+                idx = chunk_count + offset
+                digest = chunk_content_hash(content)
+                candidates = reusable.get(digest)
+                if candidates:
+                    kept = candidates.popleft()
+                    if kept.get("chunk_index") != idx:
+                        moved.append((kept["id"], idx))
+                    if kept.get("metadata") != base_metadata:
+                        metadata_changed = True
+                else:
+                    fresh.append((idx, content, digest))
+            chunk_count += len(window)
+            embedded_count += len(fresh)
+
+            if fresh:
+                embed_started = time.perf_counter()
+                embeddings = create_embeddings_batch([content for _, content, _ in fresh])
+                embed_seconds += time.perf_counter() - embed_started
+
+                rows = [
+                    {
+                        "source_id": source_id,
+                        "content": content,
+                        "content_hash": digest,
+                        "chunk_index": idx,
+                        "embedding": to_pgvector_literal(embedding),
+                        "metadata": base_metadata,
+                    }
+                    for (idx, content, digest), embedding in zip(fresh, embeddings)
+                ]
+                for page in _windows(rows, settings.chunk_insert_page_size):
+                    result = db.table("chunks").insert(page).execute()
+                    inserted_ids.extend(row["id"] for row in result.data or [])
+            _report("embedding")
+    except Exception:
+        with suppress(Exception):
+            _delete_chunk_ids(db, inserted_ids)
+        raise
+
+    if chunk_count == 0:
         raise ValueError("No text content found after extraction.")
 
     # ------------------------------------------------------------------
-    # 4. Embed concurrently
+    # 7. Diff step — renumber kept rows, drop rows that no longer match
     # ------------------------------------------------------------------
-    embeddings: list[list[float]] = [[] for _ in chunks]
-    with ThreadPoolExecutor(max_workers=settings.embed_concurrency) as pool:
-        futures = {
-            pool.submit(_embed_chunk, (i, content)): i
-            for i, content in enumerate(chunks)
-        }
-        for future in as_completed(futures):
-            idx, emb = future.result()
-            embeddings[idx] = emb
+    _report("finalizing")
+    if moved:
+        _reindex_chunks(db, moved)
+    if metadata_changed:
+        db.table("chunks").update({"metadata": base_metadata}).eq("source_id", source_id).execute()
 
-    # ------------------------------------------------------------------
-    # 5. Delete stale chunks
-    # ------------------------------------------------------------------
-    db.table("chunks").delete().eq("source_id", source_id).execute()
+    stale_ids = [row["id"] for rows in reusable.values() for row in rows]
+    stale_ids += [row["id"] for row in existing_rows if not row.get("content_hash")]
+    if stale_ids:
+        # Before the delete, whose cascade would drop the mentions silently
+        try:
+            retract_entities_for_chunks(source["project_id"], stale_ids)
+        except Exception as exc:
+            logger.warning("retracting entity mentions of %s failed: %s", source_id, exc)
+    _delete_chunk_ids(db, stale_ids)
+
+    if embedded_count or stale_ids or moved or metadata_changed:
+        cache_manager.bump_corpus_version(source["project_id"])
 
     # ------------------------------------------------------------------
-    # 6. Insert new chunks
+    # 8. Entity extraction for the chunks this run wrote
     # ------------------------------------------------------------------
-    base_metadata = {
-        "project_id": source["project_id"],
-        "source_type": source.get("source_type", "untyped"),
-        "segment_tags": source.get("segment_tags") or [],
-        **(source.get("metadata") or {}),
-    }
-
-    chunk_rows = [
-        {
-            "source_id": source_id,
-            "content": content,
-            "chunk_index": idx,
-            "embedding": to_pgvector_literal(embeddings[idx]),
-            "metadata": base_metadata,
-        }
-        for idx, content in enumerate(chunks)
-    ]
+    entity_mentions_created = 0
+    if settings.entity_extraction_on_ingest and inserted_ids:
+        _report("entities")
+        try:
+            entity_mentions_created = extract_entities_for_chunks(
+                source["project_id"], inserted_ids
+            )["mentions_created"]
+        except Exception as exc:
+            logger.warning("entity extraction after ingesting %s failed: %s", source_id, exc)
 
-    db.table("chunks").insert(chunk_rows).execute()
-
-    return {"source_id": source_id, "chunk_count": len(chunks)}
+    return {
+        "source_id": source_id,
+        "chunk_count": chunk_count,
+        "embedded_count": embedded_count,
+        "reused_count": chunk_count - embedded_count,
+        "deleted_count": len(stale_ids),
+        "embed_seconds": round(embed_seconds, 3),
+        "entity_mentions_created": entity_mentions_created,
+    }
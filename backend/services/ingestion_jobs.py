@@ -0,0 +1,320 @@
+"""Background ingestion jobs — submit a source, poll its progress.
+
+POST /api/sources/process runs the whole pipeline inside the HTTP request,
+which times out for large uploads. This module runs the same pipeline on a
+local worker pool instead:
+
+  submit_ingestion_job(source_id)  → job row (status "queued"), returns at once
+  worker thread                    → claims the job, runs run_ingestion_pipeline
+                                     with a progress callback, retries transient
+                                     failures with exponential backoff
+  get_ingestion_job(job_id)        → current status + per-stage progress
+
+Job rows live in the Supabase `ingestion_jobs` table
+(db/migrations/0006_ingestion_jobs.sql) so any API worker can report on any
+job. Jobs submitted in this process are also mirrored in an in-process dict,
+which lets polling and SSE streams read progress without a DB round trip.
+
+Concurrency: INGEST_JOB_WORKERS sources are processed in parallel; every job
+embeds through embeddings.create_embeddings_batch, which draws from the
+shared EMBED_TOKENS_PER_MINUTE budget.
+
+Statuses: queued → running (→ retrying → running …) → succeeded | failed
+
+A job's updated_at doubles as a lease: while a worker owns the job, a
+heartbeat thread refreshes it every INGEST_JOB_LEASE_SECONDS / 3, however
+long a single window takes. On startup, running / retrying jobs whose
+updated_at is older than the lease were orphaned by a dead process and are
+re-queued.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from backend.config import settings
+from backend.db.supabase_client import get_supabase
+from backend.services.ingestion import run_ingestion_pipeline
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = frozenset({"succeeded", "failed"})
+
+# Finished jobs kept in the in-process mirror; older ones are read from the DB
+_MAX_FINISHED_JOBS = 500
+
+_jobs: dict[str, dict] = {}
+_jobs_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.ingest_job_workers),
+                thread_name_prefix="ingest-job",
+            )
+        return _executor
+
+
+def _update_job(job_id: str, **fields) -> dict:
+    """Apply *fields* to the in-process mirror and persist them (best effort)."""
+    fields["updated_at"] = _now()
+    with _jobs_lock:
+        job = _jobs.setdefault(job_id, {"id": job_id})
+        job.update(fields)
+        snapshot = dict(job)
+    try:
+        get_supabase().table("ingestion_jobs").update(fields).eq("id", job_id).execute()
+    except Exception as exc:
+        logger.warning("ingestion job %s: failed to persist update: %s", job_id, exc)
+    return snapshot
+
+
+def _claim_job(job_id: str) -> bool:
+    """Atomically move a queued job to running so only one worker processes it."""
+    now = _now()
+    claimed = (
+        get_supabase()
+        .table("ingestion_jobs")
+        .update({"status": "running", "started_at": now, "updated_at": now})
+        .eq("id", job_id)
+        .eq("status", "queued")
+        .execute()
+    )
+    if not claimed.data:
+        return False
+    with _jobs_lock:
+        _jobs.setdefault(job_id, {"id": job_id}).update(
+            {"status": "running", "started_at": now, "updated_at": now}
+        )
+    return True
+
+
+def _prune_finished_jobs() -> None:
+    """Drop the oldest finished jobs from the in-process mirror."""
+    with _jobs_lock:
+        finished = [j for j in _jobs.values() if j.get("status") in TERMINAL_STATUSES]
+        excess = len(finished) - _MAX_FINISHED_JOBS
+        if excess <= 0:
+            return
+        finished.sort(key=lambda j: j.get("finished_at") or "")
+        for job in finished[:excess]:
+            _jobs.pop(job["id"], None)
+
+
+def _heartbeat(job_id: str, stop: threading.Event) -> None:
+    """Refresh the job's lease until *stop* is set."""
+    interval = settings.ingest_job_lease_seconds / 3
+    while not stop.wait(interval):
+        try:
+            (
+                get_supabase()
+                .table("ingestion_jobs")
+                .update({"updated_at": _now()})
+                .eq("id", job_id)
+                .in_("status", ["running", "retrying"])
+                .execute()
+            )
+        except Exception as exc:
+            logger.warning("ingestion job %s: heartbeat failed: %s", job_id, exc)
+
+
+def _run_job(job_id: str, source_id: str) -> None:
+    """Worker body: claim the job, then run it while a heartbeat holds the lease."""
+    try:
+        if not _claim_job(job_id):
+            return
+    except Exception as exc:
+        logger.warning("ingestion job %s: could not claim: %s", job_id, exc)
+        _update_job(job_id, status="failed", error=f"could not claim job: {exc}", finished_at=_now())
+        return
+
+    stop = threading.Event()
+    threading.Thread(
+        target=_heartbeat, args=(job_id, stop), name=f"ingest-heartbeat-{job_id[:8]}", daemon=True
+    ).start()
+    try:
+        _run_attempts(job_id, source_id)
+    finally:
+        stop.set()
+
+
+def _run_attempts(job_id: str, source_id: str) -> None:
+    """Run the pipeline with retries and progress reporting."""
+    max_attempts = max(1, settings.ingest_job_max_attempts)
+
+    def _on_progress(progress: dict) -> None:
+        _update_job(job_id, progress=progress)
+
+    for attempt in range(1, max_attempts + 1):
+        _update_job(job_id, status="running", attempts=attempt)
+        try:
+            result = run_ingestion_pipeline(source_id, on_progress=_on_progress)
+        except ValueError as exc:
+            # Missing source / no extractable text — retrying will not help
+            _update_job(job_id, status="failed", error=str(exc), finished_at=_now())
+            return
+        except Exception as exc:
+            if attempt >= max_attempts:
+                _update_job(job_id, status="failed", error=str(exc), finished_at=_now())
+                return
+            delay = settings.ingest_job_backoff_seconds * (2 ** (attempt - 1))
+            logger.warning(
+                "ingestion job %s attempt %d/%d failed (%s); retrying in %.1fs",
+                job_id, attempt, max_attempts, exc, delay,
+            )
+            _update_job(job_id, status="retrying", error=str(exc))
+            time.sleep(delay)
+            continue
+
+        _update_job(
+            job_id,
+            status="succeeded",
+            result=result,
+            error=None,
+            finished_at=_now(),
+        )
+        return
+
+
+def submit_ingestion_job(source_id: str) -> dict:
+    """Queue *source_id* for background ingestion and return the job record.
+
+    If this process already has an unfinished job for the same source, that
+    job is returned instead of queueing a duplicate.
+    """
+    _prune_finished_jobs()
+    with _jobs_lock:
+        for job in _jobs.values():
+            if job.get("source_id") == source_id and job.get("status") not in TERMINAL_STATUSES:
+                return dict(job)
+
+    job_id = str(uuid.uuid4())
+    now = _now()
+    job = {
+        "id": job_id,
+        "source_id": source_id,
+        "status": "queued",
+        "attempts": 0,
+        "progress": {"stage": "queued", "chunks_processed": 0, "chunks_embedded": 0, "rows_written": 0},
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+        "started_at": None,
+        "finished_at": None,
+    }
+    get_supabase().table("ingestion_jobs").insert(job).execute()
+    with _jobs_lock:
+        _jobs[job_id] = dict(job)
+
+    _get_executor().submit(_run_job, job_id, source_id)
+    return job
+
+
+def get_ingestion_job(job_id: str) -> dict | None:
+    """Return the job record, preferring the in-process mirror over the DB."""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is not None:
+            return dict(job)
+
+    result = get_supabase().table("ingestion_jobs").select("*").eq("id", job_id).execute()
+    return result.data[0] if result.data else None
+
+
+def _requeue_expired(row: dict) -> bool:
+    """Move an orphaned running / retrying job back to queued.
+
+    Guarded on the updated_at we read, so a job that is still making
+    progress, or that another process requeues first, is left alone.
+    """
+    requeued = (
+        get_supabase()
+        .table("ingestion_jobs")
+        .update({"status": "queued", "updated_at": _now()})
+        .eq("id", row["id"])
+        .eq("updated_at", row["updated_at"])
+        .execute()
+    )
+    return bool(requeued.data)
+
+
+def resume_queued_jobs() -> int:
+    """Re-submit jobs a previous process queued or abandoned.
+
+    Called on application startup. Picks up "queued" jobs, plus "running" /
+    "retrying" jobs whose lease (updated_at + INGEST_JOB_LEASE_SECONDS) has
+    expired. Returns the number of jobs resumed.
+    """
+    cutoff = (
+        datetime.now(timezone.utc) - timedelta(seconds=settings.ingest_job_lease_seconds)
+    ).isoformat()
+    try:
+        db = get_supabase()
+        queued = (
+            db.table("ingestion_jobs")
+            .select("*")
+            .eq("status", "queued")
+            .order("created_at")
+            .execute()
+            .data
+            or []
+        )
+        expired = (
+            db.table("ingestion_jobs")
+            .select("*")
+            .in_("status", ["running", "retrying"])
+            .lt("updated_at", cutoff)
+            .order("created_at")
+            .execute()
+            .data
+            or []
+        )
+    except Exception as exc:
+        logger.warning("could not load queued ingestion jobs: %s", exc)
+        return 0
+
+    resumed = 0
+    for row in queued + expired:
+        with _jobs_lock:
+            if row["id"] in _jobs:
+                continue
+        if row["status"] != "queued":
+            try:
+                if not _requeue_expired(row):
+                    continue
+            except Exception as exc:
+                logger.warning("ingestion job %s: could not requeue: %s", row["id"], exc)
+                continue
+            logger.info("ingestion job %s: lease expired while %s; requeued", row["id"], row["status"])
+            row = {**row, "status": "queued"}
+        with _jobs_lock:
+            if row["id"] in _jobs:
+                continue
+            _jobs[row["id"]] = dict(row)
+        _get_executor().submit(_run_job, row["id"], row["source_id"])
+        resumed += 1
+    return resumed
+
+
+def shutdown(wait: bool = False) -> None:
+    """Stop accepting jobs; optionally wait for running ones to finish."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait, cancel_futures=not wait)
+            _executor = None
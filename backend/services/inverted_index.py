@@ -0,0 +1,200 @@
+"""Incremental inverted index with BM25 scoring for in-session keyword search.
+
+The agents' keyword tools used to rebuild ``set(text.lower().split())`` for
+every candidate on every call — quadratic over a ReAct session. This index
+tokenizes each document once, keeps term postings, and answers a query by
+walking only the postings of the query's terms:
+
+    index = InvertedIndex()
+    index.add("acme#0", "Pricing was the main blocker", payload={...})
+    index.search("pricing blockers", k=5)       # → [(doc_id, bm25), ...]
+    index.search("pricing churn", min_coverage=0.5)  # both terms present
+    index.remove("acme#0")
+
+sync() brings an index in line with a {doc_id: (text, payload)} mapping,
+tokenizing only new or changed documents — cheap to call before every query
+over a collection that grows during the session (research results, memory).
+
+Tokenizer: lowercase alphanumeric runs (punctuation split off), a short
+stopword list, and a light suffix-stripping stemmer so "blockers" / "blocked"
+/ "blocking" share a term. Thread-safe; ReAct tools run in parallel.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from collections.abc import Callable, Hashable, Mapping
+from typing import Any
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from had has have how i if in is it its "
+    "of on or so that the their them they this to was we were what when which "
+    "who why will with you your".split()
+)
+
+# (suffix, replacement, minimum stem length left behind)
+_SUFFIX_RULES: tuple[tuple[str, str, int], ...] = (
+    ("sses", "ss", 2),
+    ("ies", "y", 2),
+    ("ied", "y", 2),
+    ("ingly", "", 3),
+    ("edly", "", 3),
+    ("ings", "", 3),
+    ("ing", "", 3),
+    ("ers", "", 3),
+    ("er", "", 3),
+    ("ed", "", 3),
+    ("ments", "", 3),
+    ("ment", "", 3),
+    ("ness", "", 3),
+    ("ly", "", 3),
+    ("es", "", 3),
+    ("s", "", 3),
+)
+_VOWELS = frozenset("aeiouy")
+
+
+def stem(word: str) -> str:
+    """Strip one common English inflectional suffix (lightweight, not Porter)."""
+    if len(word) <= 3 or word.isdigit() or word.endswith(("ss", "us", "is")):
+        return word
+    for suffix, replacement, min_stem in _SUFFIX_RULES:
+        if word.endswith(suffix):
+            base = word[: -len(suffix)]
+            if len(base) < min_stem or not _VOWELS.intersection(base):
+                continue
+            base += replacement
+            # "stopped" → "stopp" → "stop"; keep "ll"/"ss"/"zz" ("called" → "call")
+            if replacement == "" and len(base) > 3 and base[-1] == base[-2] and base[-1] not in "lsz":
+                base = base[:-1]
+            return base
+    # Silent final e, so "price" meets "pricing" / "priced" / "prices" at "pric"
+    if word.endswith("e"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase, split on punctuation/whitespace, drop stopwords, stem."""
+    return [stem(t) for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class _Doc:
+    __slots__ = ("text", "terms", "length", "payload")
+
+    def __init__(self, text: str, terms: Counter, payload: Any) -> None:
+        self.text = text
+        self.terms = terms
+        self.length = sum(terms.values())
+        self.payload = payload
+
+
+class InvertedIndex:
+    """Term → {doc_id: term frequency} postings with Okapi BM25 ranking."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, dict[Hashable, int]] = {}
+        self._docs: dict[Hashable, _Doc] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._docs
+
+    def payload(self, doc_id: Hashable) -> Any:
+        return self._docs[doc_id].payload
+
+    def add(self, doc_id: Hashable, text: str, payload: Any = None) -> None:
+        """Index *text* under *doc_id*, replacing any previous version."""
+        terms = Counter(tokenize(text))
+        with self._lock:
+            self._remove(doc_id)
+            doc = _Doc(text, terms, payload)
+            self._docs[doc_id] = doc
+            self._total_length += doc.length
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+
+    def remove(self, doc_id: Hashable) -> bool:
+        with self._lock:
+            return self._remove(doc_id)
+
+    def _remove(self, doc_id: Hashable) -> bool:
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return False
+        self._total_length -= doc.length
+        for term in doc.terms:
+            posting = self._postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self._postings[term]
+        return True
+
+    def sync(self, docs: Mapping[Hashable, tuple[str, Any]]) -> None:
+        """Make the index hold exactly *docs*; only new / changed texts are tokenized."""
+        with self._lock:
+            for doc_id in [d for d in self._docs if d not in docs]:
+                self._remove(doc_id)
+            for doc_id, (text, payload) in docs.items():
+                current = self._docs.get(doc_id)
+                if current is None or current.text != text:
+                    self.add(doc_id, text, payload)
+                else:
+                    current.payload = payload
+
+    def search(
+        self,
+        query: str,
+        k: int | None = 10,
+        min_coverage: float = 0.0,
+        where: Callable[[Any], bool] | None = None,
+    ) -> list[tuple[Hashable, float]]:
+        """Return up to *k* (doc_id, BM25 score) pairs, best first.
+
+        Only documents sharing at least one term with the query are returned.
+        Documents must also contain more than *min_coverage* of the query's
+        distinct terms (the old keyword-overlap thresholds carry over as-is),
+        and *where* filters on the document payload. k=None returns every match.
+        """
+        query_terms = set(tokenize(query))
+        if not query_terms:
+            return []
+        with self._lock:
+            n_docs = len(self._docs)
+            if not n_docs:
+                return []
+            avg_length = self._total_length / n_docs
+            scores: dict[Hashable, float] = {}
+            matched: Counter = Counter()
+            for term in query_terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id, tf in posting.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._docs[doc_id].length / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+                    matched[doc_id] += 1
+
+            needed = min_coverage * len(query_terms)
+            hits = [
+                (doc_id, score)
+                for doc_id, score in scores.items()
+                if matched[doc_id] > needed
+                and (where is None or where(self._docs[doc_id].payload))
+            ]
+        if k is None:
+            return sorted(hits, key=lambda h: h[1], reverse=True)
+        return heapq.nlargest(k, hits, key=lambda h: h[1])
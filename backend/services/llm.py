@@ -32,6 +32,11 @@ from functools import lru_cache
 from langchain_core.language_models import BaseChatModel
 
 from backend.config import settings
+from backend.services.rate_limit import TokenBucket
+
+# Input-token budget shared by concurrent batch callers (LLM_TOKENS_PER_MINUTE);
+# acquire an estimate before each call. Unlimited by default.
+llm_token_budget = TokenBucket(per_minute=settings.llm_tokens_per_minute)
 
 
 def _build_llm(model: str, max_tokens: int) -> BaseChatModel:
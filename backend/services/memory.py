@@ -20,15 +20,25 @@ Usage in the RAG pipeline:
      → inject relevant past PM knowledge into context
   2. After generating an answer: add_memories(messages, project_id, user_id)
      → distil key takeaways for future sessions
+
+add_memories makes its own LLM calls and takes seconds, so latency-sensitive
+callers use add_memories_in_background(), which queues the write on a single
+background writer thread and returns immediately. Writes for the same
+project/user therefore still apply in submission order.
 """
 
+import logging
+import threading
 import urllib.parse
+from concurrent.futures import Future, ThreadPoolExecutor
 from functools import lru_cache
 
 from mem0 import Memory
 
 from backend.config import settings
 
+logger = logging.getLogger(__name__)
+
 _COLLECTION_NAME = "pm_agent_memories"
 
 # mem0 provider names may differ from our LLM_PROVIDER values; map them here.
@@ -182,3 +192,46 @@ def delete_memory(memory_id: str) -> None:
     """Delete a specific memory by its ID."""
     m = _get_mem0_client()
     m.delete(memory_id)
+
+
+# ---------------------------------------------------------------------------
+# Background writer
+# ---------------------------------------------------------------------------
+
+_writer: ThreadPoolExecutor | None = None
+_writer_lock = threading.Lock()
+
+
+def _write_memories(messages: list[dict], project_id: str, user_id: str) -> list[dict]:
+    try:
+        return add_memories(messages, project_id, user_id)
+    except Exception as exc:
+        # Nobody awaits these writes — log instead of losing the error silently
+        logger.warning("background memory write failed for project %s: %s", project_id, exc)
+        return []
+
+
+def add_memories_in_background(
+    messages: list[dict],
+    project_id: str,
+    user_id: str,
+) -> Future:
+    """Queue add_memories() on the background writer and return at once.
+
+    The returned future resolves to the same records add_memories() returns
+    (an empty list if the write failed).
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-writer")
+        return _writer.submit(_write_memories, list(messages), project_id, user_id)
+
+
+def shutdown_memory_writer(wait: bool = True) -> None:
+    """Stop the background writer, by default draining queued writes first."""
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.shutdown(wait=wait)
+            _writer = None
@@ -12,6 +12,28 @@ Steps:
 
 The LLM is selected via the LLM_PROVIDER env var — no Anthropic-specific code here.
 
+run_rag_pipeline_async() is the non-blocking variant used by
+POST /api/search/rag/async: steps 1 and 2 run concurrently, the LLM call is
+awaited, and step 6 is handed to the background memory writer so it never
+sits on the response path.
+
+stream_rag_pipeline() (POST /api/search/rag/stream) goes one step further and
+yields events as they become available:
+
+    retrieved  {retrieved_chunks}                 — as soon as retrieval is done
+    token      {text}                             — each generated text delta
+    citation   {chunk_id}                         — each new chunk_id citation,
+                                                    as soon as its UUID completes
+    done       {answer, cited_chunk_ids, usage,   — final result
+                cached}
+
+Semantic answer cache: before retrieval, every pipeline embeds the query and
+looks for a past answer in the same scope (project, user, filters, corpus
+version — see cache_manager) whose query embedding has cosine similarity
+≥ RAG_SEMANTIC_CACHE_THRESHOLD. A hit is returned as-is with cached=True and
+zero usage; no retrieval, generation or memory write happens. Multi-turn
+requests (with conversation_history) always bypass the cache.
+
 Returns:
     {
       "answer": str,
@@ -21,10 +43,15 @@ Returns:
     }
 """
 
+import asyncio
 import re
+from collections.abc import AsyncIterator
 
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 
+from backend.config import settings
+from backend.services import cache_manager
+from backend.services.embeddings import create_embedding
 from backend.services.llm import get_strong_llm
 from backend.services.semantic_search import semantic_search
 
@@ -40,6 +67,198 @@ what additional data would help.
 - Keep answers focused and evidence-first."""
 
 
+_NO_CONTENT_RESULT = {
+    "answer": (
+        "No relevant content found for this project. "
+        "Please add and process source documents first."
+    ),
+    "cited_chunk_ids": [],
+    "retrieved_chunks": [],
+    "usage": {"input_tokens": 0, "output_tokens": 0},
+    "cached": False,
+}
+
+_UUID_PATTERN = r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+_CITATION_RE = re.compile(rf"chunk_id[:\s]+({_UUID_PATTERN})", re.IGNORECASE)
+
+# Longest tail of unscanned text that could still hold an incomplete citation
+# ("chunk_id" + separators + a 36-char UUID); anything older has been checked.
+_CITATION_TAIL_CHARS = 64
+
+
+def _message_text(message) -> str:
+    """Plain text of an LLM message / chunk (content may be str or blocks)."""
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block)
+        for block in content or []
+    )
+
+
+class _CitationScanner:
+    """Finds chunk_id citations in a growing answer without rescanning it all."""
+
+    def __init__(self) -> None:
+        self.text = ""
+        self.cited: list[str] = []
+        self._scan_from = 0
+
+    def feed(self, delta: str) -> list[str]:
+        """Append *delta*; return chunk IDs whose citation just completed."""
+        self.text += delta
+        new_ids: list[str] = []
+        for match in _CITATION_RE.finditer(self.text, self._scan_from):
+            self._scan_from = match.end()
+            chunk_id = match.group(1)
+            if chunk_id not in self.cited:
+                self.cited.append(chunk_id)
+                new_ids.append(chunk_id)
+        self._scan_from = max(self._scan_from, len(self.text) - _CITATION_TAIL_CHARS)
+        return new_ids
+
+
+def _recall_memories(query: str, project_id: str, user_id: str | None) -> str:
+    """Return the past-session memory block for the prompt ("" if none)."""
+    if not user_id:
+        return ""
+    try:
+        from backend.services.memory import search_memories
+        memories = search_memories(query, project_id, user_id, limit=4)
+    except Exception:
+        return ""  # Memory retrieval failures must not break the RAG response
+    if not memories:
+        return ""
+    memory_lines = "\n".join(f"- {m['memory']}" for m in memories)
+    return f"Relevant PM knowledge from past sessions:\n{memory_lines}\n\n"
+
+
+def _build_messages(
+    query: str,
+    chunks: list[dict],
+    memory_context: str,
+    conversation_history: list[dict] | None,
+) -> list:
+    """Assemble the evidence block and the LangChain message list."""
+    evidence_parts = []
+    for i, chunk in enumerate(chunks, start=1):
+        evidence_parts.append(
+            f"[{i}] chunk_id: {chunk['chunk_id']}\n"
+            f"    source_id: {chunk['source_id']}\n"
+            f"    similarity: {chunk['similarity']:.3f}\n"
+            f"    content:\n{chunk['content']}"
+        )
+    evidence_block = "\n\n" + ("-" * 60) + "\n\n".join(evidence_parts)
+
+    augmented_user_message = (
+        f"{memory_context}"
+        f"Research evidence ({len(chunks)} chunks):\n"
+        f"{evidence_block}\n\n"
+        f"{'=' * 60}\n\n"
+        f"Question: {query}"
+    )
+
+    # Prepend history, append the augmented question
+    lc_messages = [SystemMessage(content=_RAG_SYSTEM_PROMPT)]
+    for msg in conversation_history or []:
+        role = msg.get("role", "")
+        content = msg.get("content", "")
+        if role == "user":
+            lc_messages.append(HumanMessage(content=content))
+        elif role == "assistant":
+            lc_messages.append(AIMessage(content=content))
+    lc_messages.append(HumanMessage(content=augmented_user_message))
+    return lc_messages
+
+
+def _chunk_previews(chunks: list[dict]) -> list[dict]:
+    return [
+        {
+            "chunk_id": c["chunk_id"],
+            "source_id": c["source_id"],
+            "similarity": c["similarity"],
+            "content_preview": c["content"][:200],
+        }
+        for c in chunks
+    ]
+
+
+def _build_result(response, chunks: list[dict]) -> dict:
+    """Extract citations and usage from the LLM response into the result dict."""
+    answer = _message_text(response)
+
+    # Cited chunk IDs are UUIDs appearing after "chunk_id:"
+    cited_ids = list(dict.fromkeys(_CITATION_RE.findall(answer)))
+
+    # Normalise usage metadata (provider-agnostic)
+    usage_meta = response.usage_metadata or {}
+    usage = {
+        "input_tokens": usage_meta.get("input_tokens", 0),
+        "output_tokens": usage_meta.get("output_tokens", 0),
+    }
+
+    return {
+        "answer": answer,
+        "cited_chunk_ids": cited_ids,
+        "retrieved_chunks": _chunk_previews(chunks),
+        "usage": usage,
+        "cached": False,
+    }
+
+
+def _semantic_cache_lookup(
+    project_id: str,
+    query: str,
+    user_id: str | None,
+    conversation_history: list[dict] | None,
+    match_count: int,
+    source_types: list[str] | None,
+    segment_tags: list[str] | None,
+) -> tuple[tuple, object, dict | None] | None:
+    """Return (scope, query_vector, cached_result_or_None), or None to bypass.
+
+    The answer depends on user memories (user_id is part of the scope) and on
+    prior turns, so multi-turn requests are never cached.
+    """
+    if settings.rag_semantic_cache_threshold <= 0 or conversation_history:
+        return None
+    try:
+        filters = {
+            "match_count": match_count,
+            "source_types": sorted(source_types or []),
+            "segment_tags": sorted(segment_tags or []),
+        }
+        scope = cache_manager.semantic_cache_scope(project_id, filters, user_id)
+        vector = create_embedding(query)  # reused by semantic_search via the embedding cache
+    except Exception:
+        return None
+    cached = cache_manager.get_semantic_answer(scope, vector)
+    if cached is not None:
+        cached = {**cached, "usage": {"input_tokens": 0, "output_tokens": 0}, "cached": True}
+    return scope, vector, cached
+
+
+def _semantic_cache_store(lookup, result: dict) -> None:
+    if lookup is None or not result.get("retrieved_chunks"):
+        return
+    scope, vector, _ = lookup
+    usage = result.get("usage") or {}
+    cache_manager.store_semantic_answer(
+        scope,
+        vector,
+        result,
+        tokens=usage.get("input_tokens", 0) + usage.get("output_tokens", 0),
+    )
+
+
+def _exchange(query: str, answer: str, conversation_history: list[dict] | None) -> list[dict]:
+    return (conversation_history or []) + [
+        {"role": "user", "content": query},
+        {"role": "assistant", "content": answer},
+    ]
+
+
 def run_rag_pipeline(
     project_id: str,
     query: str,
@@ -65,25 +284,17 @@ def run_rag_pipeline(
     Returns:
         Dict with answer, citations, retrieved chunk metadata, and token usage.
     """
-    # ------------------------------------------------------------------
+    # 0. Serve a semantically equivalent past answer if we have one
+    lookup = _semantic_cache_lookup(
+        project_id, query, user_id, conversation_history, match_count, source_types, segment_tags
+    )
+    if lookup is not None and lookup[2] is not None:
+        return lookup[2]
+
     # 1. Retrieve relevant memories from past sessions
-    # ------------------------------------------------------------------
-    memory_context = ""
-    if user_id:
-        try:
-            from backend.services.memory import search_memories
-            memories = search_memories(query, project_id, user_id, limit=4)
-            if memories:
-                memory_lines = "\n".join(f"- {m['memory']}" for m in memories)
-                memory_context = (
-                    f"Relevant PM knowledge from past sessions:\n{memory_lines}\n\n"
-                )
-        except Exception:
-            pass  # Memory retrieval failures must not break the RAG response
+    memory_context = _recall_memories(query, project_id, user_id)
 
-    # ------------------------------------------------------------------
     # 2. Retrieve relevant chunks via semantic search
-    # ------------------------------------------------------------------
     chunks = semantic_search(
         project_id=project_id,
         query=query,
@@ -91,108 +302,165 @@ def run_rag_pipeline(
         source_types=source_types,
         segment_tags=segment_tags,
     )
-
     if not chunks:
-        return {
-            "answer": (
-                "No relevant content found for this project. "
-                "Please add and process source documents first."
-            ),
-            "cited_chunk_ids": [],
-            "retrieved_chunks": [],
-            "usage": {"input_tokens": 0, "output_tokens": 0},
-        }
+        return dict(_NO_CONTENT_RESULT)
 
-    # ------------------------------------------------------------------
-    # 3. Build the evidence block (memory context + retrieved chunks)
-    # ------------------------------------------------------------------
-    evidence_parts = []
-    for i, chunk in enumerate(chunks, start=1):
-        evidence_parts.append(
-            f"[{i}] chunk_id: {chunk['chunk_id']}\n"
-            f"    source_id: {chunk['source_id']}\n"
-            f"    similarity: {chunk['similarity']:.3f}\n"
-            f"    content:\n{chunk['content']}"
-        )
-    evidence_block = "\n\n" + ("-" * 60) + "\n\n".join(evidence_parts)
-
-    augmented_user_message = (
-        f"{memory_context}"
-        f"Research evidence ({len(chunks)} chunks):\n"
-        f"{evidence_block}\n\n"
-        f"{'=' * 60}\n\n"
-        f"Question: {query}"
-    )
-
-    # ------------------------------------------------------------------
-    # 4. Build message list (prepend history, append augmented question)
-    # ------------------------------------------------------------------
-    lc_messages = [SystemMessage(content=_RAG_SYSTEM_PROMPT)]
-    if conversation_history:
-        for msg in conversation_history:
-            role = msg.get("role", "")
-            content = msg.get("content", "")
-            if role == "user":
-                lc_messages.append(HumanMessage(content=content))
-            elif role == "assistant":
-                from langchain_core.messages import AIMessage
-                lc_messages.append(AIMessage(content=content))
-    lc_messages.append(HumanMessage(content=augmented_user_message))
+    # 3–4. Build the evidence block and message list
+    lc_messages = _build_messages(query, chunks, memory_context, conversation_history)
 
-    # ------------------------------------------------------------------
     # 5. Generate with the configured strong LLM (provider-agnostic)
-    # ------------------------------------------------------------------
     response = get_strong_llm().invoke(lc_messages)
-    answer: str = response.content
-
-    # ------------------------------------------------------------------
-    # 6. Extract cited chunk IDs (UUIDs appearing after "chunk_id:")
-    # ------------------------------------------------------------------
-    uuid_pattern = r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
-    cited_ids = list(
-        dict.fromkeys(
-            re.findall(
-                rf"chunk_id[:\s]+({uuid_pattern})",
-                answer,
-                re.IGNORECASE,
-            )
-        )
-    )
-
-    # ------------------------------------------------------------------
-    # 7. Normalise usage metadata (provider-agnostic)
-    # ------------------------------------------------------------------
-    usage_meta = response.usage_metadata or {}
-    usage = {
-        "input_tokens": usage_meta.get("input_tokens", 0),
-        "output_tokens": usage_meta.get("output_tokens", 0),
-    }
+    result = _build_result(response, chunks)
+    _semantic_cache_store(lookup, result)
 
-    # ------------------------------------------------------------------
-    # 8. Store this exchange as persistent memory for future sessions
-    # ------------------------------------------------------------------
+    # 6. Store this exchange as persistent memory for future sessions
     if user_id:
         try:
             from backend.services.memory import add_memories
-            exchange = (conversation_history or []) + [
-                {"role": "user", "content": query},
-                {"role": "assistant", "content": answer},
-            ]
-            add_memories(exchange, project_id, user_id)
+            add_memories(_exchange(query, result["answer"], conversation_history), project_id, user_id)
         except Exception:
             pass  # Memory storage failures must not affect the response
 
-    return {
-        "answer": answer,
-        "cited_chunk_ids": cited_ids,
-        "retrieved_chunks": [
-            {
-                "chunk_id": c["chunk_id"],
-                "source_id": c["source_id"],
-                "similarity": c["similarity"],
-                "content_preview": c["content"][:200],
-            }
-            for c in chunks
-        ],
-        "usage": usage,
+    return result
+
+
+async def _retrieve_async(
+    project_id: str,
+    query: str,
+    user_id: str | None,
+    match_count: int,
+    source_types: list[str] | None,
+    segment_tags: list[str] | None,
+) -> tuple[str, list[dict]]:
+    """Run memory recall and chunk retrieval concurrently in worker threads."""
+    memory_context, chunks = await asyncio.gather(
+        asyncio.to_thread(_recall_memories, query, project_id, user_id),
+        asyncio.to_thread(
+            semantic_search,
+            project_id=project_id,
+            query=query,
+            match_count=match_count,
+            source_types=source_types,
+            segment_tags=segment_tags,
+        ),
+    )
+    return memory_context, chunks
+
+
+def _remember_in_background(
+    project_id: str,
+    query: str,
+    answer: str,
+    user_id: str | None,
+    conversation_history: list[dict] | None,
+) -> None:
+    if not user_id:
+        return
+    try:
+        from backend.services.memory import add_memories_in_background
+        add_memories_in_background(_exchange(query, answer, conversation_history), project_id, user_id)
+    except Exception:
+        pass  # Memory storage failures must not affect the response
+
+
+async def run_rag_pipeline_async(
+    project_id: str,
+    query: str,
+    user_id: str | None = None,
+    conversation_history: list[dict] | None = None,
+    match_count: int = 8,
+    source_types: list[str] | None = None,
+    segment_tags: list[str] | None = None,
+) -> dict:
+    """Non-blocking run_rag_pipeline with the same arguments and result.
+
+    Memory recall and chunk retrieval (both blocking clients) run
+    concurrently in worker threads, the LLM call is awaited natively, and the
+    post-answer memory write is queued on the background memory writer
+    instead of delaying the response.
+    """
+    lookup = await asyncio.to_thread(
+        _semantic_cache_lookup,
+        project_id, query, user_id, conversation_history, match_count, source_types, segment_tags,
+    )
+    if lookup is not None and lookup[2] is not None:
+        return lookup[2]
+
+    memory_context, chunks = await _retrieve_async(
+        project_id, query, user_id, match_count, source_types, segment_tags
+    )
+    if not chunks:
+        return dict(_NO_CONTENT_RESULT)
+
+    lc_messages = _build_messages(query, chunks, memory_context, conversation_history)
+    response = await get_strong_llm().ainvoke(lc_messages)
+    result = _build_result(response, chunks)
+    _semantic_cache_store(lookup, result)
+
+    _remember_in_background(project_id, query, result["answer"], user_id, conversation_history)
+    return result
+
+
+async def stream_rag_pipeline(
+    project_id: str,
+    query: str,
+    user_id: str | None = None,
+    conversation_history: list[dict] | None = None,
+    match_count: int = 8,
+    source_types: list[str] | None = None,
+    segment_tags: list[str] | None = None,
+) -> AsyncIterator[tuple[str, dict]]:
+    """Streaming RAG: yield (event, data) pairs as the answer is generated.
+
+    The first event is always "retrieved" (sent before generation starts),
+    and the last is "done" carrying the same answer / cited_chunk_ids / usage
+    as run_rag_pipeline. Validation errors (ValueError) are raised before the
+    first event, so callers can still reject the request.
+    """
+    lookup = await asyncio.to_thread(
+        _semantic_cache_lookup,
+        project_id, query, user_id, conversation_history, match_count, source_types, segment_tags,
+    )
+    if lookup is not None and lookup[2] is not None:
+        cached = lookup[2]
+        yield "retrieved", {"retrieved_chunks": cached["retrieved_chunks"]}
+        yield "token", {"text": cached["answer"]}
+        for chunk_id in cached["cited_chunk_ids"]:
+            yield "citation", {"chunk_id": chunk_id}
+        yield "done", {key: value for key, value in cached.items() if key != "retrieved_chunks"}
+        return
+
+    memory_context, chunks = await _retrieve_async(
+        project_id, query, user_id, match_count, source_types, segment_tags
+    )
+    yield "retrieved", {"retrieved_chunks": _chunk_previews(chunks)}
+    if not chunks:
+        yield "done", {key: value for key, value in _NO_CONTENT_RESULT.items() if key != "retrieved_chunks"}
+        return
+
+    lc_messages = _build_messages(query, chunks, memory_context, conversation_history)
+    scanner = _CitationScanner()
+    full_message = None
+    async for piece in get_strong_llm().astream(lc_messages):
+        full_message = piece if full_message is None else full_message + piece
+        delta = _message_text(piece)
+        if not delta:
+            continue
+        yield "token", {"text": delta}
+        for chunk_id in scanner.feed(delta):
+            yield "citation", {"chunk_id": chunk_id}
+
+    usage_meta = (getattr(full_message, "usage_metadata", None) or {}) if full_message else {}
+    done = {
+        "answer": scanner.text,
+        "cited_chunk_ids": scanner.cited,
+        "usage": {
+            "input_tokens": usage_meta.get("input_tokens", 0),
+            "output_tokens": usage_meta.get("output_tokens", 0),
+        },
+        "cached": False,
     }
+    yield "done", done
+    _semantic_cache_store(lookup, {**done, "retrieved_chunks": _chunk_previews(chunks)})
+
+    _remember_in_background(project_id, query, scanner.text, user_id, conversation_history)
@@ -0,0 +1,66 @@
+"""Thread-safe token-bucket rate limiter for provider budgets.
+
+One shared bucket per provider budget (e.g. embedding tokens per minute) lets
+concurrent callers — ingestion jobs, request handlers — draw from the same
+allowance instead of each assuming it has the whole quota.
+
+Usage
+-----
+    bucket = TokenBucket(per_minute=1_000_000)
+    bucket.acquire(estimated_tokens)   # blocks until the budget allows it
+
+A bucket created with per_minute <= 0 is unlimited and never blocks.
+
+Buckets are in-process: every API / worker process has its own, so a
+provider quota split across N processes needs per_minute = quota / N.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``per_minute / 60`` per second."""
+
+    def __init__(self, per_minute: float, capacity: float | None = None) -> None:
+        self.per_minute = float(per_minute)
+        self.rate = self.per_minute / 60.0
+        # Default burst: one minute's worth of budget
+        self.capacity = float(capacity if capacity is not None else self.per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until *tokens* are available, then consume them.
+
+        Requests larger than the bucket capacity are clamped to the capacity
+        so they wait for a full bucket instead of deadlocking.
+
+        Returns the number of seconds spent waiting.
+        """
+        if self.unlimited:
+            return 0.0
+
+        cost = min(float(tokens), self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    return waited
+                delay = (cost - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
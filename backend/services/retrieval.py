@@ -0,0 +1,405 @@
+"""Unified retrieval engine — run several retrievers, fuse, diversify, rerank.
+
+Retrieval used to be spread across semantic_search.py, hybrid_search.py,
+PageIndex tree search and ad-hoc keyword-overlap scorers in the agents. This
+module puts them behind one interface:
+
+    results = retrieve(
+        query,
+        [HybridChunkRetriever(project_id), SemanticChunkRetriever(project_id)],
+        k=10,
+        max_per_source=2,        # per-source cap
+        mmr_lambda=0.7,          # MMR diversity (None = off)
+        reranker=CrossEncoderReranker(),   # optional local rerank
+    )
+    results["candidates"]   # fused, ranked candidate dicts
+    results["timings_ms"]   # {retriever name | "fusion" | "rerank": ms}
+    results["errors"]       # {retriever name: message} for retrievers that failed
+
+Pipeline
+--------
+  1. Every retriever runs in parallel (one worker thread each); a failing
+     retriever is reported in `errors` and simply contributes nothing.
+  2. Reciprocal rank fusion: each candidate scores Σ weight / (rrf_k + rank)
+     over the retrievers that returned it (rank is 1-based). Candidates are
+     deduplicated by id.
+  3. Optional rerank of the top `rerank_top_n` fused candidates.
+  4. Selection: greedy MMR over word-set similarity (when mmr_lambda is set)
+     with at most `max_per_source` candidates per source_id.
+
+A retriever is anything with a `name` and `retrieve(query, k) -> list[dict]`;
+each returned dict needs "id" and "content", and may carry "source_id",
+"score" and any other fields (kept in the fused candidate).
+
+The cross-encoder reranker needs sentence-transformers, which is optional:
+pip install sentence-transformers
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Protocol, TypedDict
+
+from backend.services.scoring import SetMatrix
+
+DEFAULT_RRF_K = 60
+
+
+class Candidate(TypedDict, total=False):
+    id: str
+    content: str
+    source_id: str | None
+    score: float              # fused (or reranked) score
+    retrievers: list[str]     # names of the retrievers that returned it
+    ranks: dict[str, int]     # retriever name → 1-based rank
+    rerank_score: float
+
+
+class Retriever(Protocol):
+    """A source of ranked candidates for a query."""
+
+    name: str
+
+    def retrieve(self, query: str, k: int) -> list[dict]: ...
+
+
+class Reranker(Protocol):
+    """Scores (query, content) pairs; higher is more relevant."""
+
+    def score(self, query: str, contents: Sequence[str]) -> list[float]: ...
+
+
+class RetrievalResult(TypedDict):
+    candidates: list[Candidate]
+    timings_ms: dict[str, float]
+    errors: dict[str, str]
+
+
+# ── Text helpers ──────────────────────────────────────────────────────────
+
+def _words(text: str) -> set[str]:
+    return set(text.lower().split())
+
+
+def keyword_overlap(query: str | set[str], text: str) -> float:
+    """Share of query words present in *text* (0–1), the agents' classic scorer."""
+    query_words = _words(query) if isinstance(query, str) else query
+    return len(query_words & _words(text)) / max(len(query_words), 1)
+
+
+# ── Built-in retrievers ───────────────────────────────────────────────────
+
+class SemanticChunkRetriever:
+    """pgvector cosine search over a project's chunks (semantic_search)."""
+
+    def __init__(
+        self,
+        project_id: str,
+        source_types: list[str] | None = None,
+        segment_tags: list[str] | None = None,
+        name: str = "semantic",
+    ) -> None:
+        self.project_id = project_id
+        self.source_types = source_types
+        self.segment_tags = segment_tags
+        self.name = name
+
+    def retrieve(self, query: str, k: int) -> list[dict]:
+        from backend.services.semantic_search import semantic_search
+        rows = semantic_search(
+            project_id=self.project_id,
+            query=query,
+            match_count=k,
+            source_types=self.source_types,
+            segment_tags=self.segment_tags,
+        )
+        return [{**row, "id": row["chunk_id"], "score": row.get("similarity")} for row in rows]
+
+
+class KeywordChunkRetriever:
+    """tsvector keyword search over a project's chunks."""
+
+    def __init__(self, project_id: str, name: str = "keyword") -> None:
+        self.project_id = project_id
+        self.name = name
+
+    def retrieve(self, query: str, k: int) -> list[dict]:
+        from backend.services.hybrid_search import keyword_search_chunks
+        rows = keyword_search_chunks(self.project_id, query, match_count=k)
+        return [{**row, "id": row["chunk_id"], "score": row.get("rank")} for row in rows]
+
+
+class HybridChunkRetriever:
+    """Vector + keyword chunk search fused server-side (hybrid_search_chunks RPC)."""
+
+    def __init__(self, project_id: str, name: str = "hybrid") -> None:
+        self.project_id = project_id
+        self.name = name
+
+    def retrieve(self, query: str, k: int) -> list[dict]:
+        from backend.services.hybrid_search import hybrid_search_chunks
+        rows = hybrid_search_chunks(self.project_id, query, match_count=k)
+        return [{**row, "id": row["chunk_id"], "score": row.get("combined_score")} for row in rows]
+
+
+class MemoryItemRetriever:
+    """Current memory items (hybrid_search_memory_items RPC)."""
+
+    def __init__(self, project_id: str, name: str = "memory") -> None:
+        self.project_id = project_id
+        self.name = name
+
+    def retrieve(self, query: str, k: int) -> list[dict]:
+        from backend.services.hybrid_search import hybrid_search_memory_items
+        rows = hybrid_search_memory_items(self.project_id, query, match_count=k)
+        return [
+            {**row, "source_id": row.get("type"), "score": row.get("combined_score")}
+            for row in rows
+        ]
+
+
+class KeywordOverlapRetriever:
+    """In-memory keyword-overlap scoring over (source, text) pairs.
+
+    Needs no database or model — used for locally loaded interview files.
+    """
+
+    def __init__(
+        self,
+        documents: Iterable[tuple[str, str]],
+        min_score: float = 0.0,
+        name: str = "keyword_overlap",
+    ) -> None:
+        self.documents = list(documents)
+        self.min_score = min_score
+        self.name = name
+
+    def retrieve(self, query: str, k: int) -> list[dict]:
+        query_words = _words(query)
+        scored = []
+        for i, (source, text) in enumerate(self.documents):
+            score = keyword_overlap(query_words, text)
+            if score > self.min_score:
+                scored.append({"id": f"{source}#{i}", "source_id": source, "content": text, "score": score})
+        scored.sort(key=lambda c: c["score"], reverse=True)
+        return scored[:k]
+
+
+class PageIndexRetriever:
+    """LLM-navigated PageIndex tree search over locally loaded documents."""
+
+    def __init__(self, documents: Iterable[tuple[str, str]], llm, name: str = "page_index") -> None:
+        self.documents = [(source, text) for source, text in documents if text.strip()]
+        self.llm = llm
+        self.name = name
+
+    def retrieve(self, query: str, k: int) -> list[dict]:
+        from backend.agents import page_index
+        page_index.build_indexes(self.documents, self.llm)
+        results: list[dict] = []
+        for source, text in self.documents:
+            tree = page_index.build_index(source, text, self.llm)
+            for section in page_index.retrieve(tree, query, text, self.llm):
+                results.append({
+                    "id": f"{source}#{section['node_id']}",
+                    "source_id": source,
+                    "content": section["content"],
+                    "node_title": section.get("title", ""),
+                    "reasoning": section.get("relevance_reasoning", ""),
+                })
+        return results[:k]
+
+
+# ── Reranking ─────────────────────────────────────────────────────────────
+
+@lru_cache(maxsize=2)
+def _load_cross_encoder(model_name: str):
+    try:
+        from sentence_transformers import CrossEncoder
+    except ImportError:
+        raise ImportError(
+            "Install sentence-transformers for cross-encoder reranking: "
+            "pip install sentence-transformers"
+        )
+    return CrossEncoder(model_name)
+
+
+class CrossEncoderReranker:
+    """Local cross-encoder relevance scores (sentence-transformers)."""
+
+    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2") -> None:
+        self.model_name = model_name
+
+    def score(self, query: str, contents: Sequence[str]) -> list[float]:
+        model = _load_cross_encoder(self.model_name)
+        return [float(s) for s in model.predict([(query, c) for c in contents])]
+
+
+# ── Engine ────────────────────────────────────────────────────────────────
+
+def _run_retriever(retriever: Retriever, query: str, k: int) -> tuple[list[dict], float, str | None]:
+    started = time.perf_counter()
+    try:
+        rows, error = retriever.retrieve(query, k), None
+    except Exception as exc:
+        rows, error = [], str(exc) or type(exc).__name__
+    return rows, round((time.perf_counter() - started) * 1000, 2), error
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: dict[str, list[dict]],
+    rrf_k: int = DEFAULT_RRF_K,
+    weights: dict[str, float] | None = None,
+) -> list[Candidate]:
+    """Fuse ranked lists by reciprocal rank; returns candidates best-first."""
+    fused: dict[str, Candidate] = {}
+    for name, rows in ranked_lists.items():
+        weight = (weights or {}).get(name, 1.0)
+        for rank, row in enumerate(rows, start=1):
+            candidate = fused.get(row["id"])
+            if candidate is None:
+                candidate = fused[row["id"]] = {
+                    **row,
+                    "score": 0.0,
+                    "retrievers": [],
+                    "ranks": {},
+                }
+            if name in candidate["ranks"]:
+                continue  # a retriever listing the same id twice counts once
+            candidate["score"] += weight / (rrf_k + rank)
+            candidate["retrievers"].append(name)
+            candidate["ranks"][name] = rank
+    return sorted(fused.values(), key=lambda c: c["score"], reverse=True)
+
+
+def select_diverse(
+    candidates: list[Candidate],
+    k: int,
+    mmr_lambda: float | None = None,
+    max_per_source: int | None = None,
+    similarity: Callable[[Candidate, Candidate], float] | None = None,
+) -> list[Candidate]:
+    """Pick *k* candidates in order, honouring MMR diversity and per-source caps.
+
+    With mmr_lambda set, each step picks the candidate maximising
+    λ·relevance − (1−λ)·max similarity to those already picked; relevance is
+    the candidate's score normalised to the top score.
+    """
+    per_source: dict[object, int] = {}
+
+    def _allowed(c: Candidate) -> bool:
+        return not max_per_source or per_source.get(c.get("source_id"), 0) < max_per_source
+
+    def _take(c: Candidate) -> None:
+        per_source[c.get("source_id")] = per_source.get(c.get("source_id"), 0) + 1
+        selected.append(c)
+
+    selected: list[Candidate] = []
+    if mmr_lambda is None:
+        for c in candidates:
+            if len(selected) >= k:
+                break
+            if _allowed(c):
+                _take(c)
+        return selected
+
+    if similarity is None:
+        # All-pairs word-set Jaccard in one matrix product
+        pairwise = SetMatrix([_words(c.get("content") or "") for c in candidates]).jaccard()
+    else:
+        pairwise = [[similarity(a, b) for b in candidates] for a in candidates]
+    top = max((c["score"] for c in candidates), default=0.0) or 1.0
+    # redundancy[i] = max similarity of candidate i to anything selected so far
+    redundancy = [0.0] * len(candidates)
+    remaining = list(range(len(candidates)))
+    while remaining and len(selected) < k:
+        best, best_value = None, float("-inf")
+        for i in remaining:
+            c = candidates[i]
+            if not _allowed(c):
+                continue
+            value = mmr_lambda * (c["score"] / top) - (1 - mmr_lambda) * redundancy[i]
+            if value > best_value:
+                best, best_value = i, value
+        if best is None:
+            break
+        remaining.remove(best)
+        _take(candidates[best])
+        redundancy = [max(r, float(s)) for r, s in zip(redundancy, pairwise[best])]
+    return selected
+
+
+def retrieve(
+    query: str,
+    retrievers: Sequence[Retriever],
+    k: int = 10,
+    per_retriever_k: int | None = None,
+    rrf_k: int = DEFAULT_RRF_K,
+    weights: dict[str, float] | None = None,
+    mmr_lambda: float | None = None,
+    max_per_source: int | None = None,
+    reranker: Reranker | None = None,
+    rerank_top_n: int = 30,
+) -> RetrievalResult:
+    """Run *retrievers* in parallel and return the fused, diversified top *k*.
+
+    Args:
+        query:           Natural-language query.
+        retrievers:      Retriever instances; names must be unique.
+        k:               Number of candidates to return.
+        per_retriever_k: Candidates requested from each retriever (default 3·k).
+        rrf_k:           RRF damping constant (60 is the usual choice).
+        weights:         Optional per-retriever RRF weights (default 1.0).
+        mmr_lambda:      0–1 relevance/diversity tradeoff; None disables MMR.
+        max_per_source:  Cap on candidates sharing a source_id; None = no cap.
+        reranker:        Optional reranker applied to the top rerank_top_n.
+
+    Returns:
+        {"candidates": [...], "timings_ms": {...}, "errors": {...}}
+    """
+    fetch_k = per_retriever_k or 3 * k
+    timings: dict[str, float] = {}
+    errors: dict[str, str] = {}
+    ranked: dict[str, list[dict]] = {}
+
+    if retrievers:
+        with ThreadPoolExecutor(max_workers=len(retrievers), thread_name_prefix="retriever") as pool:
+            futures = {r.name: pool.submit(_run_retriever, r, query, fetch_k) for r in retrievers}
+            for name, future in futures.items():
+                rows, elapsed_ms, error = future.result()
+                timings[name] = elapsed_ms
+                ranked[name] = rows
+                if error is not None:
+                    errors[name] = error
+
+    started = time.perf_counter()
+    candidates = reciprocal_rank_fusion(ranked, rrf_k=rrf_k, weights=weights)
+    timings["fusion"] = round((time.perf_counter() - started) * 1000, 2)
+
+    if reranker is not None and candidates:
+        started = time.perf_counter()
+        head, tail = candidates[:rerank_top_n], candidates[rerank_top_n:]
+        try:
+            scores = reranker.score(query, [c.get("content") or "" for c in head])
+            for c, s in zip(head, scores):
+                c["rerank_score"] = s
+            # Reranked head first; the tail keeps its fused order behind it
+            head.sort(key=lambda c: c["rerank_score"], reverse=True)
+            low = min(scores, default=0.0)
+            for c in head:
+                c["score"] = c["rerank_score"] - low + 1.0
+            for c in tail:
+                c["score"] = 0.0
+            candidates = head + tail
+        except Exception as exc:
+            errors["rerank"] = str(exc) or type(exc).__name__
+        timings["rerank"] = round((time.perf_counter() - started) * 1000, 2)
+
+    started = time.perf_counter()
+    selected = select_diverse(candidates, k, mmr_lambda=mmr_lambda, max_per_source=max_per_source)
+    timings["selection"] = round((time.perf_counter() - started) * 1000, 2)
+
+    return {"candidates": selected, "timings_ms": timings, "errors": errors}
@@ -0,0 +1,252 @@
+"""Vectorised similarity scoring for the in-Python rankers.
+
+Candidates are packed once into a contiguous matrix and scored with matrix
+products instead of per-pair Python loops:
+
+    EmbeddingMatrix(vectors)        rows L2-normalised float32
+        .append(vector)             grow by one row (amortised, for incremental indexes)
+        .cosine(query)              cosine of one query against every row
+        .top_k(query, k)            [(row, cosine), ...] best first
+        .cosine_matrix()            all-pairs cosine
+
+    SetMatrix(sets)                 0/1 incidence rows over the sets' shared vocabulary
+        .overlap(query)             share of the query's items found in each row
+        .intersections()            all-pairs |A ∩ B|
+        .jaccard()                  all-pairs |A ∩ B| / |A ∪ B|
+        .pairs(min_shared=1)        [(i, j, shared, jaccard)] for i < j
+        .associations(universe)     [(i, j, shared, jaccard, lift, pmi, z)] for i < j
+        .mapped_counts(mapping)     per row, items mapping to each value (rows × values)
+
+Used by retrieval MMR, the semantic answer cache, entity resolution and
+signal correlation. `python -m eval bench` times these against the plain-Python loops
+they replaced.
+
+NumPy is optional (as in vector_index): without it the same API runs on
+lists and sets. Matrices come back as ndarrays with NumPy and nested lists
+without, so index them as m[i][j]. SetMatrix is dense, so it suits the
+thousands of rows over a modest vocabulary these callers have, not a
+corpus-wide term matrix (see inverted_index for that).
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import operator
+from collections.abc import Hashable, Iterable, Mapping, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # optional — pure-Python fallback below
+    np = None
+
+
+def _unit(vector: Sequence[float]) -> list[float]:
+    norm = math.sqrt(sum(map(operator.mul, vector, vector)))
+    return [x / norm for x in vector] if norm > 0 else list(vector)
+
+
+def _to_list(values) -> list:
+    return values.tolist() if np is not None and isinstance(values, np.ndarray) else list(values)
+
+
+# ── Dense embeddings ──────────────────────────────────────────────────────
+
+class EmbeddingMatrix:
+    """Candidate embeddings as one normalised float32 matrix (row i ↔ vectors[i])."""
+
+    def __init__(self, vectors: Sequence[Sequence[float]]) -> None:
+        self.dim = len(vectors[0]) if len(vectors) else 0
+        self._n = len(vectors)
+        if np is not None:
+            matrix = np.array([np.asarray(v, dtype=np.float32) for v in vectors], dtype=np.float32)
+            matrix = matrix.reshape(len(vectors), self.dim)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            self._rows = matrix / np.where(norms == 0, 1, norms)
+        else:
+            self._rows = [_unit(v) for v in vectors]
+
+    @property
+    def matrix(self):
+        return self._rows[:self._n] if np is not None else self._rows
+
+    def __len__(self) -> int:
+        return self._n
+
+    def append(self, vector: Sequence[float]) -> int:
+        """Add one row in amortised O(dim) (capacity doubles); returns its row number."""
+        if np is None:
+            self._rows.append(_unit(vector))
+        else:
+            if not self.dim:
+                self.dim = len(vector)
+                self._rows = np.zeros((0, self.dim), dtype=np.float32)
+            if self._n == len(self._rows):
+                grown = np.zeros((max(8, 2 * self._n), self.dim), dtype=np.float32)
+                grown[:self._n] = self._rows[:self._n]
+                self._rows = grown
+            row = np.asarray(vector, dtype=np.float32)
+            norm = float(np.linalg.norm(row))
+            self._rows[self._n] = row / norm if norm else row
+        self._n += 1
+        return self._n - 1
+
+    def cosine(self, query: Sequence[float]):
+        """Cosine of *query* against every row."""
+        if not len(self):
+            return []
+        if np is not None:
+            q = np.asarray(query, dtype=np.float32)
+            norm = float(np.linalg.norm(q))
+            return self.matrix @ (q / norm if norm else q)
+        q = _unit(query)
+        return [sum(map(operator.mul, row, q)) for row in self.matrix]
+
+    def top_k(self, query: Sequence[float], k: int) -> list[tuple[int, float]]:
+        scores = self.cosine(query)
+        if np is not None and len(scores) > k:
+            top = np.argpartition(-scores, k)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(int(i), float(scores[i])) for i in top]
+        scores = _to_list(scores)
+        return [(i, float(scores[i])) for i in heapq.nlargest(k, range(len(scores)), key=scores.__getitem__)]
+
+    def cosine_matrix(self):
+        """All-pairs cosine between rows."""
+        if np is not None:
+            return self.matrix @ self.matrix.T
+        return [[sum(map(operator.mul, a, b)) for b in self.matrix] for a in self.matrix]
+
+
+def cosine_scores(query: Sequence[float], vectors: Sequence[Sequence[float]]) -> list[float]:
+    """Cosine of *query* against each of *vectors* (one-off convenience)."""
+    if not vectors:
+        return []
+    return _to_list(EmbeddingMatrix(vectors).cosine(query))
+
+
+# ── Sets (chunk ids, word sets, …) ────────────────────────────────────────
+
+class SetMatrix:
+    """Rows of item sets as a 0/1 incidence matrix over their shared vocabulary."""
+
+    def __init__(self, sets: Sequence[Iterable[Hashable]]) -> None:
+        self.sets = [set(s) for s in sets]
+        self.vocab: dict[Hashable, int] = {}
+        for s in self.sets:
+            for item in s:
+                self.vocab.setdefault(item, len(self.vocab))
+        if np is not None:
+            self.matrix = np.zeros((len(self.sets), len(self.vocab)), dtype=np.float32)
+            rows = [i for i, s in enumerate(self.sets) for _ in s]
+            cols = [self.vocab[item] for s in self.sets for item in s]
+            self.matrix[rows, cols] = 1.0
+            self.sizes = self.matrix.sum(axis=1)
+        else:
+            self.matrix = None
+            self.sizes = [len(s) for s in self.sets]
+
+    def __len__(self) -> int:
+        return len(self.sets)
+
+    def overlap(self, query: Iterable[Hashable]):
+        """Share of *query*'s distinct items present in each row (0–1)."""
+        query = set(query)
+        if not query:
+            return [0.0] * len(self)
+        if np is not None:
+            cols = [self.vocab[item] for item in query if item in self.vocab]
+            return self.matrix[:, cols].sum(axis=1) / len(query)
+        return [len(query & s) / len(query) for s in self.sets]
+
+    def intersections(self):
+        """All-pairs |A ∩ B|."""
+        if np is not None:
+            return self.matrix @ self.matrix.T
+        return [[len(a & b) for b in self.sets] for a in self.sets]
+
+    def jaccard(self):
+        """All-pairs |A ∩ B| / |A ∪ B| (0 when either set is empty)."""
+        if np is not None:
+            inter = self.intersections()
+            union = self.sizes[:, None] + self.sizes[None, :] - inter
+            empty = (self.sizes[:, None] == 0) | (self.sizes[None, :] == 0)
+            return np.where(empty, 0.0, inter / np.where(union == 0, 1, union))
+        return [
+            [len(a & b) / len(a | b) if a and b else 0.0 for b in self.sets]
+            for a in self.sets
+        ]
+
+    def pairs(self, min_shared: int = 1) -> list[tuple[int, int, int, float]]:
+        """(i, j, shared, jaccard) for every i < j sharing at least *min_shared* items."""
+        if np is not None:
+            inter = self.intersections()
+            rows, cols = np.nonzero(np.triu(inter >= min_shared, k=1))
+            shared = inter[rows, cols]
+            union = self.sizes[rows] + self.sizes[cols] - shared
+            return [
+                (int(i), int(j), int(s), float(s / u) if u else 0.0)
+                for i, j, s, u in zip(rows, cols, shared, union)
+            ]
+        found = []
+        for i, a in enumerate(self.sets):
+            for j in range(i + 1, len(self.sets)):
+                shared = len(a & self.sets[j])
+                if shared >= min_shared:
+                    found.append((i, j, shared, shared / len(a | self.sets[j])))
+        return found
+
+    def associations(
+        self, universe: int | None = None, min_shared: int = 1
+    ) -> list[tuple[int, int, int, float, float, float, float]]:
+        """(i, j, shared, jaccard, lift, pmi, z) for every i < j sharing at least *min_shared* items.
+
+        Against a universe of *universe* items (default: the vocabulary size),
+        expected = |A|·|B| / universe, lift = shared / expected, pmi = log2(lift)
+        and z = (shared − expected) / sqrt(expected), a Poisson approximation
+        of how far the overlap exceeds chance.
+        """
+        n = universe or len(self.vocab)
+        if np is not None:
+            inter = self.intersections()
+            rows, cols = np.nonzero(np.triu(inter >= min_shared, k=1))
+            shared = inter[rows, cols]
+            union = self.sizes[rows] + self.sizes[cols] - shared
+            expected = self.sizes[rows] * self.sizes[cols] / max(n, 1)
+            lift = shared / expected
+            return [
+                (int(i), int(j), int(s), float(s / u), float(lf), float(np.log2(lf)), float((s - e) / np.sqrt(e)))
+                for i, j, s, u, e, lf in zip(rows, cols, shared, union, expected, lift)
+            ]
+        found = []
+        for i, j, shared, jaccard in self.pairs(min_shared):
+            expected = self.sizes[i] * self.sizes[j] / max(n, 1)
+            lift = shared / expected
+            found.append((i, j, shared, jaccard, lift, math.log2(lift), (shared - expected) / math.sqrt(expected)))
+        return found
+
+    def mapped_counts(self, mapping: Mapping[Hashable, Iterable[Hashable]]) -> tuple[object, list]:
+        """Per row, how many of its items map to each value: (rows × values counts, values).
+
+        With *mapping* as a sparse item → values incidence this is one matrix
+        product (e.g. themes × chunks @ chunks × segments → themes × segments).
+        """
+        targets: dict[Hashable, int] = {}
+        for item in self.vocab:
+            for value in mapping.get(item, ()):
+                targets.setdefault(value, len(targets))
+        values = list(targets)
+        if np is not None:
+            item_to_target = np.zeros((len(self.vocab), len(targets)), dtype=np.float32)
+            for item, col in self.vocab.items():
+                for value in mapping.get(item, ()):
+                    item_to_target[col, targets[value]] = 1.0
+            return self.matrix @ item_to_target, values
+        counts = []
+        for s in self.sets:
+            row = [0.0] * len(values)
+            for item in s:
+                for value in set(mapping.get(item, ())):
+                    row[targets[value]] += 1.0
+            counts.append(row)
+        return counts, values
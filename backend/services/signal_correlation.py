@@ -5,17 +5,26 @@ Detects cross-theme patterns and relationships:
   - Segment divergence: different segments expressing opposing signals
   - Theme relationships: dependency, contradiction, amplification between themes
 
-Uses both heuristic analysis (chunk overlap, segment comparison) and LLM-based
-reasoning for nuanced relationship detection.
+Statistics first, then the LLM: themes × chunks and chunks × segments are
+incidence matrices (services/scoring.SetMatrix), so every pairwise overlap
+with its Jaccard, lift, PMI and z-score, and every theme's per-segment counts,
+come from a few matrix products. Only theme pairs whose overlap is
+significantly above chance and themes whose share differs significantly
+between two segments are sent to the LLM, which classifies those candidates;
+the prompt therefore grows with the number of real signals, not with the
+number of themes.
 """
 
 import json
-from collections import defaultdict
+import math
+from collections import Counter
 
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from backend.db.supabase_client import get_supabase
 from backend.services.llm import get_strong_llm
+from backend.services import scoring
+from backend.services.scoring import SetMatrix
 from backend.services.synthesis import _parse_json_response
 
 
@@ -23,7 +32,14 @@ _CORRELATION_ANALYSIS_PROMPT = """\
 You are a senior product strategist analyzing relationships between themes
 extracted from user research.
 
-Given a set of themes with their supporting evidence, identify:
+You are given themes with their supporting evidence, plus the candidate signals that
+survived statistical screening:
+- candidate_pairs: theme pairs whose evidence overlaps far more than chance
+  (shared chunks, lift, PMI, z-score)
+- candidate_divergences: themes whose share of feedback differs significantly between
+  two segments (segment_a over-represented, segment_b under-represented)
+
+Classify only these candidates. Among candidate_pairs, identify:
 
 1. **Co-occurring themes**: themes that appear together suggesting a connected user journey
 2. **Dependencies**: theme A can only be solved after theme B (prerequisite)
@@ -31,6 +47,9 @@ Given a set of themes with their supporting evidence, identify:
 4. **Amplifiers**: theme A makes theme B more urgent or impactful
 5. **Evolution**: theme A is an earlier version of / has evolved into theme B
 
+For each candidate divergence with a genuine opposing signal, describe it under
+segment_divergences.
+
 For each relationship found:
 - source_title: title of the first theme
 - target_title: title of the second theme
@@ -66,8 +85,23 @@ Rules:
 - If no relationships are found, return empty arrays"""
 
 
-def _compute_chunk_overlap(themes: list[dict]) -> list[dict]:
-    """Find themes that share supporting chunks (strong co-occurrence signal)."""
+# Ids per in_() filter, so request URLs stay well under proxy limits
+_ID_FILTER_PAGE_SIZE = 200
+
+# Overlaps / divergences at least this many standard errors above chance are
+# candidates for the LLM (≈ 95% two-sided)
+_SIGNIFICANCE_Z = 1.96
+# …and must rest on at least this many chunks
+_MIN_SIGNIFICANT_CHUNKS = 2
+
+
+def _compute_chunk_overlap(themes: list[dict], universe_size: int | None = None) -> list[dict]:
+    """Find themes that share supporting chunks (strong co-occurrence signal).
+
+    Each overlap carries its Jaccard (`strength`), lift, PMI and z-score
+    against a pool of *universe_size* chunks (default: the chunks the themes
+    cite), and whether it is `significant`.
+    """
     theme_chunks: dict[str, set] = {}
     for theme in themes:
         title = theme.get("title", "")
@@ -75,44 +109,140 @@ def _compute_chunk_overlap(themes: list[dict]) -> list[dict]:
         if chunk_ids:
             theme_chunks[title] = chunk_ids
 
-    overlaps = []
     titles = list(theme_chunks.keys())
-    for i in range(len(titles)):
-        for j in range(i + 1, len(titles)):
-            shared = theme_chunks[titles[i]] & theme_chunks[titles[j]]
-            if shared:
-                total = len(theme_chunks[titles[i]] | theme_chunks[titles[j]])
-                strength = len(shared) / total if total > 0 else 0
-                overlaps.append({
-                    "source_title": titles[i],
-                    "target_title": titles[j],
-                    "shared_chunk_count": len(shared),
-                    "strength": round(strength, 3),
-                    "shared_chunk_ids": list(shared),
-                })
+    matrix = SetMatrix([theme_chunks[t] for t in titles])
+    overlaps = []
+    for i, j, shared_count, jaccard, lift, pmi, z in matrix.associations(universe_size):
+        overlaps.append({
+            "source_title": titles[i],
+            "target_title": titles[j],
+            "shared_chunk_count": shared_count,
+            "strength": round(jaccard, 3),
+            "lift": round(lift, 3),
+            "pmi": round(pmi, 3),
+            "z_score": round(z, 3),
+            "significant": shared_count >= _MIN_SIGNIFICANT_CHUNKS and z >= _SIGNIFICANCE_Z,
+            "shared_chunk_ids": list(theme_chunks[titles[i]] & theme_chunks[titles[j]]),
+        })
 
     return sorted(overlaps, key=lambda x: x["strength"], reverse=True)
 
 
-def _compute_segment_distribution(themes: list[dict], chunks: list[dict], sources: list[dict]) -> dict:
-    """Map each theme to its segment distribution."""
-    chunk_source_map = {c["id"]: c.get("source_id") for c in chunks}
+def _chunk_segments(chunks: list[dict], sources: list[dict]) -> dict[str, list[str]]:
     source_segments = {s["id"]: (s.get("segment_tags") or []) for s in sources}
+    return {c["id"]: source_segments.get(c.get("source_id"), []) for c in chunks}
 
-    result = {}
-    for theme in themes:
-        title = theme.get("title", "")
-        segments = defaultdict(int)
-        for cid in (theme.get("chunk_ids") or []):
-            sid = chunk_source_map.get(cid)
-            if sid:
-                for tag in source_segments.get(sid, []):
-                    segments[tag] += 1
-        result[title] = dict(segments)
 
+def _compute_segment_distribution(themes: list[dict], chunks: list[dict], sources: list[dict]) -> dict:
+    """Map each theme to its segment distribution (themes × chunks @ chunks × segments)."""
+    matrix = SetMatrix([theme.get("chunk_ids") or [] for theme in themes])
+    counts, segments = matrix.mapped_counts(_chunk_segments(chunks, sources))
+    counts = scoring._to_list(counts)
+
+    result = {}
+    for theme, row in zip(themes, counts):
+        result[theme.get("title", "")] = {
+            segment: int(n) for segment, n in zip(segments, scoring._to_list(row)) if n
+        }
     return result
 
 
+def _segment_divergences(
+    themes: list[dict],
+    chunks: list[dict],
+    sources: list[dict],
+    segment_totals: dict[str, int] | None = None,
+) -> list[dict]:
+    """Themes whose share of a segment's chunks differs significantly between two segments.
+
+    For each theme the segments with the highest and lowest share are
+    compared with a two-proportion z-test; pairs with z ≥ _SIGNIFICANCE_Z are
+    returned, strongest first. Shares are of *segment_totals* (every chunk
+    per segment, see _chunk_pool_totals), or of *chunks* when not given.
+    """
+    chunk_segments = _chunk_segments(chunks, sources)
+    totals = Counter(tag for tags in chunk_segments.values() for tag in set(tags))
+    for segment, total in (segment_totals or {}).items():
+        totals[segment] = max(totals[segment], total)
+    cited = [t for t in themes if t.get("chunk_ids")]
+    counts, segments = SetMatrix([t["chunk_ids"] for t in cited]).mapped_counts(chunk_segments)
+    if len(segments) < 2 or not cited:
+        return []
+
+    np = scoring.np
+    if np is not None:
+        sizes = np.array([totals[s] for s in segments], dtype=np.float64)
+        counts = np.asarray(counts, dtype=np.float64)
+        shares = counts / sizes
+        rows = np.arange(len(cited))
+        a, b = shares.argmax(axis=1), shares.argmin(axis=1)
+        pooled = (counts[rows, a] + counts[rows, b]) / (sizes[a] + sizes[b])
+        se = np.sqrt(pooled * (1 - pooled) * (1 / sizes[a] + 1 / sizes[b]))
+        z = np.divide(shares[rows, a] - shares[rows, b], se, out=np.zeros(len(cited)), where=se > 0)
+        stats = zip(a.tolist(), b.tolist(), counts[rows, a].tolist(), shares[rows, a].tolist(),
+                    shares[rows, b].tolist(), z.tolist())
+    else:
+        stats = []
+        for row in counts:
+            shares = [n / totals[s] for n, s in zip(row, segments)]
+            ia = max(range(len(shares)), key=shares.__getitem__)
+            ib = min(range(len(shares)), key=shares.__getitem__)
+            n_a, n_b = totals[segments[ia]], totals[segments[ib]]
+            pooled = (row[ia] + row[ib]) / (n_a + n_b)
+            se = math.sqrt(pooled * (1 - pooled) * (1 / n_a + 1 / n_b))
+            stats.append((ia, ib, row[ia], shares[ia], shares[ib], (shares[ia] - shares[ib]) / se if se > 0 else 0.0))
+
+    divergences = []
+    for theme, (ia, ib, count_a, share_a, share_b, z) in zip(cited, stats):
+        if z >= _SIGNIFICANCE_Z and count_a >= _MIN_SIGNIFICANT_CHUNKS:
+            divergences.append({
+                "theme_title": theme.get("title", ""),
+                "segment_a": segments[ia],
+                "segment_b": segments[ib],
+                "share_a": round(share_a, 3),
+                "share_b": round(share_b, 3),
+                "z_score": round(z, 3),
+            })
+    return sorted(divergences, key=lambda d: d["z_score"], reverse=True)
+
+
+def _count_chunks(db, source_ids: list[str]) -> int:
+    """Number of chunks belonging to *source_ids* (count-only queries)."""
+    total = 0
+    for i in range(0, len(source_ids), _ID_FILTER_PAGE_SIZE):
+        resp = (
+            db.table("chunks")
+            .select("id", count="exact")
+            .in_("source_id", source_ids[i:i + _ID_FILTER_PAGE_SIZE])
+            .limit(1)
+            .execute()
+        )
+        total += resp.count or 0
+    return total
+
+
+def _chunk_pool_totals(db, project_id: str) -> tuple[list[dict], int, dict[str, int]]:
+    """The project's sources, its chunk count, and its chunk count per segment tag.
+
+    These are the baselines for "chance": themes only cite a fraction of the
+    project's chunks, so counting just the cited ones would inflate the
+    expected overlap and hide real relationships.
+    """
+    sources = (
+        db.table("sources")
+        .select("id, segment_tags, source_type")
+        .eq("project_id", project_id)
+        .execute()
+        .data or []
+    )
+    by_segment: dict[str, list[str]] = {}
+    for source in sources:
+        for tag in set(source.get("segment_tags") or []):
+            by_segment.setdefault(tag, []).append(source["id"])
+    universe = _count_chunks(db, [source["id"] for source in sources])
+    return sources, universe, {tag: _count_chunks(db, ids) for tag, ids in by_segment.items()}
+
+
 def detect_theme_relationships(
     project_id: str,
     synthesis_id: str,
@@ -151,46 +281,55 @@ def detect_theme_relationships(
             .data or []
         )
 
-    source_ids = list(set(c.get("source_id") for c in chunks if c.get("source_id")))
-    sources = []
-    if source_ids:
-        sources = (
-            db.table("sources")
-            .select("id, segment_tags, source_type")
-            .in_("id", source_ids)
-            .execute()
-            .data or []
-        )
-
-    # 1. Heuristic: chunk overlap analysis
-    overlaps = _compute_chunk_overlap(themes)
+    sources, universe, segment_totals = _chunk_pool_totals(db, project_id)
 
-    # 2. Segment distribution analysis
+    # 1. Statistics against the project's whole chunk pool: chunk overlap
+    #    (lift / PMI / z) and segment divergence
+    overlaps = _compute_chunk_overlap(themes, universe_size=max(universe, len(chunks)) or None)
     seg_dist = _compute_segment_distribution(themes, chunks, sources)
-
-    # 3. LLM-based relationship analysis
-    themes_context = json.dumps([
-        {
-            "title": t["title"],
-            "description": t.get("description", ""),
-            "quotes": (t.get("quotes") or [])[:3],
-            "chunk_count": len(t.get("chunk_ids") or []),
-            "segments": seg_dist.get(t["title"], {}),
-        }
-        for t in themes
-    ], indent=2)
-
-    llm = get_strong_llm()
-    response = llm.invoke([
-        SystemMessage(content=_CORRELATION_ANALYSIS_PROMPT),
-        HumanMessage(content=(
-            f"Analyze relationships between these {len(themes)} themes from project research:\n\n"
-            f"{themes_context}"
-        )),
-    ])
-    parsed = _parse_json_response(response.content)
-    llm_relationships = parsed.get("relationships", [])
-    llm_divergences = parsed.get("segment_divergences", [])
+    divergences = _segment_divergences(themes, chunks, sources, segment_totals)
+
+    # 2. LLM classifies only the significant candidates
+    candidate_pairs = [
+        {k: o[k] for k in ("source_title", "target_title", "shared_chunk_count", "lift", "pmi", "z_score")}
+        for o in overlaps if o["significant"]
+    ]
+    candidate_titles = {p["source_title"] for p in candidate_pairs} | {p["target_title"] for p in candidate_pairs}
+    candidate_titles |= {d["theme_title"] for d in divergences}
+
+    llm_relationships: list[dict] = []
+    llm_divergences: list[dict] = []
+    if candidate_titles:
+        themes_context = json.dumps({
+            "themes": [
+                {
+                    "title": t["title"],
+                    "description": t.get("description", ""),
+                    "quotes": (t.get("quotes") or [])[:3],
+                    "chunk_count": len(t.get("chunk_ids") or []),
+                    "segments": seg_dist.get(t["title"], {}),
+                }
+                for t in themes
+                if t["title"] in candidate_titles
+            ],
+            "candidate_pairs": candidate_pairs,
+            "candidate_divergences": divergences,
+        }, indent=2)
+
+        llm = get_strong_llm()
+        response = llm.invoke([
+            SystemMessage(content=_CORRELATION_ANALYSIS_PROMPT),
+            HumanMessage(content=(
+                f"Classify {len(candidate_pairs)} candidate theme pairs and "
+                f"{len(divergences)} candidate segment divergences "
+                f"({len(candidate_titles)} of {len(themes)} themes) from project research:\n\n"
+                f"{themes_context}"
+            )),
+        ])
+        parsed = _parse_json_response(response.content)
+        llm_relationships = parsed.get("relationships", [])
+        llm_divergences = parsed.get("segment_divergences", [])
+    divergence_stats = {d["theme_title"]: d for d in divergences}
 
     # Build theme title → id map
     title_to_id = {t["title"]: t["id"] for t in themes}
@@ -233,6 +372,10 @@ def detect_theme_relationships(
                 "strength": overlap["strength"],
                 "evidence": {
                     "shared_chunks": overlap["shared_chunk_count"],
+                    "lift": overlap["lift"],
+                    "pmi": overlap["pmi"],
+                    "z_score": overlap["z_score"],
+                    "significant": overlap["significant"],
                     "detected_by": "heuristic_chunk_overlap",
                 },
             })
@@ -259,7 +402,11 @@ def detect_theme_relationships(
             "correlation_score": -0.5,  # divergence = negative correlation
             "explanation": div.get("divergence", ""),
             "evidence_chunk_ids": [],
-            "metadata": {"evidence": div.get("evidence", "")},
+            "metadata": {
+                "evidence": div.get("evidence", ""),
+                **{k: v for k, v in divergence_stats.get(div.get("theme_title"), {}).items()
+                   if k in ("share_a", "share_b", "z_score")},
+            },
         })
 
     # Store co-occurrence correlations
@@ -272,6 +419,7 @@ def detect_theme_relationships(
             "correlation_score": overlap["strength"],
             "explanation": f"Themes share {overlap['shared_chunk_count']} evidence chunks",
             "evidence_chunk_ids": overlap.get("shared_chunk_ids", [])[:10],
+            "metadata": {k: overlap[k] for k in ("lift", "pmi", "z_score", "significant")},
         })
 
     if correlation_records:
@@ -2,9 +2,17 @@
 
 Pass 1 — Theme Extraction (fast model, claude-haiku):
   - Fetches all chunks for the project (optionally filtered by source_ids)
-  - Batches chunks to fit within the model's context window
+  - Batches chunks to fit within the model's context window; batches run
+    concurrently (SYNTHESIS_MAX_CONCURRENCY, shared LLM token budget) with
+    per-batch retries, and results keep batch order
   - Uses a strict JSON schema prompt to extract recurring themes with citations
-  - If multiple batches are needed, consolidates themes in a final pass
+  - If multiple batches are needed, consolidates themes: a single call when
+    they fit one prompt, otherwise a map-reduce tree (embedding-clustered
+    groups merged in parallel, level by level) — see _consolidate_themes
+  - Incremental mode (synthesis graph / temporal synthesis) batches per
+    source, caches each batch's themes by chunk ids + content hash, extracts
+    only new or changed batches and folds them into the previous synthesis's
+    themes — see _extract_themes_incremental
   - Persists themes to Supabase `themes` table
 
 Pass 2 — Opportunity Scoring (strong model, claude-sonnet):
@@ -20,14 +28,23 @@ Both passes require:
   - Confidence-based gating: if evidence is weak, score lower and explain why
 """
 
+import hashlib
 import json
+import logging
 import re
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from backend.config import settings
 from backend.db.supabase_client import get_supabase
-from backend.services.llm import get_fast_llm, get_strong_llm
+from backend.services import cache_manager
+from backend.services.llm import get_fast_llm, get_strong_llm, llm_token_budget
+from backend.services.scoring import EmbeddingMatrix
+
+logger = logging.getLogger(__name__)
 
 
 # ---------------------------------------------------------------------------
@@ -209,6 +226,358 @@ def _build_chunk_block(chunks: list[dict]) -> str:
     return ("\n\n" + "-" * 60 + "\n\n").join(parts)
 
 
+def _invoke_json(llm, system_prompt: str, user_message: str, label: str) -> dict:
+    """One model call parsed as JSON, drawing from the shared LLM token budget.
+
+    A failed call or unparseable response is retried with exponential backoff,
+    up to SYNTHESIS_BATCH_MAX_ATTEMPTS attempts; the last error is re-raised.
+    """
+    max_attempts = max(1, settings.synthesis_batch_max_attempts)
+    for attempt in range(1, max_attempts + 1):
+        llm_token_budget.acquire((len(system_prompt) + len(user_message)) / 4)
+        try:
+            response = llm.invoke([
+                SystemMessage(content=system_prompt),
+                HumanMessage(content=user_message),
+            ])
+            return _parse_json_response(response.content)
+        except Exception as exc:
+            if attempt >= max_attempts:
+                raise
+            delay = settings.synthesis_batch_backoff_seconds * (2 ** (attempt - 1))
+            logger.warning(
+                "%s attempt %d/%d failed (%s); retrying in %.1fs",
+                label, attempt, max_attempts, exc, delay,
+            )
+            time.sleep(delay)
+    return {}  # max_attempts >= 1, so the loop always returns or raises
+
+
+def _run_concurrently(
+    fn: Callable[[int], list[dict]],
+    count: int,
+    what: str,
+    unit: str,
+    workers: int | None = None,
+) -> list[list[dict]]:
+    """Run fn(0) … fn(count - 1) on *workers* threads (default SYNTHESIS_MAX_CONCURRENCY); results in index order.
+
+    Raises:
+        RuntimeError: Naming every index whose call still failed after its retries.
+    """
+    results: list[list[dict]] = [[] for _ in range(count)]
+    errors: dict[int, Exception] = {}
+    workers = max(1, min(workers or settings.synthesis_max_concurrency, count))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fn, i): i for i in range(count)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as exc:
+                errors[i] = exc
+
+    if errors:
+        detail = "; ".join(f"{unit[:-1]} {i + 1}: {exc}" for i, exc in sorted(errors.items()))
+        raise RuntimeError(f"{what} failed for {len(errors)}/{count} {unit}: {detail}")
+    return results
+
+
+def _extract_batch_themes(
+    llm,
+    batches: list[list[dict]],
+    build_message: Callable[[int, list[dict]], str],
+) -> list[dict]:
+    """Extract themes from every batch concurrently; returns themes in batch order.
+
+    Up to SYNTHESIS_MAX_CONCURRENCY calls are in flight. A failing batch is
+    retried on its own (see _invoke_json); the other batches' results are kept.
+
+    Raises:
+        RuntimeError: If any batch still fails after SYNTHESIS_BATCH_MAX_ATTEMPTS.
+    """
+    def _run(batch_idx: int) -> list[dict]:
+        label = f"theme extraction batch {batch_idx + 1}/{len(batches)}"
+        message = build_message(batch_idx, batches[batch_idx])
+        return _invoke_json(llm, _THEME_SYSTEM_PROMPT, message, label).get("themes", [])
+
+    results = _run_concurrently(_run, len(batches), "Theme extraction", "batches")
+    return [theme for batch_themes in results for theme in batch_themes]
+
+
+# -- Theme consolidation (hierarchical reduce) --
+
+# Embedding cosine above which two themes are treated as likely duplicates
+_CLUSTER_MIN_SIMILARITY = 0.75
+
+
+def _theme_chars(theme: dict) -> int:
+    return len(json.dumps(theme))
+
+
+def _fits_one_call(themes: list[dict]) -> bool:
+    group_size = max(2, settings.synthesis_reduce_group_size)
+    return len(themes) <= group_size and sum(map(_theme_chars, themes)) <= _MAX_CHARS_PER_BATCH
+
+
+def _cluster_themes(themes: list[dict]) -> list[list[int]]:
+    """Group theme indices so near-duplicates land in the same reduce call.
+
+    Each unassigned theme, in order, seeds a group and pulls in its unassigned
+    neighbours with title + description embedding cosine ≥
+    _CLUSTER_MIN_SIMILARITY, most similar first. Themes left on their own
+    are then packed together. Every group is capped at
+    SYNTHESIS_REDUCE_GROUP_SIZE themes and the character budget. Without an
+    embedding provider, themes are packed in title order.
+    """
+    from backend.services.embeddings import create_embeddings_batch
+
+    group_size = max(2, settings.synthesis_reduce_group_size)
+    texts = [f"{t.get('title', '')}: {t.get('description', '')}" for t in themes]
+    try:
+        matrix: EmbeddingMatrix | None = EmbeddingMatrix(create_embeddings_batch(texts))
+    except Exception as exc:
+        logger.warning("theme clustering without embeddings (%s); grouping by title", exc)
+        matrix = None
+
+    def _pack(indices: list[int]) -> list[list[int]]:
+        packed: list[list[int]] = []
+        chars = 0
+        for i in indices:
+            cost = _theme_chars(themes[i])
+            if not packed or len(packed[-1]) >= group_size or chars + cost > _MAX_CHARS_PER_BATCH:
+                packed.append([])
+                chars = 0
+            packed[-1].append(i)
+            chars += cost
+        return packed
+
+    if matrix is None:
+        return _pack(sorted(range(len(themes)), key=lambda i: texts[i].lower()))
+
+    unassigned = dict.fromkeys(range(len(themes)))  # insertion-ordered set
+    groups: list[list[int]] = []
+    singletons: list[int] = []
+    while unassigned:
+        seed = next(iter(unassigned))
+        del unassigned[seed]
+        scores = matrix.cosine(matrix.matrix[seed])
+        close = sorted(
+            (i for i in unassigned if scores[i] >= _CLUSTER_MIN_SIMILARITY),
+            key=lambda i: -float(scores[i]),
+        )
+        group = _pack([seed, *close])[0]
+        for i in group[1:]:
+            del unassigned[i]
+        if len(group) == 1:
+            singletons.append(seed)
+        else:
+            groups.append(group)
+    return groups + _pack(singletons)
+
+
+def _consolidation_message(themes: list[dict], batch_count: int) -> str:
+    return (
+        f"Consolidate the following {len(themes)} themes extracted from "
+        f"{batch_count} batches of the same project. Merge duplicates.\n\n"
+        f"Themes:\n{json.dumps(themes)}"
+    )
+
+
+def _consolidate_themes(llm, themes: list[dict], batch_count: int) -> list[dict]:
+    """Merge per-batch themes into one canonical list with a tree-shaped reduce.
+
+    While the themes do not fit one consolidation prompt, they are clustered
+    locally (_cluster_themes) and every multi-theme group is merged by its
+    own model call, concurrently; the merged output is the next level's input.
+    The depth therefore grows with corpus size (~log of the theme count), and
+    no prompt exceeds SYNTHESIS_REDUCE_GROUP_SIZE themes. One final call
+    produces the canonical set. If a level merges nothing, the distinct
+    themes are returned as they are.
+    """
+    level = 0
+    while not _fits_one_call(themes):
+        level += 1
+        groups = _cluster_themes(themes)
+
+        def _merge(group_idx: int, groups=groups, themes=themes, level=level) -> list[dict]:
+            group = [themes[i] for i in groups[group_idx]]
+            if len(group) == 1:
+                return group
+            label = f"theme consolidation level {level} group {group_idx + 1}/{len(groups)}"
+            message = _consolidation_message(group, batch_count)
+            return _invoke_json(llm, _THEME_CONSOLIDATION_PROMPT, message, label).get("themes", [])
+
+        merged = _run_concurrently(_merge, len(groups), "Theme consolidation", "groups")
+        reduced = [theme for group_themes in merged for theme in group_themes]
+        logger.info(
+            "theme consolidation level %d: %d themes → %d in %d groups",
+            level, len(themes), len(reduced), len(groups),
+        )
+        if len(reduced) >= len(themes):
+            return reduced  # nothing left that the model considers a duplicate
+        themes = reduced
+
+    if len(themes) <= 1:
+        return themes
+    message = _consolidation_message(themes, batch_count)
+    return _invoke_json(llm, _THEME_CONSOLIDATION_PROMPT, message, "theme consolidation").get("themes", [])
+
+
+# -- Incremental extraction (per-batch cache + fold into previous themes) --
+
+# Part of every batch cache key, so editing the extraction prompt invalidates it
+_THEME_PROMPT_VERSION = hashlib.sha256(_THEME_SYSTEM_PROMPT.encode()).hexdigest()[:12]
+
+
+def _batch_chunks_by_source(chunks: list[dict]) -> list[list[dict]]:
+    """Split chunks into batches that never mix sources (a long source spans several).
+
+    Unlike _batch_chunks, adding, re-ingesting or removing one source leaves
+    every other source's batches — and so their cache keys — unchanged.
+    """
+    by_source: dict[str, list[dict]] = {}
+    for chunk in chunks:
+        by_source.setdefault(chunk.get("source_id") or "", []).append(chunk)
+    return [
+        batch
+        for source_id in sorted(by_source)
+        for batch in _batch_chunks(
+            sorted(by_source[source_id], key=lambda c: (c.get("chunk_index") or 0, c["id"]))
+        )
+    ]
+
+
+def _batch_cache_key(batch: list[dict], context: str = "") -> str:
+    """Cache key for one batch's extracted themes.
+
+    Covers the batch's chunk-id set and content hash and the extra prompt
+    *context* (e.g. the drill-down note listing known themes), so a prompt
+    that asks for something different never gets another prompt's answer.
+    """
+    digest = hashlib.sha256(context.encode() + b"\0")
+    for chunk in sorted(batch, key=lambda c: c["id"]):
+        digest.update(chunk["id"].encode() + b"\0")
+        digest.update(hashlib.sha256(chunk.get("content", "").encode()).digest())
+    return f"synthesis_batch:{settings.fast_model}:{_THEME_PROMPT_VERSION}:{digest.hexdigest()}"
+
+
+def _extract_changed_batches(
+    llm,
+    batches: list[list[dict]],
+    build_message: Callable[[int, list[dict]], str],
+    context: str = "",
+) -> tuple[list[list[dict]], list[int]]:
+    """Per-batch themes, extracting only the batches the cache has not seen.
+
+    Cached batches are resolved in one batched cache read; the rest run
+    through the same concurrent, retried path as _extract_batch_themes and
+    are cached on success.
+
+    Returns:
+        (themes per batch in batch order, indices of freshly extracted batches)
+    """
+    keys = [_batch_cache_key(batch, context) for batch in batches]
+    cached = cache_manager.get_llm_responses_many(keys)
+    results: list[list[dict]] = [[] for _ in batches]
+    fresh: list[int] = []
+    for i, key in enumerate(keys):
+        try:
+            results[i] = json.loads(cached[key])
+        except (KeyError, ValueError):
+            fresh.append(i)
+
+    def _run(n: int) -> list[dict]:
+        batch_idx = fresh[n]
+        label = f"theme extraction batch {batch_idx + 1}/{len(batches)}"
+        message = build_message(batch_idx, batches[batch_idx])
+        themes = _invoke_json(llm, _THEME_SYSTEM_PROMPT, message, label).get("themes", [])
+        cache_manager.store_llm_response(keys[batch_idx], json.dumps(themes))
+        return themes
+
+    if fresh:
+        extracted = _run_concurrently(_run, len(fresh), "Theme extraction", "batches")
+        for batch_idx, themes in zip(fresh, extracted):
+            results[batch_idx] = themes
+    logger.info(
+        "incremental theme extraction: %d/%d batches reused from cache",
+        len(batches) - len(fresh), len(batches),
+    )
+    return results, fresh
+
+
+def _extract_themes_incremental(
+    llm,
+    batches: list[list[dict]],
+    build_message: Callable[[int, list[dict]], str],
+    previous_themes: list[dict],
+    context: str = "",
+) -> list[dict]:
+    """Extract themes for new or changed batches and fold them into *previous_themes*.
+
+    Previous themes keep only their citations of chunks still in *batches*;
+    a theme left with none (its sources were removed or re-ingested) is
+    dropped. A batch is folded in when it missed the cache or when no
+    previous theme cites any of its chunks (e.g. the previous run was
+    source-filtered); its themes are merged into the survivors with
+    _consolidate_themes. With no previous themes this degrades to a full
+    run whose unchanged batches still come from the cache.
+
+    *context* is the extra prompt text build_message adds to every batch; it
+    is part of the cache key.
+    """
+    per_batch, extracted = _extract_changed_batches(llm, batches, build_message, context)
+
+    pool = {chunk["id"] for batch in batches for chunk in batch}
+    kept = []
+    for theme in previous_themes:
+        cited = [cid for cid in theme.get("chunk_ids") or [] if cid in pool]
+        if cited:
+            kept.append({
+                "title": theme.get("title", "Untitled Theme"),
+                "description": theme.get("description", ""),
+                "chunk_ids": cited,
+                "quotes": theme.get("quotes") or [],
+            })
+
+    if not kept:
+        themes = [theme for batch_themes in per_batch for theme in batch_themes]
+        if len(batches) > 1 and themes:
+            themes = _consolidate_themes(llm, themes, len(batches))
+        return themes
+
+    cited = {cid for theme in kept for cid in theme["chunk_ids"]}
+    fresh = sorted(set(extracted) | {
+        i for i, batch in enumerate(batches) if not any(chunk["id"] in cited for chunk in batch)
+    })
+    fresh_themes = [theme for i in fresh for theme in per_batch[i]]
+    if not fresh_themes:
+        return kept
+    return _consolidate_themes(llm, kept + fresh_themes, len(fresh) + 1)
+
+
+def _previous_synthesis_id(project_id: str, exclude: str | None = None) -> str | None:
+    """Most recent synthesis of the project, other than *exclude*."""
+    db = get_supabase()
+    query = db.table("syntheses").select("id").eq("project_id", project_id)
+    if exclude:
+        query = query.neq("id", exclude)
+    rows = query.order("created_at", desc=True).limit(1).execute().data or []
+    return rows[0]["id"] if rows else None
+
+
+def _fetch_synthesis_themes(synthesis_id: str) -> list[dict]:
+    """Themes persisted by one synthesis run."""
+    db = get_supabase()
+    resp = (
+        db.table("themes")
+        .select("title, description, chunk_ids, quotes")
+        .eq("synthesis_id", synthesis_id)
+        .execute()
+    )
+    return resp.data or []
+
+
 # ---------------------------------------------------------------------------
 # Pass 1: Theme extraction
 # ---------------------------------------------------------------------------
@@ -230,6 +599,7 @@ def run_theme_extraction(
 
     Raises:
         ValueError: If no chunks are available.
+        RuntimeError: If a chunk batch still fails after its retries.
     """
     # -- Fetch chunks --
     valid_source_ids = _fetch_project_source_ids(project_id, source_ids)
@@ -241,37 +611,21 @@ def run_theme_extraction(
 
     llm = get_fast_llm()
     batches = _batch_chunks(chunks)
-    all_raw_themes: list[dict] = []
 
-    # -- Per-batch extraction --
-    for batch_idx, batch in enumerate(batches):
-        chunk_block = _build_chunk_block(batch)
-        user_message = (
+    # -- Per-batch extraction (concurrent, results in batch order) --
+    def _batch_message(batch_idx: int, batch: list[dict]) -> str:
+        return (
             f"Research chunks (batch {batch_idx + 1}/{len(batches)}, "
             f"{len(batch)} chunks) for project {project_id}:\n\n"
-            f"{chunk_block}\n\n"
+            f"{_build_chunk_block(batch)}\n\n"
             f"Extract the key themes from this research."
         )
-        response = llm.invoke([
-            SystemMessage(content=_THEME_SYSTEM_PROMPT),
-            HumanMessage(content=user_message),
-        ])
-        parsed = _parse_json_response(response.content)
-        all_raw_themes.extend(parsed.get("themes", []))
-
-    # -- Consolidation pass when multiple batches produced themes --
+
+    all_raw_themes = _extract_batch_themes(llm, batches, _batch_message)
+
+    # -- Consolidation (hierarchical reduce) when multiple batches produced themes --
     if len(batches) > 1 and all_raw_themes:
-        consolidation_message = (
-            f"Consolidate the following {len(all_raw_themes)} themes extracted from "
-            f"{len(batches)} batches of the same project. Merge duplicates.\n\n"
-            f"Themes:\n{json.dumps(all_raw_themes, indent=2)}"
-        )
-        response = llm.invoke([
-            SystemMessage(content=_THEME_CONSOLIDATION_PROMPT),
-            HumanMessage(content=consolidation_message),
-        ])
-        parsed = _parse_json_response(response.content)
-        all_raw_themes = parsed.get("themes", [])
+        all_raw_themes = _consolidate_themes(llm, all_raw_themes, len(batches))
 
     if not all_raw_themes:
         return []
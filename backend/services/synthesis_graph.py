@@ -44,13 +44,17 @@ from backend.services.llm import get_fast_llm, get_strong_llm
 from backend.services.semantic_search import semantic_search
 from backend.services.synthesis import (
     _OPPORTUNITY_SYSTEM_PROMPT,
-    _THEME_CONSOLIDATION_PROMPT,
-    _THEME_SYSTEM_PROMPT,
     _batch_chunks,
+    _batch_chunks_by_source,
     _build_chunk_block,
+    _consolidate_themes,
+    _extract_batch_themes,
+    _extract_themes_incremental,
     _fetch_chunks_for_sources,
     _fetch_project_source_ids,
+    _fetch_synthesis_themes,
     _parse_json_response,
+    _previous_synthesis_id,
 )
 
 
@@ -72,6 +76,10 @@ class SynthesisState(TypedDict):
     iteration: int
     max_iterations: int
     weak_theme_titles: list[str]     # titles of themes that need more evidence
+    # Incremental mode — reuse cached batch extractions, fold into previous themes
+    incremental: bool
+    previous_synthesis_id: str | None
+    previous_themes: list[dict]
 
 
 # ---------------------------------------------------------------------------
@@ -86,10 +94,16 @@ def fetch_chunks_node(state: SynthesisState) -> dict:
         raise ValueError(
             "No chunks found. Process at least one source document before running synthesis."
         )
-    return {
+    update = {
         "chunks": chunks,
         "chunk_id_set": [c["id"] for c in chunks],
     }
+    if state["incremental"]:
+        previous_id = state["previous_synthesis_id"] or _previous_synthesis_id(
+            state["project_id"], exclude=state["synthesis_id"]
+        )
+        update["previous_themes"] = _fetch_synthesis_themes(previous_id) if previous_id else []
+    return update
 
 
 def extract_themes_node(state: SynthesisState) -> dict:
@@ -97,50 +111,42 @@ def extract_themes_node(state: SynthesisState) -> dict:
 
     On drill-down iterations (iteration > 0), existing theme titles are passed
     as context so the model extends rather than duplicates known themes.
+
+    In incremental mode batches are per source and only batches missing from
+    the extraction cache reach the model; their themes are folded into the
+    previous synthesis's themes (or, on drill-down passes, the current ones).
     """
     llm = get_fast_llm()
     chunks = state["chunks"]
-    batches = _batch_chunks(chunks)
-    all_raw_themes: list[dict] = []
-
-    for batch_idx, batch in enumerate(batches):
-        chunk_block = _build_chunk_block(batch)
-
-        # On subsequent iterations, tell the model what we already found
-        context_note = ""
-        if state["themes"] and state["iteration"] > 0:
-            existing_titles = [t.get("title", "") for t in state["themes"]]
-            context_note = (
-                f"\nAlready-identified themes (extend or refine; do not duplicate):\n"
-                f"{json.dumps(existing_titles, indent=2)}\n\n"
-            )
-
-        user_message = (
+    batches = _batch_chunks_by_source(chunks) if state["incremental"] else _batch_chunks(chunks)
+
+    # On subsequent iterations, tell the model what we already found
+    context_note = ""
+    if state["themes"] and state["iteration"] > 0:
+        existing_titles = [t.get("title", "") for t in state["themes"]]
+        context_note = (
+            f"\nAlready-identified themes (extend or refine; do not duplicate):\n"
+            f"{json.dumps(existing_titles, indent=2)}\n\n"
+        )
+
+    def _batch_message(batch_idx: int, batch: list[dict]) -> str:
+        return (
             f"Research chunks (batch {batch_idx + 1}/{len(batches)}, "
             f"{len(batch)} chunks) for project {state['project_id']}:{context_note}\n\n"
-            f"{chunk_block}\n\n"
+            f"{_build_chunk_block(batch)}\n\n"
             f"Extract the key themes from this research."
         )
-        response = llm.invoke([
-            SystemMessage(content=_THEME_SYSTEM_PROMPT),
-            HumanMessage(content=user_message),
-        ])
-        parsed = _parse_json_response(response.content)
-        all_raw_themes.extend(parsed.get("themes", []))
-
-    # Consolidation pass when multiple batches produced themes
+
+    if state["incremental"]:
+        base = state["themes"] if state["iteration"] > 0 else state["previous_themes"]
+        return {"themes": _extract_themes_incremental(llm, batches, _batch_message, base, context_note)}
+
+    # Batches run concurrently; themes come back in batch order
+    all_raw_themes = _extract_batch_themes(llm, batches, _batch_message)
+
+    # Consolidation (hierarchical reduce) when multiple batches produced themes
     if len(batches) > 1 and all_raw_themes:
-        consolidation_message = (
-            f"Consolidate the following {len(all_raw_themes)} themes from "
-            f"{len(batches)} batches of the same project. Merge duplicates.\n\n"
-            f"Themes:\n{json.dumps(all_raw_themes, indent=2)}"
-        )
-        response = llm.invoke([
-            SystemMessage(content=_THEME_CONSOLIDATION_PROMPT),
-            HumanMessage(content=consolidation_message),
-        ])
-        parsed = _parse_json_response(response.content)
-        all_raw_themes = parsed.get("themes", [])
+        all_raw_themes = _consolidate_themes(llm, all_raw_themes, len(batches))
 
     return {"themes": all_raw_themes}
 
@@ -358,6 +364,8 @@ def run_synthesis_graph(
     synthesis_id: str,
     source_ids: list[str] | None = None,
     max_iterations: int = 2,
+    incremental: bool = False,
+    previous_synthesis_id: str | None = None,
 ) -> dict:
     """Run the full LangGraph synthesis pipeline.
 
@@ -366,6 +374,10 @@ def run_synthesis_graph(
         synthesis_id:    Pre-created synthesis record UUID.
         source_ids:      Optional subset of source UUIDs.
         max_iterations:  Max recursive drill-down passes for weak themes.
+        incremental:     Reuse cached per-batch extractions and fold new themes
+                         into the previous synthesis's themes.
+        previous_synthesis_id: Synthesis to fold into; defaults to the
+                         project's most recent other synthesis.
 
     Returns:
         {
@@ -385,6 +397,9 @@ def run_synthesis_graph(
         "iteration": 0,
         "max_iterations": max_iterations,
         "weak_theme_titles": [],
+        "incremental": incremental,
+        "previous_synthesis_id": previous_synthesis_id,
+        "previous_themes": [],
     }
 
     final_state = _graph.invoke(initial_state)
@@ -16,32 +16,37 @@ from datetime import datetime, timezone
 from backend.db.supabase_client import get_supabase
 
 
-def _compute_theme_metrics(theme: dict, chunks: list[dict], sources: list[dict]) -> dict:
-    """Compute quantitative metrics for a theme based on its evidence."""
-    chunk_ids = theme.get("chunk_ids") or []
-    mention_count = len(chunk_ids)
+def _compute_theme_metrics(themes: list[dict], chunks: list[dict], sources: list[dict]) -> list[dict]:
+    """Compute quantitative metrics for each theme based on its evidence.
 
-    # Find which sources these chunks belong to
+    The chunk → source and source → segment lookups are built once for all
+    themes; each theme then only walks its own chunk ids.
+    """
     chunk_source_map = {c["id"]: c.get("source_id") for c in chunks}
-    theme_source_ids = set()
-    theme_segment_tags = set()
-
-    for cid in chunk_ids:
-        sid = chunk_source_map.get(cid)
-        if sid:
-            theme_source_ids.add(sid)
-
     source_map = {s["id"]: s for s in sources}
-    for sid in theme_source_ids:
-        src = source_map.get(sid, {})
-        for tag in (src.get("segment_tags") or []):
-            theme_segment_tags.add(tag)
 
-    return {
-        "mention_count": mention_count,
-        "source_count": len(theme_source_ids),
-        "segment_spread": len(theme_segment_tags),
-    }
+    metrics = []
+    for theme in themes:
+        chunk_ids = theme.get("chunk_ids") or []
+        theme_source_ids = set()
+        theme_segment_tags = set()
+
+        for cid in chunk_ids:
+            sid = chunk_source_map.get(cid)
+            if sid:
+                theme_source_ids.add(sid)
+
+        for sid in theme_source_ids:
+            src = source_map.get(sid, {})
+            for tag in (src.get("segment_tags") or []):
+                theme_segment_tags.add(tag)
+
+        metrics.append({
+            "mention_count": len(chunk_ids),
+            "source_count": len(theme_source_ids),
+            "segment_spread": len(theme_segment_tags),
+        })
+    return metrics
 
 
 def _classify_trend(
@@ -161,8 +166,8 @@ def compute_trends_for_synthesis(
 
     # Compute trends for each current theme
     trend_records = []
-    for theme in current_themes:
-        metrics = _compute_theme_metrics(theme, chunks, sources)
+    all_metrics = _compute_theme_metrics(current_themes, chunks, sources)
+    for theme, metrics in zip(current_themes, all_metrics):
         title_key = theme["title"].lower().strip()
         prev = previous_trends.get(title_key)
 
@@ -0,0 +1,327 @@
+"""In-process approximate nearest-neighbour indexes for cosine similarity.
+
+Used where there is no pgvector to lean on — chiefly CLI sessions over a
+local interview folder (see backend/agents/local_index.py).
+
+    index = build_vector_index(vectors)          # picks the right kind by size
+    index.search(query_vector, k=5)              # → [(row, cosine), ...]
+    save_vector_index(index, directory)
+    load_vector_index(directory)                 # → same index, no rebuild
+
+Two implementations share one interface:
+
+  BruteForceIndex — exact scan; a single matrix-vector product with NumPy.
+                    Used up to LOCAL_INDEX_HNSW_THRESHOLD vectors.
+  HNSWIndex       — hierarchical navigable small-world graph; sub-linear
+                    search for larger corpora, built incrementally.
+
+Vectors are L2-normalised float32 on insert, so cosine is a dot product.
+NumPy is optional: without it the same code runs on array('f') rows, just
+slower.
+
+On-disk format (directory):
+  vectors.f32   — little-endian float32 rows, normalised
+  index.json    — {"kind", "dim", "count", plus the graph for HNSW}
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import operator
+import os
+import random
+import sys
+from array import array
+from collections.abc import Sequence
+
+from backend.config import settings
+
+try:
+    import numpy as np
+except ImportError:  # optional — pure-Python fallback below
+    np = None
+
+
+def _normalise(vector: Sequence[float]) -> array:
+    packed = array("f", vector)
+    norm = math.sqrt(sum(map(operator.mul, packed, packed)))
+    if norm > 0:
+        packed = array("f", (x / norm for x in packed))
+    return packed
+
+
+class _VectorStore:
+    """Normalised float32 rows with dot products against a query.
+
+    With NumPy the rows live in one preallocated matrix that grows by
+    doubling, so adds are amortised O(dim) and a scan is one mat-vec.
+    """
+
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+        self._count = 0
+        self._rows: list[array] = []  # pure-Python storage
+        self._matrix = np.empty((0, dim), dtype=np.float32) if np is not None else None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, vector: Sequence[float]) -> int:
+        if len(vector) != self.dim:
+            raise ValueError(f"Expected a {self.dim}-dim vector, got {len(vector)}.")
+        packed = _normalise(vector)
+        if self._matrix is not None:
+            if self._count == len(self._matrix):
+                grown = np.empty((max(16, 2 * self._count), self.dim), dtype=np.float32)
+                grown[: self._count] = self._matrix[: self._count]
+                self._matrix = grown
+            self._matrix[self._count] = np.frombuffer(packed, dtype=np.float32)
+        else:
+            self._rows.append(packed)
+        self._count += 1
+        return self._count - 1
+
+    def row(self, i: int):
+        return self._matrix[i] if self._matrix is not None else self._rows[i]
+
+    def dots(self, query, rows: Sequence[int] | None = None) -> list[float]:
+        """Cosine of a normalised *query* against every row (or the given rows)."""
+        if self._matrix is not None:
+            q = np.asarray(query, dtype=np.float32)
+            matrix = self._matrix[: self._count] if rows is None else self._matrix[list(rows)]
+            return (matrix @ q).tolist()
+        indices = range(self._count) if rows is None else rows
+        return [sum(map(operator.mul, self._rows[i], query)) for i in indices]
+
+    def to_bytes(self) -> bytes:
+        if self._matrix is not None:
+            data = self._matrix[: self._count].astype("<f4", copy=False)
+            return data.tobytes()
+        flat = array("f")
+        for row in self._rows:
+            flat.extend(row)
+        if sys.byteorder != "little":
+            flat.byteswap()
+        return flat.tobytes()
+
+    @classmethod
+    def from_bytes(cls, dim: int, data: bytes) -> _VectorStore:
+        store = cls(dim)
+        if np is not None:
+            store._matrix = np.frombuffer(data, dtype="<f4").astype(np.float32).reshape(-1, dim)
+            store._count = len(store._matrix)
+            return store
+        flat = array("f", data)
+        if sys.byteorder != "little":
+            flat.byteswap()
+        store._rows = [flat[i:i + dim] for i in range(0, len(flat), dim)]
+        store._count = len(store._rows)
+        return store
+
+
+class BruteForceIndex:
+    """Exact cosine search by scanning every row."""
+
+    kind = "brute_force"
+
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+        self.store = _VectorStore(dim)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def add(self, vector: Sequence[float]) -> int:
+        return self.store.add(vector)
+
+    def search(self, query: Sequence[float], k: int = 5) -> list[tuple[int, float]]:
+        if not len(self.store):
+            return []
+        scores = self.store.dots(_normalise(query))
+        top = heapq.nlargest(k, range(len(scores)), key=scores.__getitem__)
+        return [(i, float(scores[i])) for i in top]
+
+    def _graph_state(self) -> dict:
+        return {}
+
+    def _load_graph_state(self, state: dict) -> None:
+        pass
+
+
+class HNSWIndex:
+    """Hierarchical navigable small-world graph (Malkov & Yashunin) over cosine."""
+
+    kind = "hnsw"
+
+    def __init__(
+        self,
+        dim: int,
+        m: int = 16,
+        ef_construction: int = 100,
+        ef_search: int = 64,
+        seed: int = 0,
+    ) -> None:
+        self.dim = dim
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.store = _VectorStore(dim)
+        self._level_mult = 1 / math.log(max(m, 2))
+        self._rng = random.Random(seed)
+        # _links[level][node] → neighbour rows
+        self._links: list[dict[int, list[int]]] = []
+        self._entry: int | None = None
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def _search_layer(self, query: array, entries: list[int], ef: int, level: int) -> list[tuple[float, int]]:
+        """Best-first search of one layer; returns up to *ef* (score, row), best first."""
+        links = self._links[level]
+        visited = set(entries)
+        scores = self.store.dots(query, entries)
+        candidates = [(-s, e) for s, e in zip(scores, entries)]  # max-heap by score
+        heapq.heapify(candidates)
+        best = [(s, e) for s, e in zip(scores, entries)]           # min-heap of kept results
+        heapq.heapify(best)
+        while len(best) > ef:
+            heapq.heappop(best)
+
+        while candidates:
+            neg_score, node = heapq.heappop(candidates)
+            if len(best) >= ef and -neg_score < best[0][0]:
+                break
+            fresh = [n for n in links.get(node, ()) if n not in visited]
+            if not fresh:
+                continue
+            visited.update(fresh)
+            for score, n in zip(self.store.dots(query, fresh), fresh):
+                if len(best) < ef or score > best[0][0]:
+                    heapq.heappush(candidates, (-score, n))
+                    heapq.heappush(best, (score, n))
+                    if len(best) > ef:
+                        heapq.heappop(best)
+        return sorted(best, reverse=True)
+
+    def _link(self, node: int, neighbours: list[int], level: int) -> None:
+        links = self._links[level]
+        links[node] = neighbours
+        cap = self.m * 2 if level == 0 else self.m
+        for n in neighbours:
+            peers = links.setdefault(n, [])
+            peers.append(node)
+            if len(peers) > cap:
+                scores = self.store.dots(self.store.row(n), peers)
+                keep = heapq.nlargest(cap, zip(scores, peers))
+                links[n] = [p for _, p in keep]
+
+    def add(self, vector: Sequence[float]) -> int:
+        node = self.store.add(vector)
+        query = self.store.row(node)
+        level = int(-math.log(1.0 - self._rng.random()) * self._level_mult)
+        while len(self._links) <= level:
+            self._links.append({})
+
+        if self._entry is None:
+            for lvl in range(level + 1):
+                self._links[lvl][node] = []
+            self._entry = node
+            return node
+
+        entry = [self._entry]
+        top = len(self._links) - 1
+        entry_level = max(lvl for lvl in range(top + 1) if self._entry in self._links[lvl])
+        for lvl in range(entry_level, level, -1):
+            entry = [self._search_layer(query, entry, 1, lvl)[0][1]]
+        for lvl in range(min(level, entry_level), -1, -1):
+            found = self._search_layer(query, entry, self.ef_construction, lvl)
+            self._link(node, [n for _, n in found[: self.m]], lvl)
+            entry = [n for _, n in found]
+        for lvl in range(entry_level + 1, level + 1):
+            self._links[lvl][node] = []
+        if level > entry_level:
+            self._entry = node
+        return node
+
+    def search(self, query: Sequence[float], k: int = 5) -> list[tuple[int, float]]:
+        if self._entry is None:
+            return []
+        q = _normalise(query)
+        entry = [self._entry]
+        entry_level = max(lvl for lvl in range(len(self._links)) if self._entry in self._links[lvl])
+        for lvl in range(entry_level, 0, -1):
+            entry = [self._search_layer(q, entry, 1, lvl)[0][1]]
+        found = self._search_layer(q, entry, max(self.ef_search, k), 0)
+        return [(n, float(s)) for s, n in found[:k]]
+
+    def _graph_state(self) -> dict:
+        return {
+            "m": self.m,
+            "ef_construction": self.ef_construction,
+            "ef_search": self.ef_search,
+            "entry": self._entry,
+            "links": [{str(n): peers for n, peers in level.items()} for level in self._links],
+        }
+
+    def _load_graph_state(self, state: dict) -> None:
+        self.m = state["m"]
+        self.ef_construction = state["ef_construction"]
+        self.ef_search = state["ef_search"]
+        self._level_mult = 1 / math.log(max(self.m, 2))
+        self._entry = state["entry"]
+        self._links = [{int(n): peers for n, peers in level.items()} for level in state["links"]]
+
+
+VectorIndex = BruteForceIndex | HNSWIndex
+
+
+def build_vector_index(vectors: Sequence[Sequence[float]], dim: int | None = None) -> VectorIndex:
+    """Index *vectors* (row i ↔ vectors[i]) with the kind that suits their count."""
+    dim = dim or (len(vectors[0]) if vectors else 0)
+    if len(vectors) > settings.local_index_hnsw_threshold:
+        index: VectorIndex = HNSWIndex(dim)
+    else:
+        index = BruteForceIndex(dim)
+    for vector in vectors:
+        index.add(vector)
+    return index
+
+
+def save_vector_index(index: VectorIndex, directory: str, extra: dict | None = None) -> None:
+    """Write *index* (and any *extra* metadata) into *directory* atomically."""
+    os.makedirs(directory, exist_ok=True)
+    meta = {
+        "kind": index.kind,
+        "dim": index.dim,
+        "count": len(index),
+        "graph": index._graph_state(),
+        **(extra or {}),
+    }
+    for name, payload, mode in (
+        ("vectors.f32", index.store.to_bytes(), "wb"),
+        ("index.json", json.dumps(meta), "w"),
+    ):
+        tmp = os.path.join(directory, f".{name}.tmp")
+        with open(tmp, mode) as fh:
+            fh.write(payload)
+        os.replace(tmp, os.path.join(directory, name))
+
+
+def load_vector_index(directory: str) -> tuple[VectorIndex, dict] | None:
+    """Load an index written by save_vector_index; None if absent or unreadable."""
+    try:
+        with open(os.path.join(directory, "index.json")) as fh:
+            meta = json.load(fh)
+        with open(os.path.join(directory, "vectors.f32"), "rb") as fh:
+            data = fh.read()
+    except (OSError, ValueError):
+        return None
+
+    index: VectorIndex = HNSWIndex(meta["dim"]) if meta.get("kind") == "hnsw" else BruteForceIndex(meta["dim"])
+    index.store = _VectorStore.from_bytes(meta["dim"], data)
+    if len(index.store) != meta.get("count"):
+        return None  # truncated / mismatched files — rebuild
+    index._load_graph_state(meta.get("graph") or {})
+    return index, meta
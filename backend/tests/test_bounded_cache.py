@@ -0,0 +1,37 @@
+from backend.services.bounded_cache import BoundedCache
+
+
+def test_lru_eviction_by_entry_count():
+    cache = BoundedCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" becomes most recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_budget_and_oversized_values():
+    cache = BoundedCache(max_bytes=100, sizeof=len)
+    cache.set("a", "x" * 60)
+    cache.set("b", "y" * 60)
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 60
+    cache.set("huge", "z" * 500)
+    assert cache.get("huge") is None
+    assert cache.get("b") == "y" * 60
+
+
+def test_ttl_expiry(monkeypatch):
+    import backend.services.bounded_cache as bc
+
+    now = [1000.0]
+    monkeypatch.setattr(bc.time, "monotonic", lambda: now[0])
+    cache = BoundedCache(ttl_seconds=10)
+    cache.set("k", "v")
+    now[0] += 5
+    assert cache.get("k") == "v"
+    now[0] += 6
+    assert cache.get("k") is None
+    assert cache.stats()["expirations"] == 1
@@ -0,0 +1,161 @@
+import pytest
+
+from backend.services import cache_l2, cache_manager, embeddings
+from backend.services.cache_l2 import from_bytea, to_bytea
+
+
+class _FakeEmbedder:
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def test_pack_batches_respects_item_and_token_limits():
+    texts = ["a" * 40, "b" * 40, "c" * 40, "d" * 400]
+    batches = embeddings._pack_batches(texts, max_items=2, max_tokens=25)
+    assert batches == [["a" * 40, "b" * 40], ["c" * 40], ["d" * 400]]
+
+
+def test_create_embeddings_batch_dedupes_and_uses_cache(monkeypatch):
+    fake = _FakeEmbedder()
+    monkeypatch.setattr(embeddings, "_get_embedder", lambda: fake)
+    monkeypatch.setattr(cache_manager, "_l2_backend", cache_l2.NullL2())
+    cache_manager.store_embedding("cached text", [9.0, 9.0])
+
+    vectors = embeddings.create_embeddings_batch(
+        ["alpha", " alpha ", "cached text", "beta"]
+    )
+
+    assert [list(v) for v in vectors] == [[5.0, 1.0], [5.0, 1.0], [9.0, 9.0], [4.0, 1.0]]
+    assert fake.calls == [["alpha", "beta"]]
+
+
+def test_short_embedding_batch_raises_instead_of_dropping_texts(monkeypatch):
+    class _ShortEmbedder(_FakeEmbedder):
+        def embed_documents(self, texts):
+            return super().embed_documents(texts)[:-1]
+
+    monkeypatch.setattr(embeddings, "_get_embedder", lambda: _ShortEmbedder())
+    monkeypatch.setattr(cache_manager, "_l2_backend", cache_l2.NullL2())
+    monkeypatch.setattr(embeddings.settings, "embed_batch_size", 2)
+
+    with pytest.raises(RuntimeError, match=r"batch \d/2 returned 1 vectors for 2 texts"):
+        embeddings.create_embeddings_batch(["gamma", "delta", "epsilon", "zeta"])
+    assert cache_manager.get_embeddings_cached_many(["gamma", "delta"]) == {}
+
+
+def test_cached_vectors_are_packed_float32_views(monkeypatch):
+    monkeypatch.setattr(cache_manager, "_l2_backend", cache_l2.NullL2())
+    view = cache_manager.store_embedding("packed", [0.1, 0.2, 0.3])
+
+    assert isinstance(view, memoryview) and view.readonly
+    assert view.format == "f" and view.nbytes == 12
+    assert from_bytea(to_bytea(view.obj)) == view.obj
+    assert embeddings.to_pgvector_literal(view) == "[0.100000001,0.200000003,0.300000012]"
+
+
+class _FakeQuery:
+    def __init__(self, db, table):
+        self.db, self.table = db, table
+        self.keys: list[str] = []
+
+    def select(self, _columns):
+        return self
+
+    def in_(self, _column, keys):
+        self.keys = list(keys)
+        self.db.reads.append((self.table, len(keys)))
+        return self
+
+    def upsert(self, rows):
+        self.db.writes.append((self.table, list(rows)))
+        return self
+
+    def execute(self):
+        class _Result:
+            data = [self.db.rows[k] for k in self.keys if k in self.db.rows]
+        return _Result()
+
+
+class _FakeDB:
+    def __init__(self, rows):
+        self.rows = rows
+        self.reads: list[tuple[str, int]] = []
+        self.writes: list[tuple[str, list[dict]]] = []
+
+    def table(self, name):
+        return _FakeQuery(self, name)
+
+
+def test_l2_multi_get_pages_reads_and_batches_writes(monkeypatch):
+    cache_manager._llm_l1.clear()
+    stored = {
+        cache_manager._hash(f"k{i}"): {"prompt_hash": cache_manager._hash(f"k{i}"), "response": f"r{i}"}
+        for i in range(150)
+    }
+    db = _FakeDB(stored)
+    monkeypatch.setattr(cache_manager, "_l2_backend", cache_l2.SupabaseL2(lambda: db))
+    monkeypatch.setattr(cache_manager.settings, "cache_l2_write_batch", 3)
+
+    found = cache_manager.get_llm_responses_many([f"k{i}" for i in range(160)])
+
+    assert len(found) == 150 and found["k7"] == "r7"
+    assert db.reads == [("agent_llm_cache", 100), ("agent_llm_cache", 60)]
+
+    for i in range(3):
+        cache_manager.store_llm_response(f"new{i}", "x")
+    assert [(t, len(rows)) for t, rows in db.writes] == [("agent_llm_cache", 3)]
+
+
+def test_sqlite_l2_is_shared_between_instances(monkeypatch, tmp_path):
+    path = str(tmp_path / "cache.db")
+    writer, reader = cache_l2.SQLiteL2(path), cache_l2.SQLiteL2(path)
+
+    writer.put_embeddings({"h1": cache_manager.pack_vector([0.5, 1.5])})
+    writer.put_llm_responses({"p1": "answer"})
+
+    assert list(reader.get_embeddings(["h1", "missing"])["h1"]) == [0.5, 1.5]
+    assert reader.get_llm_responses(["p1", "missing"]) == {"p1": "answer"}
+    mode = reader._connect().execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+    cache_manager._emb_l1.clear()
+    monkeypatch.setattr(cache_manager, "_l2_backend", reader)
+    cache_manager.store_embedding("persisted", [2.0, 3.0])
+    cache_manager.flush_l2_writes()
+    cache_manager._emb_l1.clear()
+    assert list(cache_manager.get_embedding_cached("persisted")) == [2.0, 3.0]
+
+
+def test_concurrent_query_embeddings_are_coalesced(monkeypatch):
+    import threading
+
+    class _QueryEmbedder(_FakeEmbedder):
+        def embed_query(self, text):
+            self.calls.append([text])
+            return [float(len(text)), 1.0]
+
+    fake = _QueryEmbedder()
+    monkeypatch.setattr(embeddings, "_get_embedder", lambda: fake)
+    monkeypatch.setattr(cache_manager, "_l2_backend", cache_l2.NullL2())
+    monkeypatch.setattr(embeddings.settings, "embed_coalesce_window_ms", 50)
+    cache_manager._emb_l1.clear()
+
+    queries = ["onboarding pain", "pricing", "onboarding pain", "churn drivers"]
+    results: dict[int, list[float]] = {}
+
+    def worker(i: int) -> None:
+        results[i] = list(embeddings.create_embedding(queries[i]))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(queries))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(fake.calls) == 1
+    assert sorted(fake.calls[0]) == ["churn drivers", "onboarding pain", "pricing"]
+    assert results[0] == results[2] == [15.0, 1.0]
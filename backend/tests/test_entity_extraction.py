@@ -0,0 +1,322 @@
+import json
+import threading
+
+import pytest
+
+from backend.services import cache_manager, entity_extraction, entity_graph, entity_resolver
+
+
+class _Query:
+    """Just enough of the PostgREST builder for entity extraction."""
+
+    def __init__(self, db, table):
+        self.db, self.table = db, table
+        self.filters, self.window, self.rows, self.op = [], None, None, "select"
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def eq(self, col, value):
+        self.filters.append(lambda r: r.get(col) == value)
+        return self
+
+    def in_(self, col, values):
+        self.filters.append(lambda r: r.get(col) in set(values))
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end + 1)
+        return self
+
+    def limit(self, n):
+        self.window = (0, n)
+        return self
+
+    def insert(self, rows):
+        self.op, self.rows = "insert", rows
+        return self
+
+    def upsert(self, rows):
+        self.op, self.rows = "upsert", rows
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    def execute(self):
+        table = self.db.tables.setdefault(self.table, [])
+        self.db.calls.append((self.table, self.op))
+        if self.op == "insert":
+            table.extend(dict(r) for r in self.rows)
+            return type("R", (), {"data": self.rows, "count": None})
+        if self.op == "upsert":
+            key = {"entity_extraction_watermarks": "chunk_id", "entity_adjacency": "entity_id"}.get(self.table, "id")
+            by_id = {r[key]: r for r in table}
+            for row in self.rows:
+                if row[key] in by_id:
+                    by_id[row[key]].update(row)
+                else:
+                    table.append(dict(row))
+            return type("R", (), {"data": self.rows, "count": None})
+        rows = [r for r in table if all(f(r) for f in self.filters)]
+        if self.op == "delete":
+            table[:] = [r for r in table if r not in rows]
+            return type("R", (), {"data": rows, "count": None})
+        if self.window:
+            rows = rows[slice(*self.window)]
+        return type("R", (), {"data": [dict(r) for r in rows], "count": len(rows)})
+
+
+class _FakeDB:
+    def __init__(self, **tables):
+        self.tables = {name: list(rows) for name, rows in tables.items()}
+        self.calls = []
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def rpc(self, name, params):
+        """apply_entity_mentions: count deltas, upserting new entities on (project, type, lower(name))."""
+        assert name == "apply_entity_mentions"
+        self.calls.append(("entities", "rpc"))
+        entities = self.tables.setdefault("entities", [])
+        landed = []
+        for change in params["changes"]:
+            if "canonical_name" in change:
+                key = (change["entity_type"], change["canonical_name"].lower())
+                row = next(
+                    (e for e in entities
+                     if e["project_id"] == params["input_project_id"]
+                     and (e["entity_type"], e["canonical_name"].lower()) == key),
+                    None,
+                )
+                if row is None:
+                    row = {
+                        "project_id": params["input_project_id"], "mention_count": 0, "aliases": [],
+                        **{k: v for k, v in change.items() if k != "delta"},
+                    }
+                    entities.append(row)
+            else:
+                row = next((e for e in entities if e["id"] == change["id"]), None)
+            if row is not None:
+                row["mention_count"] = max(0, row["mention_count"] + change["delta"])
+                row["aliases"] = list(dict.fromkeys(row["aliases"] + change.get("aliases", [])))
+            landed.append({"requested_id": change["id"], "entity_id": row and row["id"]})
+        return type("Q", (), {"execute": lambda self: type("R", (), {"data": landed})})()
+
+
+class _FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+class _BatchLLM:
+    """Names an entity after every capitalised word in each chunk."""
+
+    def __init__(self):
+        self.batch_sizes = []
+        self._lock = threading.Lock()
+
+    def invoke(self, messages):
+        blocks = messages[1].content.split("chunk_id: ")[1:]
+        with self._lock:
+            self.batch_sizes.append(len(blocks))
+        chunks = []
+        for block in blocks:
+            chunk_id, text = block.split("\n", 1)
+            words = [w.strip(".,") for w in text.split() if w[0].isupper()]
+            chunks.append({
+                "chunk_id": chunk_id,
+                "entities": [
+                    {"canonical_name": w, "entity_type": "product", "mention_text": w}
+                    for w in words
+                ],
+            })
+        return _FakeResponse(json.dumps({"chunks": chunks}))
+
+
+def _one_hot_names(texts):
+    return [[float(i == sum(map(ord, t)) % 64) for i in range(64)] for t in texts]
+
+
+@pytest.fixture
+def project(monkeypatch):
+    db = _FakeDB(
+        sources=[{"id": "s1", "project_id": "p"}, {"id": "s2", "project_id": "p"}],
+        chunks=[
+            {"id": f"c{i}", "source_id": f"s{1 + i % 2}", "content": text}
+            for i, text in enumerate([
+                "Slack export is slow", "we moved off Slack", "Jira sync breaks",
+                "jira is fine", "", "Figma plugin crashes",
+            ])
+        ],
+        entities=[{
+            "id": "e-jira", "project_id": "p", "entity_type": "product",
+            "canonical_name": "JIRA", "aliases": ["jira"], "mention_count": 3,
+        }],
+    )
+    llm = _BatchLLM()
+    monkeypatch.setattr(entity_extraction, "get_supabase", lambda: db)
+    monkeypatch.setattr(entity_resolver, "get_supabase", lambda: db)
+    monkeypatch.setattr(entity_resolver, "_resolvers", {})
+    monkeypatch.setattr(entity_graph, "get_supabase", lambda: db)
+    monkeypatch.setattr(entity_graph, "_incidences", {})
+    monkeypatch.setattr(entity_extraction, "get_fast_llm", lambda: llm)
+    monkeypatch.setattr(entity_extraction, "create_embeddings_batch", _one_hot_names)
+    monkeypatch.setattr(entity_extraction.settings, "entity_batch_max_chunks", 2)
+    store: dict[str, str] = {}
+    monkeypatch.setattr(
+        cache_manager, "get_llm_responses_many", lambda keys: {k: store[k] for k in keys if k in store}
+    )
+    monkeypatch.setattr(cache_manager, "store_llm_response", store.__setitem__)
+    return db, llm
+
+
+def test_project_extraction_batches_calls_and_bulk_writes(project):
+    db, llm = project
+
+    result = entity_extraction.extract_entities_for_project("p")
+
+    assert sorted(llm.batch_sizes) == [1, 2, 2]  # 5 non-empty chunks, 2 per call
+    assert result["mentions_created"] == 4
+    by_name = {e["canonical_name"]: e for e in db.tables["entities"]}
+    assert sorted(by_name) == ["Figma", "JIRA", "Slack"]
+    assert by_name["JIRA"]["mention_count"] == 4  # resolved against the alias index
+    assert by_name["Slack"]["mention_count"] == 2
+    assert {m["entity_id"] for m in db.tables["entity_mentions"]} == {e["id"] for e in by_name.values()}
+    writes = [call for call in db.calls if call[1] != "select"]
+    assert writes == [
+        ("entity_mentions", "delete"), ("entities", "rpc"), ("entity_mentions", "insert"), ("entity_extraction_watermarks", "upsert"),
+        ("entity_adjacency", "upsert"),
+    ]
+
+
+def test_rerun_only_touches_new_or_changed_chunks(project, monkeypatch):
+    db, llm = project
+    entity_extraction.extract_entities_for_project("p")
+    calls = len(llm.batch_sizes)
+
+    rerun = entity_extraction.extract_entities_for_project("p")
+    assert len(llm.batch_sizes) == calls
+    assert (rerun["chunks_processed"], rerun["chunks_skipped"], rerun["mentions_created"]) == (0, 6, 0)
+
+    db.tables["chunks"][1]["content"] = "we moved off Slack to Teams"
+    db.tables["chunks"].append({"id": "c6", "source_id": "s1", "content": "Figma again"})
+    monkeypatch.setattr(entity_resolver, "_resolvers", {})  # counts come back from the db
+    rerun = entity_extraction.extract_entities_for_project("p")
+
+    assert sorted(llm.batch_sizes[calls:]) == [2]
+    assert (rerun["chunks_processed"], rerun["chunks_skipped"]) == (2, 5)
+    counts = {e["canonical_name"]: e["mention_count"] for e in db.tables["entities"]}
+    assert counts == {"JIRA": 4, "Slack": 2, "Figma": 2, "Teams": 1}
+    assert len(db.tables["entity_mentions"]) == 6
+
+    ids = {e["canonical_name"]: e["id"] for e in db.tables["entities"]}
+    adjacency = {r["entity_id"]: r for r in db.tables["entity_adjacency"]}
+    assert adjacency[ids["Slack"]]["chunk_count"] == 2
+    assert [n["canonical_name"] for n in adjacency[ids["Slack"]]["neighbors"]] == ["Teams"]
+    assert adjacency[ids["Teams"]]["neighbors"][0]["score"] == round(1 / 2 ** 0.5, 4)
+
+
+def test_retracting_deleted_chunks_updates_counts_and_adjacency(project):
+    db, _ = project
+    entity_extraction.extract_entities_for_project("p")
+    ids = {e["canonical_name"]: e["id"] for e in db.tables["entities"]}
+
+    assert entity_extraction.retract_entities_for_chunks("p", ["c0"]) == 1
+
+    counts = {e["canonical_name"]: e["mention_count"] for e in db.tables["entities"]}
+    assert counts["Slack"] == 1
+    assert all(m["chunk_id"] != "c0" for m in db.tables["entity_mentions"])
+    adjacency = {r["entity_id"]: r for r in db.tables["entity_adjacency"]}
+    assert adjacency[ids["Slack"]]["chunk_ids"] == ["c1"]
+    assert entity_extraction.get_entity_connections(ids["Slack"])["chunk_ids"] == ["c1"]
+
+
+def test_retraction_updates_adjacency_with_a_cold_incidence_cache(project, monkeypatch):
+    db, _ = project
+    entity_extraction.extract_entities_for_project("p")
+    ids = {e["canonical_name"]: e["id"] for e in db.tables["entities"]}
+    monkeypatch.setattr(entity_graph, "_incidences", {})  # e.g. a fresh ingestion worker
+
+    entity_extraction.retract_entities_for_chunks("p", ["c0"])
+
+    adjacency = {r["entity_id"]: r for r in db.tables["entity_adjacency"]}
+    assert adjacency[ids["Slack"]]["chunk_ids"] == ["c1"]
+    assert entity_extraction.get_entity_connections(ids["Slack"])["chunk_ids"] == ["c1"]
+
+
+def test_concurrent_writers_with_stale_resolvers_share_entities_and_counts(project, monkeypatch):
+    db, _ = project
+    entity_extraction.extract_entities_for_project("p")
+    slack_id = next(e["id"] for e in db.tables["entities"] if e["canonical_name"] == "Slack")
+
+    # Three workers load their resolvers before any of them flushes
+    workers = []
+    for _ in range(3):
+        monkeypatch.setattr(entity_resolver, "_resolvers", {})
+        workers.append(entity_extraction._GraphWrites("p"))
+    first, second, stale = workers
+    for writes, chunk_id in ((first, "c7"), (second, "c8")):
+        chunk = {"id": chunk_id, "source_id": "s1", "content": "Notion and Slack"}
+        db.tables["chunks"].append(chunk)
+        for name in ("Notion", "Slack"):
+            writes.add_mention(chunk, {"canonical_name": name, "entity_type": "product"}, _one_hot_names([name])[0])
+    first.flush()
+    second.flush()
+
+    # The third, whose resolver predates Notion, retracts one of its mentions
+    stale.retract(["c7"])
+    stale.flush()
+
+    notion = [e for e in db.tables["entities"] if e["canonical_name"] == "Notion"]
+    assert len(notion) == 1 and notion[0]["mention_count"] == 1
+    assert next(e for e in db.tables["entities"] if e["id"] == slack_id)["mention_count"] == 3
+    assert {m["entity_id"] for m in db.tables["entity_mentions"] if m["chunk_id"] == "c8"} == {
+        notion[0]["id"], slack_id
+    }
+
+
+def test_incidence_ranks_neighbours_and_forgets_removed_chunks():
+    incidence = entity_graph.EntityIncidence("p", [
+        {"entity_id": e, "chunk_id": c, "source_id": s}
+        for e, c, s in [
+            ("a", "c1", "s1"), ("b", "c1", "s1"), ("a", "c2", "s2"), ("b", "c2", "s2"),
+            ("a", "c3", "s2"), ("c", "c3", "s2"), ("c", "c4", "s3"),
+        ]
+    ])
+
+    assert [(n["entity_id"], n["shared_chunks"], n["shared_sources"]) for n in incidence.neighbors("a", 5)] == [
+        ("b", 2, 2), ("c", 1, 1),
+    ]
+    assert incidence.remove_chunks(["c3"]) == {"a", "c"}
+    assert [n["entity_id"] for n in incidence.neighbors("a", 5)] == ["b"]
+    assert incidence.adjacency_row("c", 5)["source_ids"] == ["s3"]
+    incidence.remove_chunks(["c4"])
+    assert incidence.adjacency_row("c", 5) is None
+
+
+def test_resolver_matches_exact_alias_then_embedding(monkeypatch):
+    monkeypatch.setattr(entity_resolver.settings, "entity_match_min_similarity", 0.9)
+    resolver = entity_resolver.EntityResolver("p", [
+        {"id": "e1", "entity_type": "feature", "canonical_name": "CSV Export",
+         "aliases": ["csv exports"], "embedding": "[1,0,0]"},
+        {"id": "e2", "entity_type": "feature", "canonical_name": "Dark mode",
+         "aliases": [], "embedding": [0, 1, 0]},
+    ])
+
+    assert resolver.match_name("csv-export ", "feature")["id"] == "e1"
+    assert resolver.match_name("CSV Exports", "feature")["id"] == "e1"
+    assert resolver.match_name("CSV Export", "product") is None
+    assert resolver.resolve("CSV exporting", "feature", [0.95, 0.1, 0.0])["id"] == "e1"
+    assert resolver.resolve("Night theme", "feature", [0.6, 0.8, 0.0]) is None
+
+    resolver.add({"id": "e3", "entity_type": "feature", "canonical_name": "Night theme"}, [0.6, 0.8, 0.0])
+    resolver.add_alias(resolver.match_name("Dark mode", "feature"), "dark theme")
+    assert resolver.resolve("night themes", "feature", [0.61, 0.79, 0.0])["id"] == "e3"
+    assert resolver.match_name("Dark Theme", "feature")["id"] == "e2"
+    assert len(resolver) == 3
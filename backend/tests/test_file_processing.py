@@ -0,0 +1,34 @@
+from backend.services.file_processing import chunk_text, iter_anchored_chunks, iter_chunks, iter_text
+
+
+def test_iter_chunks_matches_chunk_text_across_segment_boundaries():
+    text = "  Intro line.\n\n" + ("word " * 700) + "\t\n tail  \n\n"
+    segments = [text[i:i + 37] for i in range(0, len(text), 37)]
+    assert list(iter_chunks(segments, 200, 30)) == chunk_text(text, 200, 30)
+    assert list(iter_chunks([text], 1200, 150)) == chunk_text(text, 1200, 150)
+
+
+def test_iter_chunks_empty_input():
+    assert list(iter_chunks(["   ", "\n"], 100, 10)) == []
+
+
+def test_iter_text_streams_csv_rows(tmp_path):
+    path = tmp_path / "tickets.csv"
+    path.write_text("id,body\n1,login broken\n2,slow export\n")
+    assert list(iter_text(file_path=str(path))) == [
+        "id body\n",
+        "1 login broken\n",
+        "2 slow export\n",
+    ]
+
+
+def test_anchored_chunks_are_bounded_and_independent_of_segmentation():
+    text = "\n".join(f"Line {i} says the export is slow. Then it crashed!" for i in range(200))
+    text += " " + "x" * 900  # one unbroken run, split at the budget
+    chunks = list(iter_anchored_chunks([text], 300, 50))
+    segments = [text[i:i + 41] for i in range(0, len(text), 41)]
+
+    assert list(iter_anchored_chunks(segments, 300, 50)) == chunks
+    assert max(map(len, chunks)) <= 300
+    assert " ".join(chunks).count("Line 199 says") >= 1
+    assert list(iter_anchored_chunks(["  ", "\n"], 100, 10)) == []
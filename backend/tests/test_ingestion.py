@@ -0,0 +1,176 @@
+import itertools
+import random
+
+import pytest
+
+from backend.services import ingestion
+from backend.services.file_processing import iter_anchored_chunks
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    """Just enough of the PostgREST builder for the ingestion pipeline."""
+
+    def __init__(self, db, table):
+        self.db, self.table = db, table
+        self.filters, self.window, self.op, self.payload, self.single = [], None, "select", None, False
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def eq(self, col, value):
+        self.filters.append(lambda r: r.get(col) == value)
+        return self
+
+    def in_(self, col, values):
+        self.filters.append(lambda r: r.get(col) in set(values))
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end + 1)
+        return self
+
+    def maybe_single(self):
+        self.single = True
+        return self
+
+    def insert(self, rows):
+        self.op, self.payload = "insert", rows
+        return self
+
+    def update(self, fields):
+        self.op, self.payload = "update", fields
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    def execute(self):
+        table = self.db.tables.setdefault(self.table, [])
+        if self.op == "insert":
+            rows = [{**r, "id": f"row{next(self.db.ids)}"} for r in self.payload]
+            table.extend(rows)
+            return _Result(rows)
+        rows = [r for r in table if all(f(r) for f in self.filters)]
+        if self.op == "update":
+            for r in rows:
+                r.update(self.payload)
+            return _Result(rows)
+        if self.op == "delete":
+            self.db.deleted.extend(r["id"] for r in rows)
+            table[:] = [r for r in table if r not in rows]
+            return _Result(rows)
+        rows = sorted(rows, key=lambda r: (r.get("chunk_index", 0), r["id"]))
+        if self.window:
+            rows = rows[slice(*self.window)]
+        if self.single:
+            return _Result(dict(rows[0]) if rows else None)
+        return _Result([dict(r) for r in rows])
+
+
+class _FakeDB:
+    def __init__(self, text):
+        self.tables = {"sources": [{"id": "s1", "project_id": "p", "raw_content": text}], "chunks": []}
+        self.ids = itertools.count()
+        self.deleted: list[str] = []
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def rpc(self, name, params):
+        assert name == "reindex_chunks"
+        index = dict(zip(params["chunk_ids"], params["chunk_indexes"]))
+        for row in self.tables["chunks"]:
+            if row["id"] in index:
+                row["chunk_index"] = index[row["id"]]
+        return self.table("rpc")
+
+
+def _document(sentences=240, seed=7):
+    rng = random.Random(seed)
+    words = "pricing onboarding export is slow the team wants better api docs and support for sso".split()
+    return [
+        " ".join(rng.choice(words) for _ in range(rng.randint(6, 24))).capitalize() + "."
+        for _ in range(sentences)
+    ]
+
+
+@pytest.fixture
+def ingest(monkeypatch):
+    embedded: list[str] = []
+
+    def fake_embed(texts):
+        embedded.extend(texts)
+        return [[float(len(t)), 1.0] for t in texts]
+
+    monkeypatch.setattr(ingestion, "create_embeddings_batch", fake_embed)
+    monkeypatch.setattr(ingestion, "retract_entities_for_chunks", lambda project_id, ids: 0)
+    monkeypatch.setattr(ingestion.cache_manager, "bump_corpus_version", lambda project_id: None)
+    monkeypatch.setattr(ingestion.settings, "entity_extraction_on_ingest", False)
+    monkeypatch.setattr(ingestion.settings, "chunk_size", 400)
+    monkeypatch.setattr(ingestion.settings, "chunk_overlap", 60)
+
+    def run(db, text):
+        db.tables["sources"][0]["raw_content"] = text
+        embedded.clear()
+        monkeypatch.setattr(ingestion, "get_supabase", lambda: db)
+        return ingestion.run_ingestion_pipeline("s1"), list(embedded)
+
+    return run
+
+
+def _chunks(db):
+    return [r["content"] for r in sorted(db.tables["chunks"], key=lambda r: r["chunk_index"])]
+
+
+def test_reingesting_unchanged_text_reuses_every_chunk(ingest):
+    text = " ".join(_document())
+    db = _FakeDB(text)
+    first, _ = ingest(db, text)
+
+    again, embedded = ingest(db, text)
+    assert embedded == [] and again["reused_count"] == first["chunk_count"]
+    assert again["deleted_count"] == 0
+
+
+def test_edit_in_the_middle_reembeds_only_nearby_chunks(ingest):
+    sentences = _document()
+    db = _FakeDB(" ".join(sentences))
+    first, _ = ingest(db, " ".join(sentences))
+    assert first["chunk_count"] > 20
+
+    sentences[120] = "Typo fixed: " + sentences[120]
+    result, embedded = ingest(db, " ".join(sentences))
+
+    assert 1 <= len(embedded) <= 3
+    assert result["deleted_count"] == len(embedded)
+    assert _chunks(db) == list(iter_anchored_chunks([" ".join(sentences)], 400, 60))
+
+
+def test_removed_text_renumbers_kept_rows_and_deletes_stale_ones(ingest):
+    sentences = _document()
+    db = _FakeDB(" ".join(sentences))
+    ingest(db, " ".join(sentences))
+    ids_by_content = {r["content"]: r["id"] for r in db.tables["chunks"]}
+
+    shorter = " ".join(sentences[:40] + sentences[80:])
+    result, embedded = ingest(db, shorter)
+
+    expected = list(iter_anchored_chunks([shorter], 400, 60))
+    assert _chunks(db) == expected
+    assert result["chunk_count"] == len(expected)
+    assert len(embedded) <= 3
+    assert result["deleted_count"] > 3
+    assert set(db.deleted).isdisjoint(r["id"] for r in db.tables["chunks"])
+    # Chunks after the cut kept their rows (and embeddings) under new indexes
+    rows = sorted(db.tables["chunks"], key=lambda r: r["chunk_index"])
+    assert [r["chunk_index"] for r in rows] == list(range(len(expected)))
+    assert ids_by_content[rows[-1]["content"]] == rows[-1]["id"]
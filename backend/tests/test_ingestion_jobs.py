@@ -0,0 +1,154 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.services import ingestion_jobs
+
+
+class _Query:
+    """select / update / insert with eq / in_ / lt filters over the ingestion_jobs rows."""
+
+    def __init__(self, db):
+        self.db, self.filters, self.op, self.payload = db, [], "select", None
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def eq(self, col, value):
+        self.filters.append(lambda r: r.get(col) == value)
+        return self
+
+    def in_(self, col, values):
+        self.filters.append(lambda r: r.get(col) in values)
+        return self
+
+    def lt(self, col, value):
+        self.filters.append(lambda r: r.get(col) < value)
+        return self
+
+    def insert(self, row):
+        self.op, self.payload = "insert", row
+        return self
+
+    def update(self, fields):
+        self.op, self.payload = "update", fields
+        return self
+
+    def execute(self):
+        with self.db.lock:
+            if self.op == "insert":
+                self.db.rows[self.payload["id"]] = dict(self.payload)
+                return type("R", (), {"data": [self.payload]})
+            rows = [r for r in self.db.rows.values() if all(f(r) for f in self.filters)]
+            if self.op == "update":
+                self.db.updates.append(dict(self.payload))
+                for r in rows:
+                    r.update(self.payload)
+            return type("R", (), {"data": [dict(r) for r in rows]})
+
+
+class _FakeDB:
+    def __init__(self, *rows):
+        self.rows = {r["id"]: dict(r) for r in rows}
+        self.updates: list[dict] = []
+        self.lock = threading.Lock()
+
+    def table(self, name):
+        assert name == "ingestion_jobs"
+        return _Query(self)
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    db = _FakeDB()
+    monkeypatch.setattr(ingestion_jobs, "get_supabase", lambda: db)
+    monkeypatch.setattr(ingestion_jobs, "_jobs", {})
+    monkeypatch.setattr(ingestion_jobs.settings, "ingest_job_backoff_seconds", 0)
+    monkeypatch.setattr(ingestion_jobs.settings, "ingest_job_max_attempts", 3)
+    yield db
+    ingestion_jobs.shutdown(wait=True)
+
+
+def _ago(seconds: float) -> str:
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds)).isoformat()
+
+
+def test_job_retries_transient_failures_then_succeeds(jobs, monkeypatch):
+    attempts = []
+
+    def flaky(source_id, on_progress):
+        attempts.append(source_id)
+        on_progress({"stage": "embedding", "chunks_processed": 1})
+        if len(attempts) < 3:
+            raise RuntimeError("provider timeout")
+        return {"source_id": source_id, "chunk_count": 1}
+
+    monkeypatch.setattr(ingestion_jobs, "run_ingestion_pipeline", flaky)
+    job = ingestion_jobs.submit_ingestion_job("s1")
+    ingestion_jobs.shutdown(wait=True)
+
+    row = jobs.rows[job["id"]]
+    assert (row["status"], row["attempts"], row["result"]["chunk_count"]) == ("succeeded", 3, 1)
+    assert [u["status"] for u in jobs.updates if u.get("status") == "retrying"] == ["retrying"] * 2
+    assert ingestion_jobs.get_ingestion_job(job["id"])["status"] == "succeeded"
+
+
+def test_job_fails_without_retry_on_value_error_and_after_max_attempts(jobs, monkeypatch):
+    calls = []
+
+    def missing(source_id, on_progress):
+        calls.append(source_id)
+        raise ValueError("Source not found.") if source_id == "gone" else RuntimeError("down")
+
+    monkeypatch.setattr(ingestion_jobs, "run_ingestion_pipeline", missing)
+    gone = ingestion_jobs.submit_ingestion_job("gone")
+    down = ingestion_jobs.submit_ingestion_job("down")
+    ingestion_jobs.shutdown(wait=True)
+
+    assert (jobs.rows[gone["id"]]["status"], calls.count("gone")) == ("failed", 1)
+    assert (jobs.rows[down["id"]]["status"], calls.count("down")) == ("failed", 3)
+
+
+def test_only_one_worker_claims_a_job(jobs):
+    jobs.rows["j1"] = {"id": "j1", "status": "queued"}
+    assert ingestion_jobs._claim_job("j1") is True
+    assert ingestion_jobs._claim_job("j1") is False
+
+
+def test_startup_requeues_expired_leases_only(jobs, monkeypatch):
+    monkeypatch.setattr(ingestion_jobs.settings, "ingest_job_lease_seconds", 60)
+    jobs.rows.update({
+        "queued": {"id": "queued", "source_id": "s1", "status": "queued", "created_at": "1", "updated_at": _ago(1)},
+        "orphan": {"id": "orphan", "source_id": "s2", "status": "running", "created_at": "2", "updated_at": _ago(600)},
+        "live": {"id": "live", "source_id": "s3", "status": "retrying", "created_at": "3", "updated_at": _ago(5)},
+        "done": {"id": "done", "source_id": "s4", "status": "succeeded", "created_at": "4", "updated_at": _ago(600)},
+    })
+    ran = []
+    monkeypatch.setattr(ingestion_jobs, "run_ingestion_pipeline", lambda source_id, on_progress: ran.append(source_id))
+
+    assert ingestion_jobs.resume_queued_jobs() == 2
+    ingestion_jobs.shutdown(wait=True)
+
+    assert sorted(ran) == ["s1", "s2"]
+    assert jobs.rows["live"]["status"] == "retrying"
+
+
+def test_heartbeat_keeps_the_lease_during_a_long_window(jobs, monkeypatch):
+    monkeypatch.setattr(ingestion_jobs.settings, "ingest_job_lease_seconds", 0.06)
+
+    def one_slow_window(source_id, on_progress):
+        time.sleep(0.25)  # no progress callbacks in the meantime
+        return {}
+
+    monkeypatch.setattr(ingestion_jobs, "run_ingestion_pipeline", one_slow_window)
+    ingestion_jobs.submit_ingestion_job("s1")
+    ingestion_jobs.shutdown(wait=True)
+
+    heartbeats = [u for u in jobs.updates if set(u) == {"updated_at"}]
+    assert len(heartbeats) >= 3
+
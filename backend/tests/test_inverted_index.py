@@ -0,0 +1,44 @@
+from backend.agents.memory_hooks import DecisionLog
+from backend.services.inverted_index import InvertedIndex, tokenize
+
+
+def test_tokenize_splits_punctuation_and_stems():
+    assert tokenize("Pricing-tier blockers; the users' PRICE was blocked!") == [
+        "pric", "tier", "block", "user", "pric", "block",
+    ]
+
+
+def test_bm25_ranks_rare_terms_and_respects_coverage():
+    index = InvertedIndex()
+    index.add(1, "onboarding took weeks and onboarding docs were thin")
+    index.add(2, "pricing is confusing for small teams")
+    index.add(3, "onboarding was fine, pricing was fine")
+
+    assert [d for d, _ in index.search("onboarding pricing")][0] == 3
+    assert [d for d, _ in index.search("onboarding")] == [1, 3]
+    assert [d for d, _ in index.search("onboarding pricing", min_coverage=0.5)] == [3]
+    assert index.search("unrelated words") == []
+
+
+def test_incremental_add_remove_and_sync():
+    index = InvertedIndex()
+    index.sync({"a": ("churn after trial", "A"), "b": ("api limits", "B")})
+    assert [d for d, _ in index.search("churn")] == ["a"]
+
+    index.sync({"b": ("churn on api limits", "B2"), "c": ("trial churn", "C")})
+    assert "a" not in index and len(index) == 2
+    assert sorted(d for d, _ in index.search("churn")) == ["b", "c"]
+    assert index.payload("b") == "B2"
+
+    assert index.remove("c") and not index.remove("c")
+    assert [d for d, _ in index.search("trial")] == []
+    assert [d for d, _ in index.search("churn", where=lambda p: p == "B2")] == ["b"]
+
+
+def test_decision_log_search_uses_index():
+    log = DecisionLog()
+    log.add({"type": "decision", "title": "Prioritise onboarding", "content": "over retention"})
+    log.add({"type": "constraint", "title": "Offline mode", "content": "must work offline"})
+
+    assert [i["title"] for i in log.search("onboarding priorities")] == ["Prioritise onboarding"]
+    assert log.search("billing") == []
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.services import cache_l2, cache_manager, memory, rag
+
+
+@pytest.fixture(autouse=True)
+def _no_semantic_cache(monkeypatch):
+    monkeypatch.setattr(rag.settings, "rag_semantic_cache_threshold", 0.0)
+
+
+class _FakeResponse:
+    content = "Users churn at onboarding [chunk_id: 11111111-2222-3333-4444-555555555555]"
+    usage_metadata = {"input_tokens": 10, "output_tokens": 5}
+
+
+class _FakeLLM:
+    async def ainvoke(self, messages):
+        self.messages = messages
+        return _FakeResponse()
+
+
+def test_async_rag_overlaps_retrieval_and_defers_memory_write(monkeypatch):
+    written = threading.Event()
+    llm = _FakeLLM()
+
+    def slow_recall(query, project_id, user_id):
+        time.sleep(0.2)
+        return "Relevant PM knowledge from past sessions:\n- prior note\n\n"
+
+    def slow_search(**kwargs):
+        time.sleep(0.2)
+        return [{
+            "chunk_id": "11111111-2222-3333-4444-555555555555",
+            "source_id": "s1",
+            "similarity": 0.9,
+            "content": "onboarding is confusing",
+        }]
+
+    def slow_add(messages, project_id, user_id):
+        time.sleep(0.3)
+        written.set()
+        return []
+
+    monkeypatch.setattr(rag, "_recall_memories", slow_recall)
+    monkeypatch.setattr(rag, "semantic_search", slow_search)
+    monkeypatch.setattr(rag, "get_strong_llm", lambda: llm)
+    monkeypatch.setattr(memory, "add_memories", slow_add)
+
+    started = time.perf_counter()
+    result = asyncio.run(rag.run_rag_pipeline_async("p1", "why churn?", user_id="u1"))
+    elapsed = time.perf_counter() - started
+
+    assert result["cited_chunk_ids"] == ["11111111-2222-3333-4444-555555555555"]
+    assert "prior note" in llm.messages[-1].content
+    # Recall and search overlap; the memory write is not on the response path
+    assert elapsed < 0.35
+    assert not written.is_set()
+    memory.shutdown_memory_writer(wait=True)
+    assert written.is_set()
+
+
+class _StreamingLLM:
+    def __init__(self, pieces):
+        self.pieces = pieces
+
+    async def astream(self, messages):
+        from langchain_core.messages import AIMessageChunk
+        for i, text in enumerate(self.pieces):
+            usage = {"input_tokens": 7, "output_tokens": 3, "total_tokens": 10} if i == len(self.pieces) - 1 else None
+            yield AIMessageChunk(content=text, usage_metadata=usage)
+
+
+def test_stream_rag_emits_retrieval_first_and_citations_as_they_complete(monkeypatch):
+    chunk_id = "11111111-2222-3333-4444-555555555555"
+    pieces = ["Onboarding hurts [chunk_", "id: 11111111-2222-", "3333-4444-5555555555", "55] and again [chunk_id: ", chunk_id, "]"]
+    monkeypatch.setattr(rag, "_recall_memories", lambda *args: "")
+    monkeypatch.setattr(rag, "semantic_search", lambda **kwargs: [
+        {"chunk_id": chunk_id, "source_id": "s1", "similarity": 0.8, "content": "onboarding"}
+    ])
+    monkeypatch.setattr(rag, "get_strong_llm", lambda: _StreamingLLM(pieces))
+
+    async def collect():
+        return [event async for event in rag.stream_rag_pipeline("p1", "why churn?")]
+
+    events = asyncio.run(collect())
+    names = [name for name, _ in events]
+
+    assert names[0] == "retrieved" and names[-1] == "done"
+    assert names.count("citation") == 1
+    assert names.index("citation") == 5  # right after the token completing the UUID
+    done = events[-1][1]
+    assert done["answer"] == "".join(pieces)
+    assert done["cited_chunk_ids"] == [chunk_id]
+    assert done["usage"] == {"input_tokens": 7, "output_tokens": 3}
+
+
+def test_semantic_cache_serves_similar_queries_until_corpus_changes(monkeypatch):
+    vectors = {"top onboarding pain points?": [1.0, 0.0, 0.1], "top onboarding pains?": [0.99, 0.0, 0.12],
+               "pricing feedback?": [0.0, 1.0, 0.0]}
+    llm_calls = []
+
+    class _CountingLLM:
+        def invoke(self, messages):
+            llm_calls.append(messages)
+            return _FakeResponse()
+
+    monkeypatch.setattr(rag.settings, "rag_semantic_cache_threshold", 0.95)
+    monkeypatch.setattr(cache_manager, "_get_db", lambda: None)
+    monkeypatch.setattr(cache_manager, "_l2_backend", cache_l2.NullL2())
+    monkeypatch.setattr(rag, "create_embedding", lambda text: vectors[text])
+    monkeypatch.setattr(rag, "get_strong_llm", lambda: _CountingLLM())
+    monkeypatch.setattr(rag, "semantic_search", lambda **kwargs: [
+        {"chunk_id": "c1", "source_id": "s1", "similarity": 0.9, "content": "onboarding"}
+    ])
+    cache_manager.reset_stats()
+
+    first = rag.run_rag_pipeline("proj-sem", "top onboarding pain points?")
+    second = rag.run_rag_pipeline("proj-sem", "top onboarding pains?")
+    other = rag.run_rag_pipeline("proj-sem", "pricing feedback?")
+
+    assert not first["cached"] and second["cached"] and not other["cached"]
+    assert second["answer"] == first["answer"] and second["usage"]["input_tokens"] == 0
+    assert len(llm_calls) == 2
+    semantic = cache_manager.get_stats()["semantic"]
+    assert semantic["hits"] == 1 and semantic["tokens_saved"] == 15
+
+    cache_manager.bump_corpus_version("proj-sem")
+    assert not rag.run_rag_pipeline("proj-sem", "top onboarding pains?")["cached"]
+    assert len(llm_calls) == 3
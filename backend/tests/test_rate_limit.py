@@ -0,0 +1,23 @@
+import pytest
+
+from backend.services.rate_limit import TokenBucket
+
+
+def test_token_bucket_refills_at_its_rate(monkeypatch):
+    clock = [100.0]
+    slept = []
+    monkeypatch.setattr("backend.services.rate_limit.time.monotonic", lambda: clock[0])
+
+    def fake_sleep(seconds):
+        slept.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr("backend.services.rate_limit.time.sleep", fake_sleep)
+    bucket = TokenBucket(per_minute=600)  # 10 tokens / s, burst 600
+
+    assert bucket.acquire(600) == 0.0
+    assert bucket.acquire(50) == pytest.approx(5.0)
+    clock[0] += 2.0
+    assert bucket.acquire(20) == 0.0
+    assert bucket.acquire(10_000) == pytest.approx(60.0)  # clamped to capacity
+    assert TokenBucket(per_minute=0).acquire(10**9) == 0.0
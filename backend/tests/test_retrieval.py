@@ -0,0 +1,99 @@
+import pytest
+
+from backend.services import context_pack, hybrid_search, retrieval
+
+
+class _ListRetriever:
+    def __init__(self, name, rows):
+        self.name = name
+        self.rows = rows
+
+    def retrieve(self, query, k):
+        return self.rows[:k]
+
+
+class _FailingRetriever:
+    name = "broken"
+
+    def retrieve(self, query, k):
+        raise RuntimeError("db down")
+
+
+def _row(id_, source, content=None):
+    return {"id": id_, "source_id": source, "content": content or f"text {id_}"}
+
+
+def test_rrf_fuses_lists_and_reports_timings_and_errors():
+    a = _ListRetriever("a", [_row("x", "s1"), _row("y", "s2"), _row("z", "s3")])
+    b = _ListRetriever("b", [_row("y", "s2"), _row("w", "s4")])
+
+    result = retrieval.retrieve("q", [a, b, _FailingRetriever()], k=3)
+
+    assert [c["id"] for c in result["candidates"]] == ["y", "x", "w"]
+    assert result["candidates"][0]["ranks"] == {"a": 2, "b": 1}
+    assert result["errors"] == {"broken": "db down"}
+    assert {"a", "b", "broken", "fusion", "selection"} <= set(result["timings_ms"])
+
+
+def test_per_source_cap_and_mmr_diversity():
+    rows = [
+        _row("1", "s1", "onboarding is slow and confusing"),
+        _row("2", "s1", "onboarding is slow and confusing today"),
+        _row("3", "s2", "onboarding is slow and confusing again"),
+        _row("4", "s3", "pricing tiers are unclear"),
+    ]
+    capped = retrieval.retrieve("q", [_ListRetriever("a", rows)], k=3, max_per_source=1)
+    assert [c["id"] for c in capped["candidates"]] == ["1", "3", "4"]
+
+    diverse = retrieval.retrieve("q", [_ListRetriever("a", rows)], k=2, mmr_lambda=0.3)
+    assert [c["id"] for c in diverse["candidates"]] == ["1", "4"]
+
+
+def test_reranker_reorders_fused_head():
+    class _ByLength:
+        def score(self, query, contents):
+            return [float(len(c)) for c in contents]
+
+    rows = [_row("short", "s1", "a"), _row("long", "s2", "a much longer passage")]
+    result = retrieval.retrieve("q", [_ListRetriever("a", rows)], k=2, reranker=_ByLength())
+
+    assert [c["id"] for c in result["candidates"]] == ["long", "short"]
+    assert "rerank" in result["timings_ms"]
+
+
+def test_keyword_overlap_retriever_thresholds_and_ranks():
+    docs = [("a.txt", "users hate slow onboarding"), ("b.txt", "pricing"), ("a.txt", "onboarding")]
+    hits = retrieval.KeywordOverlapRetriever(docs, min_score=0.3).retrieve("slow onboarding", k=5)
+    assert [(h["source_id"], h["score"]) for h in hits] == [("a.txt", 1.0), ("a.txt", 0.5)]
+
+
+def test_context_pack_raises_when_evidence_search_fails(monkeypatch):
+    class _DB:
+        def table(self, name):
+            return self
+
+        def __getattr__(self, name):
+            return lambda *args, **kwargs: self
+
+        def execute(self):
+            return type("R", (), {"data": []})
+
+    def _broken(*args, **kwargs):
+        raise RuntimeError("rpc hybrid_search_chunks failed")
+
+    monkeypatch.setattr(context_pack, "get_supabase", lambda: _DB())
+    monkeypatch.setattr(context_pack, "hybrid_search_memory_items", lambda **kwargs: [])
+    monkeypatch.setattr(hybrid_search, "hybrid_search_chunks", _broken)
+
+    with pytest.raises(RuntimeError, match="hybrid_search_chunks failed"):
+        context_pack.get_context_pack("p", "prd", "exports")
+
+    monkeypatch.setattr(hybrid_search, "hybrid_search_chunks", lambda *args, **kwargs: [
+        {"chunk_id": "c1", "source_id": "s1", "content": "exports", "combined_score": 0.9,
+         "semantic_score": 0.8, "keyword_score": 0.1},
+    ])
+    pack = context_pack.get_context_pack("p", "prd", "exports")
+    assert pack["evidence_chunks"] == [{
+        "chunk_id": "c1", "source_id": "s1", "content": "exports", "combined_score": 0.9,
+        "semantic_score": 0.8, "keyword_score": 0.1,
+    }]
@@ -0,0 +1,167 @@
+import json
+
+import pytest
+
+from backend.services import scoring
+from backend.services.signal_correlation import (
+    _compute_chunk_overlap,
+    _compute_segment_distribution,
+    _segment_divergences,
+)
+from backend.services.trend_detection import _compute_theme_metrics
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(scoring, "np", None)
+    elif scoring.np is None:
+        pytest.skip("numpy not installed")
+    return request.param
+
+
+def test_embedding_matrix_cosine_and_top_k(backend):
+    matrix = scoring.EmbeddingMatrix([[1.0, 0.0], [0.0, 2.0], [1.0, 1.0]])
+
+    assert [round(s, 3) for s in scoring._to_list(matrix.cosine([2.0, 0.0]))] == [1.0, 0.0, 0.707]
+    assert [row for row, _ in matrix.top_k([1.0, 0.1], k=2)] == [0, 2]
+    assert round(float(matrix.cosine_matrix()[1][2]), 3) == 0.707
+
+
+def test_set_matrix_matches_set_arithmetic(backend):
+    sets = [{"a", "b", "c"}, {"b", "c", "d"}, {"x"}, set()]
+    matrix = scoring.SetMatrix(sets)
+
+    assert scoring._to_list(matrix.overlap({"a", "b", "z", "q"})) == [0.5, 0.25, 0.0, 0.0]
+    assert float(matrix.jaccard()[0][1]) == 0.5 and float(matrix.jaccard()[3][3]) == 0.0
+    assert matrix.pairs() == [(0, 1, 2, 0.5)]
+
+
+def test_callers_keep_their_results(backend):
+    themes = [
+        {"title": "Onboarding", "chunk_ids": ["c1", "c2", "c3"]},
+        {"title": "Docs", "chunk_ids": ["c2", "c3", "c4"]},
+        {"title": "Pricing", "chunk_ids": ["c9"]},
+    ]
+    overlaps = _compute_chunk_overlap(themes)
+    assert [(o["source_title"], o["target_title"], o["shared_chunk_count"], o["strength"]) for o in overlaps] == [
+        ("Onboarding", "Docs", 2, 0.5)
+    ]
+
+    chunks = [{"id": "c1", "source_id": "s1"}, {"id": "c2", "source_id": "s2"}, {"id": "c4", "source_id": "s2"}]
+    sources = [{"id": "s1", "segment_tags": ["smb"]}, {"id": "s2", "segment_tags": ["smb", "ent"]}]
+    assert _compute_theme_metrics(themes, chunks, sources) == [
+        {"mention_count": 3, "source_count": 2, "segment_spread": 2},
+        {"mention_count": 3, "source_count": 1, "segment_spread": 2},
+        {"mention_count": 1, "source_count": 0, "segment_spread": 0},
+    ]
+
+
+def test_associations_and_segment_statistics(backend):
+    matrix = scoring.SetMatrix([{"a", "b", "c"}, {"a", "b", "d"}, {"e"}])
+    (i, j, shared, jaccard, lift, pmi, z), = matrix.associations(universe=20)
+    assert (i, j, shared, jaccard) == (0, 1, 2, 0.5)
+    assert round(lift, 3) == 4.444 and round(pmi, 3) == 2.152 and round(z, 3) == 2.311
+    counts, segments = matrix.mapped_counts({"a": ["smb"], "b": ["smb", "ent"], "e": ["ent"]})
+    assert segments == ["smb", "ent"]
+    assert [scoring._to_list(row) for row in scoring._to_list(counts)] == [[2, 1], [2, 1], [0, 1]]
+
+    # Two themes sharing 3 of 40 chunks are significant; a one-chunk overlap is not
+    themes = [
+        {"title": "Exports", "chunk_ids": ["c0", "c1", "c2", "c3"]},
+        {"title": "Reports", "chunk_ids": ["c1", "c2", "c3", "c4"]},
+        {"title": "Pricing", "chunk_ids": ["c4", "c5"]},
+    ]
+    overlaps = {(o["source_title"], o["target_title"]): o for o in _compute_chunk_overlap(themes, 40)}
+    assert overlaps[("Exports", "Reports")]["significant"]
+    assert not overlaps[("Reports", "Pricing")]["significant"]
+
+    # Exports is 4/5 of enterprise chunks but 0/35 of SMB chunks
+    chunks = [{"id": f"c{i}", "source_id": "ent" if i < 5 else "smb"} for i in range(40)]
+    sources = [{"id": "ent", "segment_tags": ["enterprise"]}, {"id": "smb", "segment_tags": ["smb"]}]
+    assert _compute_segment_distribution(themes, chunks, sources)["Pricing"] == {"enterprise": 1, "smb": 1}
+    divergences = _segment_divergences(themes, chunks, sources)
+    assert [(d["theme_title"], d["segment_a"], d["segment_b"]) for d in divergences][0] == (
+        "Exports", "enterprise", "smb"
+    )
+    assert "Pricing" not in {d["theme_title"] for d in divergences}
+
+
+class _Table:
+    """select / eq / in_ / limit / insert over a list of rows, with count="exact"."""
+
+    def __init__(self, rows):
+        self.rows, self.filters, self.inserted = rows, [], None
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def eq(self, col, value):
+        self.filters.append(lambda r: r.get(col) == value)
+        return self
+
+    def in_(self, col, values):
+        self.filters.append(lambda r: r.get(col) in set(values))
+        return self
+
+    def limit(self, n):
+        return self
+
+    def insert(self, rows):
+        self.rows.extend(rows)
+        self.inserted = rows
+        return self
+
+    def execute(self):
+        data = self.inserted or [r for r in self.rows if all(f(r) for f in self.filters)]
+        return type("R", (), {"data": data, "count": len(data)})
+
+
+def test_detect_theme_relationships_screens_against_the_project_pool(monkeypatch):
+    from langchain_core.messages import AIMessage
+
+    from backend.services import signal_correlation
+
+    # 200 chunks: c0–c19 enterprise, the rest SMB
+    chunks = [{"id": f"c{i}", "source_id": "ent" if i < 20 else "smb"} for i in range(200)]
+    themes = [
+        {"id": "t1", "title": "SSO", "chunk_ids": ["c0", "c1", "c2", "c3", "c4", "c5"]},
+        {"id": "t2", "title": "Audit logs", "chunk_ids": ["c3", "c4", "c5", "c6", "c7", "c8"]},
+        {"id": "t3", "title": "Pricing", "chunk_ids": ["c50", "c90", "c130", "c170"]},
+        {"id": "t4", "title": "Mobile", "chunk_ids": ["c170", "c60", "c100", "c140"]},
+    ]
+    tables = {
+        "themes": [{**t, "synthesis_id": "syn"} for t in themes],
+        "chunks": chunks,
+        "sources": [
+            {"id": "ent", "project_id": "p", "segment_tags": ["enterprise"]},
+            {"id": "smb", "project_id": "p", "segment_tags": ["smb"]},
+        ],
+        "theme_relationships": [],
+        "signal_correlations": [],
+    }
+    prompts = []
+
+    class _LLM:
+        def invoke(self, messages):
+            prompts.append(json.loads(messages[1].content.split("\n\n", 1)[1]))
+            return AIMessage(content=json.dumps({"relationships": [{
+                "source_title": "SSO", "target_title": "Audit logs",
+                "relationship": "amplifies", "strength": 0.8,
+            }]}))
+
+    db = type("DB", (), {"table": lambda self, name: _Table(tables[name])})()
+    monkeypatch.setattr(signal_correlation, "get_supabase", lambda: db)
+    monkeypatch.setattr(signal_correlation, "get_strong_llm", lambda: _LLM())
+
+    result = signal_correlation.detect_theme_relationships("p", "syn")
+
+    (prompt,) = prompts
+    assert [(p["source_title"], p["target_title"]) for p in prompt["candidate_pairs"]] == [("SSO", "Audit logs")]
+    assert prompt["candidate_pairs"][0]["z_score"] > 5  # 3 shared where 0.18 are expected
+    # SSO and Audit logs sit in the enterprise segment; Pricing / Mobile match its base rate
+    assert {d["theme_title"] for d in prompt["candidate_divergences"]} == {"SSO", "Audit logs"}
+    assert {t["title"] for t in prompt["themes"]} == {"SSO", "Audit logs"}
+    assert [r["relationship"] for r in result["relationships"] if r["evidence"]["detected_by"] == "llm"] == [
+        "amplifies"
+    ]
@@ -0,0 +1,194 @@
+import json
+import threading
+import time
+
+import pytest
+
+from backend.services import synthesis
+
+
+class _FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+class _SlowLLM:
+    """Answers after a delay that shrinks with batch number; batch 2 fails once.
+
+    Records the peak number of calls in flight at once.
+    """
+
+    def __init__(self):
+        self.calls: list[int] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, messages):
+        batch = int(messages[1].content.split("batch ")[1].split("/")[0])
+        with self._lock:
+            self.calls.append(batch)
+            first_try = self.calls.count(batch) == 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        time.sleep(0.2 - 0.04 * batch)
+        with self._lock:
+            self.in_flight -= 1
+        if batch == 2 and first_try:
+            return _FakeResponse("not json")
+        return _FakeResponse(json.dumps({"themes": [{"title": f"theme {batch}"}]}))
+
+
+def test_batches_run_concurrently_in_order_with_retry(monkeypatch):
+    monkeypatch.setattr(synthesis.settings, "synthesis_max_concurrency", 4)
+    monkeypatch.setattr(synthesis.settings, "synthesis_batch_backoff_seconds", 0)
+    llm = _SlowLLM()
+    batches = [[{"id": str(i)}] for i in range(4)]
+
+    themes = synthesis._extract_batch_themes(
+        llm, batches, lambda i, batch: f"batch {i + 1}/{len(batches)}"
+    )
+
+    assert [t["title"] for t in themes] == ["theme 1", "theme 2", "theme 3", "theme 4"]
+    assert sorted(llm.calls) == [1, 2, 2, 3, 4]
+    assert llm.peak_in_flight > 1
+
+
+def test_batch_that_keeps_failing_raises(monkeypatch):
+    monkeypatch.setattr(synthesis.settings, "synthesis_batch_max_attempts", 2)
+    monkeypatch.setattr(synthesis.settings, "synthesis_batch_backoff_seconds", 0)
+
+    class _Broken:
+        def invoke(self, messages):
+            raise RuntimeError("provider down")
+
+    with pytest.raises(RuntimeError, match="2/2 batches"):
+        synthesis._extract_batch_themes(_Broken(), [[{}], [{}]], lambda i, b: f"batch {i + 1}/2")
+
+
+class _MergingLLM:
+    """Consolidation stand-in: dedupes themes by title, records prompt sizes."""
+
+    def __init__(self):
+        self.prompt_sizes: list[int] = []
+        self._lock = threading.Lock()
+
+    def invoke(self, messages):
+        themes = json.loads(messages[1].content.split("Themes:\n", 1)[1])
+        with self._lock:
+            self.prompt_sizes.append(len(themes))
+        merged: dict[str, dict] = {}
+        for t in themes:
+            merged.setdefault(t["title"], {"title": t["title"], "chunk_ids": []})
+            merged[t["title"]]["chunk_ids"] += t["chunk_ids"]
+        return _FakeResponse(json.dumps({"themes": list(merged.values())}))
+
+
+def test_consolidation_reduces_as_a_tree(monkeypatch):
+    from backend.services import embeddings
+
+    titles = ["pricing", "onboarding", "api limits", "docs", "support"]
+    axis = {title: [float(i == j) for j in range(len(titles))] for i, title in enumerate(titles)}
+    monkeypatch.setattr(
+        embeddings, "create_embeddings_batch",
+        lambda texts: [axis[text.split(":")[0]] for text in texts],
+    )
+    monkeypatch.setattr(synthesis.settings, "synthesis_reduce_group_size", 4)
+    themes = [{"title": titles[i % 5], "chunk_ids": [f"c{i}"]} for i in range(40)]
+    llm = _MergingLLM()
+
+    result = synthesis._consolidate_themes(llm, themes, batch_count=10)
+
+    assert sorted(t["title"] for t in result) == sorted(titles)
+    assert sorted(c for t in result for c in t["chunk_ids"]) == sorted(f"c{i}" for i in range(40))
+    assert max(llm.prompt_sizes) <= 4 and len(llm.prompt_sizes) > 1
+
+
+class _SourceThemeLLM(_MergingLLM):
+    """Extraction: one theme per batch named after its source; consolidation: merge by title."""
+
+    def __init__(self):
+        super().__init__()
+        self.extracted: list[str] = []
+
+    def invoke(self, messages):
+        if messages[0].content != synthesis._THEME_SYSTEM_PROMPT:
+            return super().invoke(messages)
+        block = messages[1].content
+        source = block.split("source_id: ")[1].split("\n")[0]
+        chunk_ids = [line.split(": ")[1] for line in block.splitlines() if line.startswith("chunk_id: ")]
+        with self._lock:
+            self.extracted.append(source)
+        return _FakeResponse(json.dumps({"themes": [{"title": source, "chunk_ids": chunk_ids}]}))
+
+
+def test_incremental_extraction_reuses_unchanged_sources(monkeypatch):
+    store: dict[str, str] = {}
+    monkeypatch.setattr(
+        synthesis.cache_manager, "get_llm_responses_many",
+        lambda keys: {k: store[k] for k in keys if k in store},
+    )
+    monkeypatch.setattr(synthesis.cache_manager, "store_llm_response", store.__setitem__)
+
+    def _chunks(*sources):
+        return [
+            {"id": f"{s}-{i}", "source_id": s, "chunk_index": i, "content": f"{s} says {i}"}
+            for s in sources for i in range(2)
+        ]
+
+    def _run(llm, chunks, previous):
+        batches = synthesis._batch_chunks_by_source(chunks)
+        return synthesis._extract_themes_incremental(
+            llm, batches, lambda i, b: synthesis._build_chunk_block(b), previous
+        )
+
+    first_llm = _SourceThemeLLM()
+    first = _run(first_llm, _chunks("s1", "s2"), [])
+    assert sorted(first_llm.extracted) == ["s1", "s2"]
+
+    # A week later: s2 removed, s3 added; only s3 reaches the model
+    llm = _SourceThemeLLM()
+    second = _run(llm, _chunks("s3", "s1"), first)
+    assert llm.extracted == ["s3"]
+    assert sorted(t["title"] for t in second) == ["s1", "s3"]
+    assert {c for t in second for c in t["chunk_ids"]} == {"s1-0", "s1-1", "s3-0", "s3-1"}
+
+    # Editing a chunk's content changes its batch key
+    edited = _chunks("s1", "s3")
+    edited[0]["content"] = "s1 changed its mind"
+    llm = _SourceThemeLLM()
+    _run(llm, edited, second)
+    assert llm.extracted == ["s1"]
+
+
+def test_incremental_folds_in_cached_batches_the_previous_run_did_not_cover(monkeypatch):
+    store: dict[str, str] = {}
+    monkeypatch.setattr(
+        synthesis.cache_manager, "get_llm_responses_many",
+        lambda keys: {k: store[k] for k in keys if k in store},
+    )
+    monkeypatch.setattr(synthesis.cache_manager, "store_llm_response", store.__setitem__)
+    chunks = [
+        {"id": f"{s}-{i}", "source_id": s, "chunk_index": i, "content": f"{s} says {i}"}
+        for s in ("s1", "s2") for i in range(2)
+    ]
+    batches = synthesis._batch_chunks_by_source(chunks)
+
+    def _run(llm, previous, context=""):
+        return synthesis._extract_themes_incremental(
+            llm, batches, lambda i, b: context + synthesis._build_chunk_block(b), previous, context
+        )
+
+    _run(_SourceThemeLLM(), [])  # caches both sources' batches
+    # The previous synthesis was filtered to s1, so nothing cites s2
+    previous = [{"title": "s1", "chunk_ids": ["s1-0", "s1-1"]}]
+
+    llm = _SourceThemeLLM()
+    themes = _run(llm, previous)
+    assert llm.extracted == []
+    assert sorted(t["title"] for t in themes) == ["s1", "s2"]
+
+    # A drill-down note changes the prompt, so the cached answers do not apply
+    llm = _SourceThemeLLM()
+    _run(llm, themes, context="Already-identified themes: s1, s2\n")
+    assert sorted(llm.extracted) == ["s1", "s2"]
@@ -0,0 +1,120 @@
+import random
+import threading
+import time
+
+from backend.agents import local_index
+from backend.services import embeddings, vector_index
+from backend.services.bounded_cache import BoundedCache
+
+
+def _random_vectors(n: int, dim: int, seed: int = 1) -> list[list[float]]:
+    rng = random.Random(seed)
+    return [[rng.gauss(0, 1) for _ in range(dim)] for _ in range(n)]
+
+
+def test_hnsw_recall_matches_brute_force():
+    vectors = _random_vectors(600, 16)
+    exact, approx = vector_index.BruteForceIndex(16), vector_index.HNSWIndex(16, m=8)
+    for v in vectors:
+        exact.add(v)
+        approx.add(v)
+
+    hits = total = 0
+    for query in _random_vectors(20, 16, seed=2):
+        truth = {row for row, _ in exact.search(query, k=10)}
+        hits += len(truth & {row for row, _ in approx.search(query, k=10)})
+        total += len(truth)
+    assert hits / total >= 0.9
+
+
+def test_save_and_load_round_trip(tmp_path):
+    vectors = _random_vectors(50, 8)
+    for index in (vector_index.BruteForceIndex(8), vector_index.HNSWIndex(8, m=4)):
+        for v in vectors:
+            index.add(v)
+        directory = str(tmp_path / index.kind)
+        vector_index.save_vector_index(index, directory, extra={"note": "x"})
+
+        loaded, meta = vector_index.load_vector_index(directory)
+        assert loaded.kind == index.kind and meta["note"] == "x"
+        assert loaded.search(vectors[7], k=3) == index.search(vectors[7], k=3)
+        assert loaded.search(vectors[7], k=1)[0][0] == 7
+
+
+def test_local_index_reuses_persisted_vectors(monkeypatch, tmp_path):
+    calls: list[list[str]] = []
+
+    def fake_batch(texts):
+        calls.append(list(texts))
+        return [[float("pricing" in t), float("onboarding" in t), 1.0] for t in texts]
+
+    monkeypatch.setattr(embeddings, "create_embeddings_batch", fake_batch)
+    monkeypatch.setattr(embeddings, "create_embedding", lambda q: fake_batch([q])[0])
+    monkeypatch.setattr(local_index, "_SESSIONS", BoundedCache())
+    docs = [{
+        "filename": "acme.txt",
+        "file_path": str(tmp_path / "acme.txt"),
+        "chunks": ["pricing is too high", "onboarding took weeks"],
+    }]
+
+    index = local_index.get_local_index(docs)
+    assert [h["content"] for h in index.search("pricing", k=1)] == ["pricing is too high"]
+    assert (tmp_path / ".beacon_index" / "index.json").exists()
+
+    # New process: only the added chunk is embedded, the rest come from disk
+    monkeypatch.setattr(local_index, "_SESSIONS", BoundedCache())
+    calls.clear()
+    docs[0]["chunks"].append("support is slow")
+    assert len(local_index.get_local_index(docs)) == 3
+    assert calls == [["support is slow"]]
+
+
+def test_local_index_builds_once_per_files_without_blocking_others(monkeypatch):
+    release = threading.Event()
+    built: list[str] = []
+
+    def slow_build(entries, fingerprint, directory):
+        if entries[0]["source"] == "slow.txt":
+            release.wait(2)
+        built.append(entries[0]["source"])
+        return local_index.LocalChunkIndex(None, entries)
+
+    monkeypatch.setattr(local_index, "_build", slow_build)
+    monkeypatch.setattr(local_index, "_SESSIONS", BoundedCache(max_entries=1))
+    slow = [{"filename": "slow.txt", "chunks": ["pricing"]}]
+    fast = [{"filename": "fast.txt", "chunks": ["onboarding"]}]
+
+    waiters = [threading.Thread(target=local_index.get_local_index, args=(slow,)) for _ in range(2)]
+    for t in waiters:
+        t.start()
+    time.sleep(0.05)
+    assert len(local_index.get_local_index(fast)) == 1  # not stuck behind the slow build
+    release.set()
+    for t in waiters:
+        t.join()
+
+    assert built == ["fast.txt", "slow.txt"]
+    assert len(local_index._SESSIONS) == 1  # LRU-bounded
+
+
+def test_retrieve_evidence_searches_interview_files_even_with_a_project(monkeypatch):
+    from backend.agents import react_loop
+    from backend.services import hybrid_search
+
+    def no_db(*args, **kwargs):
+        raise AssertionError("interview sessions must not query the database")
+
+    monkeypatch.setattr(hybrid_search, "hybrid_search_chunks", no_db)
+    monkeypatch.setattr(local_index.settings, "local_index_enabled", False)  # BM25 path
+    state = {
+        "project_id": "generated-session-project",
+        "interview_data": [
+            {"filename": "acme.txt", "chunks": ["pricing is too expensive for small teams", "onboarding was fine"]},
+        ],
+    }
+
+    found = react_loop._tool_retrieve_evidence(state, {"claim": "pricing too expensive"})
+    assert found.startswith("[acme.txt]") and "small teams" in found
+    assert react_loop._tool_retrieve_evidence(state, {"claim": "pricing", "source": "globex"}).startswith(
+        "No evidence found"
+    )
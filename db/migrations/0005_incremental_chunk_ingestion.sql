@@ -0,0 +1,23 @@
+-- Incremental re-ingestion: content-addressed chunks
+-- Unchanged chunks keep their rows (and embeddings) across re-ingestion;
+-- only new or modified chunks are embedded and inserted.
+
+alter table public.chunks
+  add column if not exists content_hash text;
+
+create index if not exists chunks_source_content_hash_idx
+  on public.chunks(source_id, content_hash);
+
+-- Bulk-move kept chunks to their new positions in one round trip
+create or replace function public.reindex_chunks(
+  chunk_ids uuid[],
+  chunk_indexes integer[]
+)
+returns void
+language sql
+as $$
+  update public.chunks c
+  set chunk_index = u.chunk_index
+  from unnest(chunk_ids, chunk_indexes) as u(id, chunk_index)
+  where c.id = u.id;
+$$;
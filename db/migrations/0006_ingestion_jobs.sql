@@ -0,0 +1,27 @@
+-- Background ingestion jobs
+-- One row per POST /api/sources/jobs submission; workers update status and
+-- per-stage progress so any API process can answer polling requests.
+
+CREATE TABLE IF NOT EXISTS public.ingestion_jobs (
+    id          uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    source_id   uuid NOT NULL REFERENCES public.sources(id) ON DELETE CASCADE,
+    status      text NOT NULL DEFAULT 'queued'
+                CHECK (status IN ('queued','running','retrying','succeeded','failed')),
+    attempts    int NOT NULL DEFAULT 0,
+    progress    jsonb NOT NULL DEFAULT '{}',   -- {stage, chunks_processed, chunks_embedded, rows_written}
+    result      jsonb,                         -- run_ingestion_pipeline summary on success
+    error       text,
+    created_at  timestamptz NOT NULL DEFAULT now(),
+    updated_at  timestamptz NOT NULL DEFAULT now(),
+    started_at  timestamptz,
+    finished_at timestamptz
+);
+
+CREATE INDEX IF NOT EXISTS ingestion_jobs_status_idx ON public.ingestion_jobs(status, created_at);
+CREATE INDEX IF NOT EXISTS ingestion_jobs_source_idx ON public.ingestion_jobs(source_id);
+
+DROP TRIGGER IF EXISTS trg_ingestion_jobs_set_updated_at ON public.ingestion_jobs;
+CREATE TRIGGER trg_ingestion_jobs_set_updated_at
+BEFORE UPDATE ON public.ingestion_jobs
+FOR EACH ROW
+EXECUTE FUNCTION public.set_updated_at();
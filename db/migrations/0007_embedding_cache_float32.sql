@@ -0,0 +1,25 @@
+-- Agent cache tables (previously created by hand from cache_manager.py)
+-- plus compact float32 storage for cached embeddings.
+--
+-- vector_f32 holds the embedding as little-endian float32 bytes (4 bytes per
+-- dimension) instead of JSONB text (~20 bytes per dimension). Rows written
+-- before this migration keep their JSONB `vector` until cache_manager reads
+-- them once and backfills vector_f32.
+
+CREATE TABLE IF NOT EXISTS public.agent_embedding_cache (
+    text_hash   text PRIMARY KEY,
+    vector      jsonb,
+    created_at  timestamptz DEFAULT now()
+);
+
+ALTER TABLE public.agent_embedding_cache
+    ADD COLUMN IF NOT EXISTS vector_f32 bytea;
+
+ALTER TABLE public.agent_embedding_cache
+    ALTER COLUMN vector DROP NOT NULL;
+
+CREATE TABLE IF NOT EXISTS public.agent_llm_cache (
+    prompt_hash text PRIMARY KEY,
+    response    text NOT NULL,
+    created_at  timestamptz DEFAULT now()
+);
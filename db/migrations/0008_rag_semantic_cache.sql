@@ -0,0 +1,22 @@
+-- Chunk-corpus versions for the semantic RAG answer cache
+-- Bumped after every re-ingestion or source deletion that changes a
+-- project's chunks; cached RAG answers are keyed by the version they were
+-- computed against, so bumping it invalidates them in every API process.
+
+CREATE TABLE IF NOT EXISTS public.project_corpus_versions (
+    project_id  uuid PRIMARY KEY REFERENCES public.projects(id) ON DELETE CASCADE,
+    version     bigint NOT NULL DEFAULT 0,
+    updated_at  timestamptz NOT NULL DEFAULT now()
+);
+
+-- Atomic increment (creates the row on first use); returns the new version
+CREATE OR REPLACE FUNCTION public.bump_corpus_version(p_project_id uuid)
+RETURNS bigint
+LANGUAGE sql
+AS $$
+  INSERT INTO public.project_corpus_versions AS v (project_id, version)
+  VALUES (p_project_id, 1)
+  ON CONFLICT (project_id)
+  DO UPDATE SET version = v.version + 1, updated_at = now()
+  RETURNING v.version;
+$$;
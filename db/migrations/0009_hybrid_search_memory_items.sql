@@ -0,0 +1,97 @@
+-- Hybrid retrieval over memory items in one round trip
+-- Replaces the client-side version in hybrid_search.py, which sorted by the
+-- raw embedding column (not by distance to the query) and ran an unindexed
+-- ilike scan. The vector branch now walks memory_items_embedding_idx (HNSW),
+-- the keyword branch uses a GIN-indexed tsvector, and both are fused with
+-- authority and recency into one score.
+
+alter table public.memory_items
+  add column if not exists content_tsv tsvector
+  generated always as (
+    to_tsvector('english', coalesce(title, '') || ' ' || coalesce(content, ''))
+  ) stored;
+
+create index if not exists memory_items_content_tsv_gin_idx
+  on public.memory_items using gin (content_tsv);
+
+create or replace function public.hybrid_search_memory_items(
+  input_project_id uuid,
+  query text,
+  query_embedding vector(1536),
+  match_count integer default 12
+)
+returns table (
+  id uuid,
+  type text,
+  title text,
+  content text,
+  tags text[],
+  authority int,
+  effective_from timestamptz,
+  effective_to timestamptz,
+  evidence_chunk_ids uuid[],
+  metadata jsonb,
+  semantic_score double precision,
+  keyword_score double precision,
+  combined_score double precision
+)
+language sql
+stable
+as $$
+  with semantic as (
+    -- ORDER BY distance LIMIT k is what lets the planner use the HNSW index;
+    -- over-fetch since project / validity filters are applied after the scan
+    select
+      m.id,
+      1 - (m.embedding <=> query_embedding) as semantic_score
+    from public.memory_items m
+    where m.project_id = input_project_id
+      and m.effective_to is null
+      and m.embedding is not null
+    order by m.embedding <=> query_embedding
+    limit greatest(match_count, 1) * 4
+  ),
+  keyword as (
+    select
+      m.id,
+      ts_rank_cd(m.content_tsv, websearch_to_tsquery('english', query)) as keyword_score
+    from public.memory_items m
+    where m.project_id = input_project_id
+      and m.effective_to is null
+      and m.content_tsv @@ websearch_to_tsquery('english', query)
+    order by keyword_score desc
+    limit greatest(match_count, 1) * 4
+  ),
+  candidates as (
+    select
+      coalesce(s.id, k.id) as id,
+      coalesce(s.semantic_score, 0) as semantic_score,
+      coalesce(k.keyword_score, 0) as keyword_score
+    from semantic s
+    full outer join keyword k on k.id = s.id
+  )
+  select
+    m.id,
+    m.type,
+    m.title,
+    m.content,
+    m.tags,
+    m.authority,
+    m.effective_from,
+    m.effective_to,
+    m.evidence_chunk_ids,
+    m.metadata,
+    c.semantic_score,
+    c.keyword_score,
+    (
+      0.55 * c.semantic_score
+      + 0.25 * least(c.keyword_score, 1)
+      + 0.12 * least(greatest(m.authority, 0), 10) / 10.0
+      -- recency: 1.0 today, halving every 90 days
+      + 0.08 * power(0.5, extract(epoch from (now() - m.effective_from)) / (90 * 86400.0))
+    )::double precision as combined_score
+  from candidates c
+  join public.memory_items m on m.id = c.id
+  order by combined_score desc, m.id
+  limit greatest(match_count, 1);
+$$;
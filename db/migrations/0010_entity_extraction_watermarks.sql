@@ -0,0 +1,12 @@
+-- Entity extraction watermarks
+-- One row per chunk that entity extraction has processed, with the content
+-- hash and extractor version (prompt + model) it was processed with. Reruns
+-- skip chunks whose watermark still matches, so refreshes only extract new or
+-- changed chunks. Rows go away with their chunk.
+
+CREATE TABLE IF NOT EXISTS public.entity_extraction_watermarks (
+    chunk_id          uuid PRIMARY KEY REFERENCES public.chunks(id) ON DELETE CASCADE,
+    content_hash      text NOT NULL,
+    extractor_version text NOT NULL,
+    processed_at      timestamptz NOT NULL DEFAULT now()
+);
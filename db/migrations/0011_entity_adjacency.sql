@@ -0,0 +1,20 @@
+-- Materialised entity co-occurrence graph
+-- One row per entity: the chunks and sources it is mentioned in and its
+-- top-k co-occurring entities (ENTITY_GRAPH_TOP_K), maintained incrementally
+-- by entity extraction. Connections / neighbour / graph queries read these
+-- rows instead of re-aggregating entity_mentions on every request.
+
+CREATE TABLE IF NOT EXISTS public.entity_adjacency (
+    entity_id     uuid PRIMARY KEY REFERENCES public.entities(id) ON DELETE CASCADE,
+    project_id    uuid NOT NULL REFERENCES public.projects(id) ON DELETE CASCADE,
+    chunk_count   int NOT NULL DEFAULT 0,
+    source_count  int NOT NULL DEFAULT 0,
+    chunk_ids     uuid[] NOT NULL DEFAULT '{}',
+    source_ids    uuid[] NOT NULL DEFAULT '{}',
+    -- [{entity_id, canonical_name, entity_type, shared_chunks, shared_sources, score}], best first
+    neighbors     jsonb NOT NULL DEFAULT '[]',
+    updated_at    timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS entity_adjacency_project_idx
+    ON public.entity_adjacency(project_id, chunk_count DESC);
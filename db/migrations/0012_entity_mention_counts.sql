@@ -0,0 +1,105 @@
+-- Concurrency-safe entity writes
+-- Entity extraction runs in several processes at once (ingestion jobs, API
+-- requests), each resolving names against its own cached copy of the
+-- project's entities. Two guarantees make that safe:
+--
+--   1. At most one entity per (project, type, case-insensitive name), so two
+--      workers that both miss "Notion" converge on one row.
+--   2. mention_count changes are applied as deltas in the database rather
+--      than written back as absolute values from a possibly stale cache.
+--
+-- apply_entity_mentions does both in one call per page of entities.
+
+-- Merge existing duplicates into the oldest row before adding the constraint
+WITH ranked AS (
+    SELECT id,
+           first_value(id) OVER w AS keep_id,
+           row_number() OVER w    AS rn
+    FROM public.entities
+    WINDOW w AS (PARTITION BY project_id, entity_type, lower(canonical_name)
+                 ORDER BY created_at, id)
+),
+dupes AS (
+    SELECT id, keep_id FROM ranked WHERE rn > 1
+),
+moved AS (
+    UPDATE public.entity_mentions m
+    SET entity_id = d.keep_id
+    FROM dupes d
+    WHERE m.entity_id = d.id
+    RETURNING m.entity_id
+),
+totals AS (
+    SELECT d.keep_id, sum(e.mention_count) AS extra, array_agg(DISTINCT a) AS extra_aliases
+    FROM dupes d
+    JOIN public.entities e ON e.id = d.id
+    LEFT JOIN LATERAL unnest(e.aliases || lower(e.canonical_name)) AS a ON true
+    GROUP BY d.keep_id
+),
+merged AS (
+    UPDATE public.entities e
+    SET mention_count = e.mention_count + t.extra,
+        aliases = ARRAY(SELECT DISTINCT unnest(e.aliases || t.extra_aliases))
+    FROM totals t
+    WHERE e.id = t.keep_id
+    RETURNING e.id
+)
+DELETE FROM public.entities e
+USING dupes d
+WHERE e.id = d.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS entities_project_type_name_key
+    ON public.entities(project_id, entity_type, lower(canonical_name));
+
+-- changes: [{id, delta, entity_type?, canonical_name?, aliases?, embedding?}, ...]
+--   With a name, the entity is inserted (mention_count = delta) or, if one
+--   with the same (type, lower(name)) exists, merged into it. Without one,
+--   the existing row `id` has its count adjusted and aliases merged.
+-- Returns, per change, the id it was given and the id of the row it landed on
+-- (they differ when another writer created the entity first).
+CREATE OR REPLACE FUNCTION public.apply_entity_mentions(
+    input_project_id uuid,
+    changes jsonb
+)
+RETURNS TABLE (requested_id uuid, entity_id uuid)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    change jsonb;
+BEGIN
+    FOR change IN SELECT * FROM jsonb_array_elements(changes) LOOP
+        requested_id := (change->>'id')::uuid;
+        IF change ? 'canonical_name' THEN
+            INSERT INTO public.entities AS e
+                (id, project_id, entity_type, canonical_name, aliases,
+                 mention_count, embedding, last_seen_at)
+            VALUES (
+                requested_id,
+                input_project_id,
+                change->>'entity_type',
+                change->>'canonical_name',
+                ARRAY(SELECT jsonb_array_elements_text(coalesce(change->'aliases', '[]'))),
+                greatest((change->>'delta')::int, 0),
+                (change->>'embedding')::vector,
+                now()
+            )
+            ON CONFLICT (project_id, entity_type, lower(canonical_name)) DO UPDATE
+            SET mention_count = greatest(e.mention_count + (change->>'delta')::int, 0),
+                aliases = ARRAY(SELECT DISTINCT unnest(e.aliases || excluded.aliases)),
+                last_seen_at = now()
+            RETURNING e.id INTO entity_id;
+        ELSE
+            UPDATE public.entities e
+            SET mention_count = greatest(e.mention_count + (change->>'delta')::int, 0),
+                aliases = ARRAY(SELECT DISTINCT unnest(
+                    e.aliases
+                    || ARRAY(SELECT jsonb_array_elements_text(coalesce(change->'aliases', '[]')))
+                )),
+                last_seen_at = now()
+            WHERE e.id = requested_id
+            RETURNING e.id INTO entity_id;
+        END IF;
+        RETURN NEXT;
+    END LOOP;
+END;
+$$;
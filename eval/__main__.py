@@ -1,4 +1,4 @@
-"""Route: python -m eval {runner|compare|corrections} ...
+"""Route: python -m eval {runner|compare|corrections|bench} ...
 
 Examples:
     python -m eval runner --split dev
@@ -6,6 +6,7 @@ Examples:
     python -m eval compare <run_id_a> <run_id_b>
     python -m eval corrections annotate <run_id> <case_id>
     python -m eval corrections promote <case_id>
+    python -m eval bench --sizes 1000 10000
 """
 
 import sys
@@ -25,8 +26,10 @@ def main():
         from eval.compare import main as _main
     elif sub == "corrections":
         from eval.corrections import main as _main
+    elif sub == "bench":
+        from eval.bench import main as _main
     else:
-        print(f"Unknown subcommand: '{sub}'. Choose from: runner, compare, corrections")
+        print(f"Unknown subcommand: '{sub}'. Choose from: runner, compare, corrections, bench")
         sys.exit(1)
 
     _main()
@@ -0,0 +1,133 @@
+"""Microbenchmark — vectorised scoring (backend/services/scoring.py) vs plain-Python loops.
+
+CLI:
+    python -m eval bench
+    python -m eval bench --sizes 1000 10000 --dim 384 --repeat 5
+
+For each candidate count, times one query against every candidate:
+  cosine   — embedding cosine (semantic cache lookup, rankers)
+  overlap  — share of query words per candidate word set (keyword rankers)
+and, for the pairwise kernels, all pairs among min(size, --max-pairwise) rows:
+  jaccard  — all-pairs word-set Jaccard (retrieval MMR)
+  pairs    — pairs of chunk-id sets sharing an item (signal correlation)
+
+Matrix construction is timed separately ("build"), since callers build once
+and score many times. Prints the speedup of each kernel over the loop.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import operator
+import random
+import time
+
+from backend.services import scoring
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+# ── Plain-Python baselines (the loops the rankers used before) ────────────
+
+def _loop_cosine(query: list[float], vectors: list[list[float]]) -> list[float]:
+    qn = math.sqrt(sum(map(operator.mul, query, query)))
+    return [
+        sum(map(operator.mul, query, v)) / (qn * math.sqrt(sum(map(operator.mul, v, v))))
+        for v in vectors
+    ]
+
+
+def _loop_overlap(query: set, sets: list[set]) -> list[float]:
+    return [len(query & s) / max(len(query), 1) for s in sets]
+
+
+def _loop_jaccard(sets: list[set]) -> list[list[float]]:
+    return [[len(a & b) / len(a | b) if a and b else 0.0 for b in sets] for a in sets]
+
+
+def _loop_pairs(sets: list[set]) -> list[tuple]:
+    found = []
+    for i in range(len(sets)):
+        for j in range(i + 1, len(sets)):
+            shared = sets[i] & sets[j]
+            if shared:
+                found.append((i, j, len(shared), len(shared) / len(sets[i] | sets[j])))
+    return found
+
+
+# ── Runner ────────────────────────────────────────────────────────────────
+
+def run(sizes: list[int], dim: int, repeat: int, max_pairwise: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(2000)]
+    rows: list[dict] = []
+
+    for n in sizes:
+        vectors = [[rng.gauss(0, 1) for _ in range(dim)] for _ in range(n)]
+        query = [rng.gauss(0, 1) for _ in range(dim)]
+        word_sets = [set(rng.sample(vocab, 40)) for _ in range(n)]
+        query_words = set(rng.sample(vocab, 8))
+
+        embeddings = scoring.EmbeddingMatrix(vectors)
+        sets = scoring.SetMatrix(word_sets)
+        rows.append({
+            "kernel": "cosine", "n": n,
+            "loop_ms": _best_of(lambda: _loop_cosine(query, vectors), repeat),
+            "vectorised_ms": _best_of(lambda: embeddings.cosine(query), repeat),
+            "build_ms": _best_of(lambda: scoring.EmbeddingMatrix(vectors), 1),
+        })
+        rows.append({
+            "kernel": "overlap", "n": n,
+            "loop_ms": _best_of(lambda: _loop_overlap(query_words, word_sets), repeat),
+            "vectorised_ms": _best_of(lambda: sets.overlap(query_words), repeat),
+            "build_ms": _best_of(lambda: scoring.SetMatrix(word_sets), 1),
+        })
+
+        m = min(n, max_pairwise)
+        pair_sets = scoring.SetMatrix(word_sets[:m])
+        chunk_sets = [set(rng.sample(range(20 * m), 10)) for _ in range(m)]
+        chunk_matrix = scoring.SetMatrix(chunk_sets)
+        rows.append({
+            "kernel": "jaccard", "n": m,
+            "loop_ms": _best_of(lambda: _loop_jaccard(word_sets[:m]), 1),
+            "vectorised_ms": _best_of(pair_sets.jaccard, repeat),
+            "build_ms": _best_of(lambda: scoring.SetMatrix(word_sets[:m]), 1),
+        })
+        rows.append({
+            "kernel": "pairs", "n": m,
+            "loop_ms": _best_of(lambda: _loop_pairs(chunk_sets), 1),
+            "vectorised_ms": _best_of(chunk_matrix.pairs, repeat),
+            "build_ms": _best_of(lambda: scoring.SetMatrix(chunk_sets), 1),
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark vectorised scoring kernels")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Candidate counts")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per timing (best is kept)")
+    parser.add_argument("--max-pairwise", type=int, default=1000, help="Row cap for all-pairs kernels")
+    args = parser.parse_args()
+
+    backend = "numpy" if scoring.np is not None else "pure python (numpy not installed)"
+    print(f"scoring backend: {backend}\n")
+    print(f"{'kernel':<9} {'n':>7} {'loop ms':>10} {'vector ms':>10} {'build ms':>10} {'speedup':>8}")
+    for row in run(args.sizes, args.dim, args.repeat, args.max_pairwise):
+        speedup = row["loop_ms"] / max(row["vectorised_ms"], 1e-6)
+        print(
+            f"{row['kernel']:<9} {row['n']:>7} {row['loop_ms']:>10.2f} "
+            f"{row['vectorised_ms']:>10.2f} {row['build_ms']:>10.2f} {speedup:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()